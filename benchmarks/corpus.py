@@ -0,0 +1,127 @@
+import os
+import random
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+# Tamaños (ancho, alto) representativos: etiqueta, ticket, documento
+_SIZES = [(800, 600), (600, 1400), (1240, 1754)]
+_WORDS = [
+    "TOTAL", "IVA", "SUBTOTAL", "EFECTIVO", "CAMBIO", "TICKET", "FACTURA",
+    "CANTIDAD", "PRECIO", "FECHA", "CLIENTE", "DESCUENTO", "0123456789"
+]
+
+
+def _visible_text(words: List[str], width: int) -> str:
+    """Palabras de la línea que caben enteras en la imagen (la referencia)"""
+    visible = []
+    for word in words:
+        candidate = " ".join(visible + [word])
+        (text_width, _), _ = cv2.getTextSize(candidate, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
+        if 20 + text_width > width:
+            break
+        visible.append(word)
+    return " ".join(visible)
+
+
+def _render_page(rng: random.Random, width: int, height: int) -> Tuple[np.ndarray, List[str]]:
+    """
+    Dibuja líneas de texto aleatorias (pero reproducibles) sobre fondo blanco
+
+    Returns:
+        (imagen, texto visible de cada línea de arriba abajo)
+    """
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    lines = []
+    line_height = 40
+    for y in range(line_height, height - 10, line_height):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(1, 4))]
+        words.append(f"{rng.randint(0, 9999)}.{rng.randint(0, 99):02d}")
+        cv2.putText(
+            image, " ".join(words), (20, y),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2
+        )
+        lines.append(_visible_text(words, width))
+    return image, lines
+
+
+def build_labeled_corpus(
+    count: int = 12,
+    seed: int = 0
+) -> Tuple[Dict[str, bytes], Dict[str, List[str]]]:
+    """
+    Genera el corpus sintético junto con el texto de referencia de cada imagen
+
+    Args:
+        count: Número de imágenes
+        seed: Semilla; la misma semilla produce exactamente los mismos bytes
+
+    Returns:
+        (nombre -> contenido JPEG, nombre -> líneas de texto de referencia)
+    """
+    rng = random.Random(seed)
+    corpus, labels = {}, {}
+    for index in range(count):
+        width, height = _SIZES[index % len(_SIZES)]
+        image, lines = _render_page(rng, width, height)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise RuntimeError("No se pudo codificar la imagen del corpus")
+        name = f"img_{index:03d}.jpg"
+        corpus[name] = encoded.tobytes()
+        labels[name] = lines
+    return corpus, labels
+
+
+def build_corpus(count: int = 12, seed: int = 0) -> Dict[str, bytes]:
+    """
+    Genera un corpus sintético determinista de imágenes JPEG con texto
+
+    Args:
+        count: Número de imágenes
+        seed: Semilla; la misma semilla produce exactamente los mismos bytes
+
+    Returns:
+        Diccionario nombre -> contenido JPEG
+    """
+    return build_labeled_corpus(count, seed)[0]
+
+
+def load_corpus(directory: str) -> Dict[str, bytes]:
+    """
+    Carga un corpus fijo desde un directorio (p. ej. tickets reales anonimizados)
+
+    Args:
+        directory: Directorio con las imágenes
+
+    Returns:
+        Diccionario nombre -> contenido, ordenado por nombre
+    """
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        # Los .txt son el texto de referencia de las imágenes (load_labels)
+        if os.path.isfile(path) and not name.startswith(".") and not name.endswith(".txt"):
+            with open(path, "rb") as f:
+                corpus[name] = f.read()
+    if not corpus:
+        raise ValueError(f"El directorio {directory} no contiene imágenes")
+    return corpus
+
+
+def load_labels(directory: str, corpus: Dict[str, bytes]) -> Dict[str, List[str]]:
+    """
+    Texto de referencia de un corpus fijo: `<imagen>.txt` junto a cada imagen,
+    con una línea de texto por línea
+
+    Returns:
+        Diccionario nombre -> líneas; las imágenes sin archivo no se incluyen
+    """
+    labels = {}
+    for name in corpus:
+        path = os.path.join(directory, os.path.splitext(name)[0] + ".txt")
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                labels[name] = [line.strip() for line in f if line.strip()]
+    return labels
@@ -0,0 +1,351 @@
+import asyncio
+import json
+import math
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import psutil
+
+from benchmarks.server import CorpusServer
+from src.api.app import app
+from src.core.config import settings
+from src.core.metrics import STAGE_LATENCY
+from src.services.inference_executor import inference_executor
+from src.services.ocr_pipeline import ocr_pipeline
+from src.services.result_cache import OCRResultCache
+
+SCENARIOS = ("single", "batch", "cache_hit")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Percentil con interpolación lineal entre los dos valores más cercanos
+
+    Args:
+        values: Muestras (no necesitan estar ordenadas)
+        pct: Percentil entre 0 y 100
+
+    Returns:
+        Valor del percentil (0.0 si no hay muestras)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """Resume latencias en segundos como p50/p95/p99/media/máximo en milisegundos"""
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(latencies, 50) * 1000, 2),
+        "p95": round(percentile(latencies, 95) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+        "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+        "max": round(max(latencies) * 1000, 2)
+    }
+
+
+class RSSSampler:
+    """
+    Muestrea en segundo plano la memoria residente del proceso y de sus
+    workers de inferencia, y conserva el pico
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _current_rss(self) -> int:
+        process = psutil.Process(os.getpid())
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self._current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self.peak_bytes = self._current_rss()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak_bytes / (1024 * 1024), 1)
+
+
+def _stage_totals() -> Dict[str, Tuple[float, float]]:
+    """Lee del histograma de etapas la suma y el número de observaciones"""
+    totals: Dict[str, List[float]] = {}
+    for metric in STAGE_LATENCY.collect():
+        for sample in metric.samples:
+            stage = sample.labels.get("stage")
+            entry = totals.setdefault(stage, [0.0, 0.0])
+            if sample.name.endswith("_sum"):
+                entry[0] = sample.value
+            elif sample.name.endswith("_count"):
+                entry[1] = sample.value
+    return {stage: (total, count) for stage, (total, count) in totals.items()}
+
+
+def _stage_breakdown(
+    before: Dict[str, Tuple[float, float]],
+    after: Dict[str, Tuple[float, float]],
+    images: int
+) -> Dict[str, Dict[str, float]]:
+    """Diferencia entre dos lecturas del histograma: tiempo medio por imagen"""
+    breakdown = {}
+    for stage, (total, count) in after.items():
+        prev_total, prev_count = before.get(stage, (0.0, 0.0))
+        if count - prev_count <= 0:
+            continue
+        breakdown[stage] = {
+            "total_s": round(total - prev_total, 4),
+            "mean_ms_per_image": round((total - prev_total) / max(images, 1) * 1000, 2)
+        }
+    return breakdown
+
+
+@contextmanager
+def _pipeline_cache(cache: Optional[OCRResultCache]) -> Iterator[None]:
+    """Sustituye temporalmente el cache del pipeline global"""
+    previous = ocr_pipeline.cache
+    ocr_pipeline.cache = cache
+    try:
+        yield
+    finally:
+        ocr_pipeline.cache = previous
+
+
+async def _drive(
+    make_request: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int
+) -> Tuple[List[float], int, float]:
+    """
+    Lanza `total` peticiones manteniendo `concurrency` en vuelo
+
+    Returns:
+        (latencias en segundos de las peticiones correctas, errores, duración total)
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                ok = await make_request(index)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return latencies, errors, time.perf_counter() - start
+
+
+class BenchmarkRunner:
+    """
+    Ejecuta los escenarios de benchmark contra la aplicación FastAPI
+
+    La aplicación se invoca en el mismo proceso a través de ASGI (con su
+    lifespan real: pool de inferencia, cliente HTTP compartido, warm-up) y
+    las imágenes se descargan de un CorpusServer local.
+    """
+
+    def __init__(
+        self,
+        corpus: Dict[str, bytes],
+        concurrency: int = 8,
+        requests: int = 64,
+        batch_size: int = 8,
+        warmup: int = 2,
+        ready_timeout: float = 600.0
+    ):
+        """
+        Args:
+            corpus: Diccionario nombre -> contenido de las imágenes
+            concurrency: Peticiones en vuelo a la vez
+            requests: Peticiones medidas por escenario
+            batch_size: URLs por petición en el escenario de lotes
+            warmup: Peticiones de calentamiento (no medidas)
+            ready_timeout: Segundos máximos esperando a que carguen los modelos
+        """
+        self.corpus = corpus
+        self.names = sorted(corpus)
+        self.concurrency = concurrency
+        self.requests = requests
+        self.batch_size = batch_size
+        self.warmup = warmup
+        self.ready_timeout = ready_timeout
+
+    def _config(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "batch_size": self.batch_size,
+            "inference_pool": settings.inference_pool,
+            "inference_workers": settings.inference_workers,
+            "inference_queue_size": settings.inference_queue_size,
+            "batch_window_ms": settings.batch_window_ms,
+            "batch_max_size": settings.batch_max_size,
+            "ocr_lang": settings.ocr_lang,
+            "ocr_device": settings.ocr_device,
+            "preprocess_enabled": settings.preprocess_enabled
+        }
+
+    async def _wait_ready(self) -> None:
+        deadline = time.monotonic() + self.ready_timeout
+        while not inference_executor.ready:
+            if inference_executor.startup_error:
+                raise RuntimeError(
+                    f"Los workers no arrancaron: {inference_executor.startup_error}"
+                )
+            if time.monotonic() > deadline:
+                raise TimeoutError("Los modelos no cargaron a tiempo")
+            await asyncio.sleep(0.1)
+
+    async def _measure(
+        self,
+        make_request: Callable[[int], Awaitable[bool]],
+        images_per_request: int
+    ) -> Dict[str, Any]:
+        before = _stage_totals()
+        with RSSSampler() as rss:
+            latencies, errors, duration = await _drive(
+                make_request, self.requests, self.concurrency
+            )
+        images = len(latencies) * images_per_request
+
+        return {
+            "requests": self.requests,
+            "images": images,
+            "errors": errors,
+            "duration_s": round(duration, 3),
+            "images_per_sec": round(images / duration, 2) if duration else 0.0,
+            "latency_ms": summarize_latencies(latencies),
+            "peak_rss_mb": rss.peak_mb,
+            "stages": _stage_breakdown(before, _stage_totals(), images)
+        }
+
+    async def _run_single(self, client: httpx.AsyncClient, server: CorpusServer) -> Dict[str, Any]:
+        async def request(index: int) -> bool:
+            name = self.names[index % len(self.names)]
+            response = await client.post("/ocr/extract", json={"image_url": server.url(name)})
+            return response.status_code == 200
+
+        # Sin cache: cada petición pasa por la inferencia
+        with _pipeline_cache(None):
+            return await self._measure(request, 1)
+
+    async def _run_batch(self, client: httpx.AsyncClient, server: CorpusServer) -> Dict[str, Any]:
+        async def request(index: int) -> bool:
+            urls = [
+                server.url(self.names[(index * self.batch_size + i) % len(self.names)])
+                for i in range(self.batch_size)
+            ]
+            response = await client.post("/ocr/batch", json={"image_urls": urls})
+            if response.status_code != 200:
+                return False
+            items = [json.loads(line) for line in response.text.splitlines() if line]
+            return len(items) == len(urls) and all(item["success"] for item in items)
+
+        with _pipeline_cache(None):
+            return await self._measure(request, self.batch_size)
+
+    async def _run_cache_hit(self, client: httpx.AsyncClient, server: CorpusServer) -> Dict[str, Any]:
+        async def request(index: int) -> bool:
+            name = self.names[index % len(self.names)]
+            response = await client.post("/ocr/extract", json={"image_url": server.url(name)})
+            return response.status_code == 200
+
+        cache = OCRResultCache(max_entries=len(self.names) * 2, ttl_seconds=0)
+        with _pipeline_cache(cache):
+            # Llenar el cache con todo el corpus antes de medir
+            for index in range(len(self.names)):
+                await request(index)
+            return await self._measure(request, 1)
+
+    async def run(self, scenarios: List[str]) -> Dict[str, Any]:
+        """
+        Ejecuta los escenarios indicados
+
+        Args:
+            scenarios: Subconjunto de SCENARIOS
+
+        Returns:
+            Informe serializable a JSON
+        """
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+        runners = {
+            "single": self._run_single,
+            "batch": self._run_batch,
+            "cache_hit": self._run_cache_hit
+        }
+        report: Dict[str, Any] = {
+            "config": self._config(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "corpus": {
+                "images": len(self.corpus),
+                "bytes": sum(len(data) for data in self.corpus.values())
+            },
+            "scenarios": {}
+        }
+
+        with CorpusServer(self.corpus) as server:
+            async with app.router.lifespan_context(app):
+                started = time.perf_counter()
+                await self._wait_ready()
+                report["startup_s"] = round(time.perf_counter() - started, 2)
+
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://benchmark", timeout=None
+                ) as client:
+                    with _pipeline_cache(None):
+                        for index in range(self.warmup):
+                            await client.post("/ocr/extract", json={
+                                "image_url": server.url(self.names[index % len(self.names)])
+                            })
+
+                    for name in scenarios:
+                        report["scenarios"][name] = await runners[name](client, server)
+
+        return report
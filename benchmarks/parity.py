@@ -0,0 +1,201 @@
+"""
+Paridad y velocidad de los motores de inferencia
+
+Uso:
+    python -m benchmarks.parity --backends paddle,onnxruntime,openvino \\
+        --threads 4 --output motores.json
+
+Ejecuta el mismo corpus con cada motor (en este proceso, sin servidor),
+compara sus resultados con los del primero y mide las imágenes/segundo,
+para elegir el motor más rápido de cada tipo de máquina.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _center(box: List[List[float]]) -> tuple:
+    return (
+        sum(point[0] for point in box) / len(box),
+        sum(point[1] for point in box) / len(box)
+    )
+
+
+def _box_delta(a: List[List[float]], b: List[List[float]]) -> float:
+    """Máxima diferencia entre las coordenadas de dos cajas"""
+    return max(
+        abs(pa[axis] - pb[axis])
+        for pa, pb in zip(a, b)
+        for axis in (0, 1)
+    )
+
+
+def compare_results(
+    reference: List[Dict[str, Any]],
+    candidate: List[Dict[str, Any]],
+    max_distance: float = 10.0
+) -> Dict[str, Any]:
+    """
+    Compara los resultados de dos motores sobre la misma imagen
+
+    Cada línea de referencia se empareja con la línea del otro motor cuyo
+    centro esté más cerca (a menos de `max_distance` píxeles).
+
+    Args:
+        reference: Resultados del motor de referencia
+        candidate: Resultados del motor comparado
+        max_distance: Distancia máxima entre centros para emparejar dos líneas
+
+    Returns:
+        Líneas de cada motor, líneas emparejadas, fracción de textos iguales
+        entre las emparejadas y máximas diferencias de caja y confianza
+    """
+    unmatched = list(candidate)
+    matched = same_text = 0
+    box_delta = confidence_delta = 0.0
+
+    for line in reference:
+        cx, cy = _center(line["box"])
+        best, best_distance = None, max_distance
+        for other in unmatched:
+            ox, oy = _center(other["box"])
+            distance = ((cx - ox) ** 2 + (cy - oy) ** 2) ** 0.5
+            if distance <= best_distance:
+                best, best_distance = other, distance
+        if best is None:
+            continue
+
+        unmatched.remove(best)
+        matched += 1
+        same_text += line["text"] == best["text"]
+        box_delta = max(box_delta, _box_delta(line["box"], best["box"]))
+        confidence_delta = max(
+            confidence_delta, abs(line["confidence"] - best["confidence"])
+        )
+
+    return {
+        "lines": len(reference),
+        "candidate_lines": len(candidate),
+        "matched": matched,
+        "text_agreement": same_text / matched if matched else float(not reference),
+        "max_box_delta": box_delta,
+        "max_confidence_delta": confidence_delta
+    }
+
+
+def summarize(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agrega las comparaciones de todas las imágenes del corpus"""
+    lines = sum(report["lines"] for report in reports)
+    matched = sum(report["matched"] for report in reports)
+    same_text = sum(report["text_agreement"] * report["matched"] for report in reports)
+    return {
+        "lines": lines,
+        "candidate_lines": sum(report["candidate_lines"] for report in reports),
+        "matched": matched,
+        "text_agreement": same_text / matched if matched else float(not lines),
+        "max_box_delta": max((report["max_box_delta"] for report in reports), default=0.0),
+        "max_confidence_delta": max(
+            (report["max_confidence_delta"] for report in reports), default=0.0
+        )
+    }
+
+
+def run_backend(
+    backend: Optional[str],
+    corpus: Dict[str, bytes],
+    warmup: int = 1,
+    key: Optional[Tuple[str, str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Procesa el corpus con un motor
+
+    Args:
+        backend: Motor de inferencia (None = INFERENCE_BACKEND)
+        corpus: Imágenes a procesar
+        warmup: Pasadas de calentamiento antes de medir
+        key: Modelo (idioma, variante, dispositivo); None = el de por defecto
+
+    Returns:
+        Tiempo de carga, imágenes/segundo y resultados por imagen
+    """
+    from src.services.paddleOCR import create_ocr_service
+
+    start = time.perf_counter()
+    service = create_ocr_service(key, backend=backend)
+    load_s = time.perf_counter() - start
+    if warmup > 0:
+        service.warmup(warmup)
+
+    results = {}
+    start = time.perf_counter()
+    for name, data in corpus.items():
+        results[name] = service.extract_text(data)
+    duration = time.perf_counter() - start
+
+    return {
+        "load_s": round(load_s, 3),
+        "duration_s": round(duration, 3),
+        "images_per_sec": round(len(corpus) / duration, 3) if duration else 0.0,
+        "results": results
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Paridad y velocidad de los motores de inferencia")
+    parser.add_argument("--backends", default="paddle,onnxruntime",
+                        help="Motores separados por comas; el primero es la referencia")
+    parser.add_argument("--threads", type=int, help="INFERENCE_CPU_THREADS")
+    parser.add_argument("--warmup", type=int, default=1, help="Pasadas de calentamiento")
+    parser.add_argument("--corpus-size", type=int, default=12,
+                        help="Imágenes del corpus sintético")
+    parser.add_argument("--corpus-seed", type=int, default=0,
+                        help="Semilla del corpus sintético")
+    parser.add_argument("--corpus-dir",
+                        help="Usar las imágenes de este directorio en lugar del corpus sintético")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    # Igual que en producción: la configuración se lee al importar src
+    if args.threads is not None:
+        os.environ["INFERENCE_CPU_THREADS"] = str(args.threads)
+
+    from benchmarks.corpus import build_corpus, load_corpus
+
+    corpus = (
+        load_corpus(args.corpus_dir) if args.corpus_dir
+        else build_corpus(args.corpus_size, args.corpus_seed)
+    )
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+
+    runs = {
+        backend: run_backend(backend, corpus, warmup=args.warmup)
+        for backend in backends
+    }
+    reference = runs[backends[0]]["results"]
+
+    report = {"reference": backends[0], "threads": args.threads, "backends": {}}
+    for backend, run in runs.items():
+        report["backends"][backend] = {
+            key: value for key, value in run.items() if key != "results"
+        }
+        report["backends"][backend]["parity"] = summarize([
+            compare_results(reference[name], run["results"][name]) for name in corpus
+        ])
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
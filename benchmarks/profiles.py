@@ -0,0 +1,136 @@
+"""
+Precisión y velocidad de los perfiles de modelo
+
+Uso:
+    python -m benchmarks.profiles --profiles fast,balanced,accurate \\
+        --output perfiles.json
+
+Procesa el corpus con el modelo de cada perfil (en este proceso, sin
+servidor) y compara el texto reconocido, en orden de lectura, con el de
+referencia: el del corpus sintético o los `<imagen>.txt` de --corpus-dir.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Distancia de Levenshtein entre dos textos (en caracteres)"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def text_accuracy(reference: List[str], recognized: List[str]) -> Dict[str, Any]:
+    """
+    Compara el texto reconocido con el de referencia
+
+    Las líneas se unen con saltos de línea (los espacios repetidos se
+    ignoran), así que también cuentan las líneas perdidas o desordenadas.
+
+    Returns:
+        Caracteres de referencia, distancia de edición y precisión por
+        carácter (1 - CER, nunca negativa)
+    """
+    expected = "\n".join(" ".join(line.split()) for line in reference)
+    actual = "\n".join(" ".join(line.split()) for line in recognized)
+    distance = edit_distance(expected, actual)
+    return {
+        "chars": len(expected),
+        "edit_distance": distance,
+        "accuracy": max(0.0, 1 - distance / len(expected)) if expected else float(not actual)
+    }
+
+
+def summarize_accuracy(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Precisión de todo el corpus (ponderada por caracteres)"""
+    chars = sum(report["chars"] for report in reports)
+    distance = sum(report["edit_distance"] for report in reports)
+    return {
+        "chars": chars,
+        "edit_distance": distance,
+        "accuracy": round(max(0.0, 1 - distance / chars), 4) if chars else 0.0
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precisión y velocidad de los perfiles de modelo")
+    parser.add_argument("--profiles", default="fast,balanced,accurate",
+                        help="Perfiles separados por comas")
+    parser.add_argument("--lang", help="OCR_LANG")
+    parser.add_argument("--backend", help="INFERENCE_BACKEND")
+    parser.add_argument("--warmup", type=int, default=1, help="Pasadas de calentamiento")
+    parser.add_argument("--corpus-size", type=int, default=12,
+                        help="Imágenes del corpus sintético")
+    parser.add_argument("--corpus-seed", type=int, default=0,
+                        help="Semilla del corpus sintético")
+    parser.add_argument("--corpus-dir",
+                        help="Usar las imágenes (y sus .txt) de este directorio")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    # Igual que en producción: la configuración se lee al importar src
+    for key, value in (("OCR_LANG", args.lang), ("INFERENCE_BACKEND", args.backend)):
+        if value is not None:
+            os.environ[key] = value
+
+    from benchmarks.corpus import build_labeled_corpus, load_corpus, load_labels
+    from benchmarks.parity import run_backend
+    from src.services.model_registry import profile_variant, resolve_model_key
+    from src.utils.reading_order import group_lines
+
+    if args.corpus_dir:
+        corpus = load_corpus(args.corpus_dir)
+        labels = load_labels(args.corpus_dir, corpus)
+    else:
+        corpus, labels = build_labeled_corpus(args.corpus_size, args.corpus_seed)
+
+    report = {"corpus": {"images": len(corpus), "labeled": len(labels)}, "profiles": {}}
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        key = resolve_model_key(variant=profile_variant(profile))
+        run = run_backend(None, corpus, warmup=args.warmup, key=key)
+        accuracy = summarize_accuracy([
+            text_accuracy(
+                labels[name],
+                [line["text"] for line in group_lines(run["results"][name])]
+            )
+            for name in corpus if name in labels
+        ])
+        report["profiles"][profile] = {
+            "model": ":".join(key),
+            "load_s": run["load_s"],
+            "duration_s": run["duration_s"],
+            "images_per_sec": run["images_per_sec"],
+            **accuracy
+        }
+        print(
+            f"{profile}: {run['images_per_sec']} img/s, precisión {accuracy['accuracy']}",
+            file=sys.stderr
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
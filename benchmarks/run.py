@@ -0,0 +1,108 @@
+"""
+Benchmark de throughput y latencia del servidor de OCR
+
+Uso:
+    python -m benchmarks.run --concurrency 8 --requests 64 --workers 2 \\
+        --batch-window-ms 10 --output resultados.json
+
+Las opciones del servidor se aplican como variables de entorno antes de
+importar la aplicación, igual que en producción.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark offline del servidor de OCR")
+    parser.add_argument("--scenarios", default="single,batch,cache_hit",
+                        help="Escenarios separados por comas (single, batch, cache_hit)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Peticiones en vuelo a la vez")
+    parser.add_argument("--requests", type=int, default=64,
+                        help="Peticiones medidas por escenario")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="URLs por petición en el escenario batch")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="Peticiones de calentamiento no medidas")
+    parser.add_argument("--corpus-size", type=int, default=12,
+                        help="Imágenes del corpus sintético")
+    parser.add_argument("--corpus-seed", type=int, default=0,
+                        help="Semilla del corpus sintético")
+    parser.add_argument("--corpus-dir",
+                        help="Usar las imágenes de este directorio en lugar del corpus sintético")
+    parser.add_argument("--pool", choices=["process", "thread"],
+                        help="INFERENCE_POOL")
+    parser.add_argument("--workers", type=int, help="INFERENCE_WORKERS")
+    parser.add_argument("--queue-size", type=int,
+                        help="INFERENCE_QUEUE_SIZE (por defecto, la concurrencia)")
+    parser.add_argument("--batch-window-ms", type=float, help="BATCH_WINDOW_MS")
+    parser.add_argument("--batch-max-size", type=int, help="BATCH_MAX_SIZE")
+    parser.add_argument("--set", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Cualquier otra opción de configuración (p. ej. OCR_LANG=es)")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    return parser.parse_args(argv)
+
+
+def _apply_settings(args: argparse.Namespace) -> None:
+    """Traslada las opciones a variables de entorno antes de importar src"""
+    overrides = {
+        "INFERENCE_POOL": args.pool,
+        "INFERENCE_WORKERS": args.workers,
+        "INFERENCE_QUEUE_SIZE": args.queue_size or args.concurrency * max(1, args.batch_size),
+        "BATCH_WINDOW_MS": args.batch_window_ms,
+        "BATCH_MAX_SIZE": args.batch_max_size,
+        # Sin límite por host: todas las descargas van al mismo servidor local
+        "HTTP_PER_HOST_LIMIT": 0
+    }
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key.strip().upper()] = value
+
+    for key, value in overrides.items():
+        if value is not None:
+            os.environ[key] = str(value)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    _apply_settings(args)
+
+    from benchmarks.corpus import build_corpus, load_corpus
+    from benchmarks.harness import BenchmarkRunner
+
+    corpus = (
+        load_corpus(args.corpus_dir) if args.corpus_dir
+        else build_corpus(args.corpus_size, args.corpus_seed)
+    )
+    runner = BenchmarkRunner(
+        corpus,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        batch_size=args.batch_size,
+        warmup=args.warmup
+    )
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    report = asyncio.run(runner.run(scenarios))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for name, result in report["scenarios"].items():
+        print(
+            f"{name}: {result['images_per_sec']} img/s, "
+            f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms, "
+            f"errores {result['errors']}, RSS pico {result['peak_rss_mb']} MB",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
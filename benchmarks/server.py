@@ -0,0 +1,72 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from src.utils.image_format import sniff_image_format
+
+
+class CorpusServer:
+    """
+    Servidor HTTP local que sirve el corpus en memoria
+
+    Sustituye a los CDNs reales: las descargas pasan por sockets de verdad
+    (y por el cliente HTTP compartido) sin depender de la red.
+    """
+
+    def __init__(self, corpus: Dict[str, bytes]):
+        """
+        Args:
+            corpus: Diccionario nombre -> contenido
+        """
+        self.corpus = corpus
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="corpus-server", daemon=True
+        )
+
+    def _handler(self):
+        corpus = self.corpus
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                data = corpus.get(self.path.lstrip("/"))
+                if data is None:
+                    self.send_error(404)
+                    return
+                image_format = sniff_image_format(data) or "octet-stream"
+                self.send_response(200)
+                self.send_header("Content-Type", f"image/{image_format}")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name: str) -> str:
+        """URL de una imagen del corpus"""
+        return f"{self.base_url}/{name}"
+
+    def start(self) -> "CorpusServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "CorpusServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
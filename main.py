@@ -2,9 +2,20 @@ import uvicorn
 from src.core.config import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "src.api.app:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug
-    )
\ No newline at end of file
+    if settings.server_workers > 1 and not settings.debug:
+        from src.core.launcher import serve
+
+        serve(
+            "src.api.app:app",
+            host=settings.host,
+            port=settings.port,
+            workers=settings.server_workers,
+            preload=settings.preload_models
+        )
+    else:
+        uvicorn.run(
+            "src.api.app:app",
+            host=settings.host,
+            port=settings.port,
+            reload=settings.debug
+        )
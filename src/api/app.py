@@ -1,11 +1,76 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from src.core.config import settings
-from src.api.routes import ocr
+from src.core.launcher import is_prefork_worker
+from src.core.metrics import REQUEST_LATENCY
+from src.api.routes import jobs, ocr
+from src.services.inference_executor import inference_executor
+from src.services.job_queue import job_queue
+from src.utils.http_client import http_client
+
+
+async def _preload_models() -> None:
+    try:
+        await inference_executor.start()
+    except Exception:
+        # El error queda en inference_executor.startup_error y /ready lo informa
+        pass
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cliente HTTP compartido por todas las descargas
+    await http_client.start()
+
+    # Cargar y calentar los modelos en segundo plano: /health responde desde
+    # el primer momento y /ready cuando los workers están listos
+    preload_task = None
+    if settings.preload_models:
+        preload_task = asyncio.create_task(_preload_models())
+    else:
+        inference_executor.ready = True
+
+    # Workers de los trabajos asíncronos (reanudan los interrumpidos; en modo
+    # prefork ya los reencoló el proceso padre)
+    await job_queue.start(requeue=not is_prefork_worker())
+
+    yield
+
+    await job_queue.stop()
+    if preload_task is not None:
+        preload_task.cancel()
+    await http_client.close()
+    # Detener los workers de inferencia al apagar el servidor
+    inference_executor.shutdown()
 
-app = FastAPI(title=settings.app_name)
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Incluir routers
 app.include_router(ocr.router)
+app.include_router(jobs.router)
+
+
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Se etiqueta con la plantilla de la ruta para no crear una serie por URL
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        REQUEST_LATENCY.labels(
+            method=request.method, path=path, status=str(status)
+        ).observe(time.perf_counter() - start)
 
 
 @app.get("/")
@@ -15,4 +80,22 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 solo cuando los modelos están cargados y calentados"""
+    if inference_executor.ready:
+        return {"status": "ready"}
+
+    content = {"status": "starting"}
+    if inference_executor.startup_error:
+        content = {"status": "error", "detail": inference_executor.startup_error}
+    return JSONResponse(status_code=503, content=content)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
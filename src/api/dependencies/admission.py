@@ -0,0 +1,50 @@
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+from src.core.config import settings
+from src.services.admission import (
+    AdmissionRejectedError,
+    AdmissionTicket,
+    RateLimitedError,
+    admission_controller
+)
+
+
+def client_id(request: Request) -> str:
+    """Cliente al que se cobra la petición: su API key o, sin ella, su IP"""
+    api_key = request.headers.get(settings.api_key_header)
+    if api_key:
+        return f"key:{api_key}"
+    return f"ip:{request.client.host if request.client else 'desconocido'}"
+
+
+def admission_http_error(error: AdmissionRejectedError) -> HTTPException:
+    """Respuesta de un rechazo de admisión: 429 por límite del cliente, 503 por saturación"""
+    return HTTPException(
+        status_code=429 if isinstance(error, RateLimitedError) else 503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+async def admit_request(request: Request) -> AsyncIterator[AdmissionTicket]:
+    """
+    Dependencia de control de admisión: rechaza con 429/503 antes de
+    descargar o decodificar la imagen y libera la reserva al terminar
+
+    El coste inicial se estima por el Content-Length (subidas y cuerpo
+    binario); las rutas por URL lo ajustan tras la descarga.
+    """
+    content_length = request.headers.get("content-length")
+    size = int(content_length) if content_length and content_length.isdigit() else None
+    try:
+        ticket = admission_controller.admit(
+            client_id(request), admission_controller.estimate_cost(size_bytes=size)
+        )
+    except AdmissionRejectedError as e:
+        raise admission_http_error(e)
+
+    try:
+        yield ticket
+    finally:
+        ticket.release()
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.api.dependencies.admission import admit_request
+from src.schemas.jobs import JobRequest, JobResponse
+from src.services.job_queue import job_queue
+from src.schemas.structure import StructureOptions
+from src.services.model_registry import (
+    UnknownModelError,
+    configured_structure_modules,
+    profile_variant,
+    resolve_model_key
+)
+
+router = APIRouter(prefix="/ocr/jobs", tags=["Jobs"])
+
+
+@router.post(
+    "",
+    response_model=JobResponse,
+    status_code=202,
+    dependencies=[Depends(admit_request)]
+)
+async def create_job(request: JobRequest):
+    """
+    Encola un trabajo de OCR o de estructura y devuelve su id sin esperar al resultado
+
+    Cada trabajo se cobra al cliente en el control de admisión al encolarlo
+    (429/503 si no cabe), igual que una petición síncrona. La reserva se
+    libera al encolarlo: en la cola los trabajos no ocupan capacidad global.
+
+    Args:
+        request: JobRequest con la imagen, la prioridad y un webhook opcional
+
+    Returns:
+        JobResponse en estado 'queued'
+    """
+    try:
+        resolve_model_key(request.lang, profile_variant(request.profile))
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.type == "structure":
+        options = request.structure or StructureOptions()
+        missing = set(options.requested_modules()) - set(configured_structure_modules())
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sub-módulos no cargados en el servidor: {', '.join(sorted(missing))}"
+            )
+
+    payload = request.model_dump(
+        mode="json", exclude={"type", "priority", "webhook_url"}
+    )
+    job = await job_queue.submit(
+        request.type,
+        payload,
+        priority=request.priority,
+        webhook_url=str(request.webhook_url) if request.webhook_url else None
+    )
+    return JobResponse(**job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Consulta el estado (y el resultado, si terminó) de un trabajo
+
+    Args:
+        job_id: Id devuelto al crear el trabajo
+
+    Returns:
+        JobResponse
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return JobResponse(**job)
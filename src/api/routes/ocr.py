@@ -1,73 +1,406 @@
-from fastapi import APIRouter, HTTPException
-from src.schemas.ocr import OCRRequest, OCRResponse, OCRTextResult
-from src.services.paddleOCR import ocr_service
-from src.utils.image_downloader import download_image_from_url, cleanup_temp_file
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from src.api.dependencies.admission import admission_http_error, admit_request, client_id
+from src.core.config import settings
+from src.core.metrics import observe_timings, stage_timer, start_timings
+from src.schemas.ocr import (
+    OCRBatchItem,
+    OCRBatchRequest,
+    OCRLine,
+    OCRPageResult,
+    OCRRequest,
+    OCRResponse,
+    OCRTextResult,
+    OCRUploadForm,
+    ResponseFormat
+)
+from src.schemas.structure import StructurePage, StructureRequest
+from src.services.admission import (
+    AdmissionRejectedError,
+    AdmissionTicket,
+    admission_controller
+)
+from src.services.inference_executor import InferenceQueueFullError
+from src.services.model_registry import (
+    UnknownModelError,
+    configured_structure_modules,
+    profile_variant,
+    resolve_model_key,
+    structure_model_key
+)
+from src.services.ocr_pipeline import ocr_pipeline
+from src.services.structure_pipeline import structure_pipeline
+from src.utils.document_pages import (
+    DocumentPage,
+    InvalidPageSelectionError,
+    is_document,
+    split_document
+)
+from src.utils.image_downloader import (
+    ImageTooLargeError,
+    UnsupportedImageError,
+    download_image_bytes,
+    read_image_stream
+)
+from src.utils.multipart_upload import InvalidUploadError, MultipartImageUpload
+from src.utils.reading_order import assemble_text, group_lines
+from src.utils.result_encoding import (
+    COMPACT_MEDIA_TYPES,
+    UnsupportedResponseFormatError,
+    compact_results,
+    encode_compact,
+    filter_by_confidence
+)
 
 router = APIRouter(prefix="/ocr", tags=["OCR"])
 
+# Margen sobre MAX_IMAGE_BYTES para los campos y cabeceras de un formulario
+# multipart al comprobar su Content-Length
+_UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def _filter_results(
+    results: List[Dict[str, Any]],
+    min_confidence: Optional[float]
+) -> List[OCRTextResult]:
+    """Filtra por confianza mínima y convierte al schema de respuesta"""
+    # Los resultados vienen del propio servicio: no hace falta validarlos
+    return [
+        OCRTextResult.model_construct(
+            box=result["box"],
+            text=result["text"],
+            confidence=result["confidence"]
+        )
+        for result in filter_by_confidence(results, min_confidence)
+    ]
+
+
+def _http_error(error: Exception) -> HTTPException:
+    """Traduce los errores de admisión, descarga, validación e inferencia a respuestas HTTP"""
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, AdmissionRejectedError):
+        return admission_http_error(error)
+    if isinstance(error, ImageTooLargeError):
+        return HTTPException(status_code=413, detail=str(error))
+    if isinstance(error, UnsupportedImageError):
+        return HTTPException(status_code=415, detail=str(error))
+    if isinstance(error, (UnknownModelError, InvalidPageSelectionError, InvalidUploadError)):
+        return HTTPException(status_code=400, detail=str(error))
+    if isinstance(error, UnsupportedResponseFormatError):
+        return HTTPException(status_code=406, detail=str(error))
+    if isinstance(error, InferenceQueueFullError):
+        return HTTPException(
+            status_code=503,
+            detail="Servidor de OCR saturado, intenta de nuevo más tarde",
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    return HTTPException(
+        status_code=500,
+        detail=f"Error procesando OCR: {str(error)}"
+    )
+
+
+def _group_lines(results: List[Dict[str, Any]]) -> List[OCRLine]:
+    """Agrupa en líneas lógicas en orden de lectura y convierte al schema de respuesta"""
+    return [
+        OCRLine.model_construct(
+            text=line["text"],
+            box=line["box"],
+            confidence=line["confidence"],
+            paragraph=line["paragraph"],
+            words=_filter_results(line["words"], None)
+        )
+        for line in group_lines(results)
+    ]
+
+
+def _page_results(
+    page_results: List[Tuple[int, List[Dict[str, Any]]]],
+    min_confidence: Optional[float],
+    reading_order: bool = False
+) -> List[OCRPageResult]:
+    """Filtra por confianza los resultados de cada página y, si se pide, los agrupa en líneas"""
+    pages = []
+    for page_index, results in page_results:
+        results = filter_by_confidence(results, min_confidence)
+        pages.append(OCRPageResult(
+            page_index=page_index,
+            results=_filter_results(results, None),
+            total_lines=len(results),
+            lines=_group_lines(results) if reading_order else None
+        ))
+    return pages
+
+
+async def _extract_response(
+    image_data: bytes,
+    min_confidence: Optional[float],
+    include_timings: bool,
+    timings: Dict[str, float],
+    lang: Optional[str] = None,
+    pages: Optional[str] = None,
+    dpi: Optional[int] = None,
+    response_format: str = "json",
+    reading_order: bool = False,
+    **options: Any
+) -> Union[OCRResponse, Response]:
+    """
+    Ejecuta el OCR sobre la imagen (o las páginas del documento) y construye
+    la respuesta; `options` son el modo, las regiones y las cajas de OCRRequest
+    """
+    # Filtrar por confianza después del cache, para que umbrales distintos
+    # compartan la misma entrada
+    page_results = await ocr_pipeline.extract_pages(
+        image_data, lang=lang, pages=pages, dpi=dpi, **options
+    )
+
+    if response_format in COMPACT_MEDIA_TYPES:
+        # Columnas planas serializadas directamente, sin un objeto por línea
+        with stage_timer("serialize"):
+            payload = compact_results(
+                page_results, min_confidence, include_pages=is_document(image_data)
+            )
+            if include_timings:
+                payload["timings"] = dict(timings)
+            return Response(
+                content=encode_compact(payload, response_format),
+                media_type=COMPACT_MEDIA_TYPES[response_format]
+            )
+
+    with stage_timer("serialize"):
+        ocr_pages = _page_results(page_results, min_confidence, reading_order)
+        ocr_results = [line for page in ocr_pages for line in page.results]
+        response = OCRResponse(
+            success=True,
+            results=ocr_results,
+            total_lines=len(ocr_results),
+            lines=[line for page in ocr_pages for line in page.lines] if reading_order else None,
+            pages=ocr_pages if is_document(image_data) else None
+        )
+
+    if include_timings:
+        response.timings = dict(timings)
+    return response
+
+
+def _check_content_length(request: Request, max_bytes: int) -> None:
+    """Rechaza antes de leer el cuerpo las peticiones que declaran un tamaño excesivo"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise ImageTooLargeError(
+            f"La petición ocupa {content_length} bytes (máximo {max_bytes})"
+        )
+
 
 @router.post("/extract", response_model=OCRResponse)
-async def extract_text_from_url(request: OCRRequest):
+async def extract_text_from_url(
+    request: OCRRequest,
+    ticket: AdmissionTicket = Depends(admit_request)
+):
     """
     Extrae texto de una imagen desde URL usando OCR
 
     Args:
-        request: OCRRequest con image_url y min_confidence opcional
+        request: OCRRequest con image_url, min_confidence, include_timings y,
+            opcionalmente, el modo (full/detection/recognition), las regiones
+            y las cajas a reconocer
 
     Returns:
-        OCRResponse con los resultados del OCR
+        OCRResponse con los resultados del OCR (o la respuesta compacta si se
+        pidió response_format)
     """
-    temp_file = None
-
+    timings = start_timings()
     try:
-        # Descargar imagen desde URL
-        temp_file = await download_image_from_url(str(request.image_url))
+        # Descargar imagen desde URL (en memoria, sin archivo temporal)
+        image_data = await download_image_bytes(str(request.image_url))
 
-        if not temp_file:
+        if not image_data:
             raise HTTPException(
                 status_code=400,
                 detail="No se pudo descargar la imagen desde la URL"
             )
+        ticket.resize(admission_controller.estimate_image_cost(image_data))
+
+        return await _extract_response(
+            image_data, request.min_confidence, request.include_timings, timings,
+            lang=request.lang, pages=request.pages, dpi=request.dpi,
+            response_format=request.response_format,
+            reading_order=request.reading_order, profile=request.profile,
+            mode=request.mode, regions=request.regions, boxes=request.boxes
+        )
+
+    except Exception as e:
+        raise _http_error(e)
+    finally:
+        observe_timings(timings)
+
+
+def _upload_form_schema() -> Dict[str, Any]:
+    """Esquema OpenAPI del formulario de subida: el archivo más OCRUploadForm"""
+    schema = OCRUploadForm.model_json_schema()
+    schema["properties"] = {
+        "file": {"type": "string", "format": "binary"},
+        **schema["properties"]
+    }
+    schema["required"] = ["file"]
+    return schema
+
+
+@router.post(
+    "/extract/upload",
+    response_model=OCRResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": _upload_form_schema()}}
+        }
+    }
+)
+async def extract_text_from_upload(
+    request: Request,
+    ticket: AdmissionTicket = Depends(admit_request)
+):
+    """
+    Extrae texto de una imagen (o un PDF/TIFF) subida como multipart/form-data
+
+    El formulario se procesa a medida que llega, sin archivo temporal: la
+    subida se aborta en cuanto el archivo deja de parecer una imagen o supera
+    MAX_IMAGE_BYTES.
+
+    Args:
+        request: Formulario con el archivo `file` y, opcionales, los campos de
+            OCRUploadForm: min_confidence, include_timings, lang, profile,
+            pages, dpi, response_format y reading_order
 
-        # Realizar OCR
-        results = ocr_service.extract_with_filter(
-            temp_file,
-            min_confidence=request.min_confidence
+    Returns:
+        OCRResponse con los resultados del OCR (o la respuesta compacta si se
+        pidió response_format)
+    """
+    timings = start_timings()
+    try:
+        _check_content_length(
+            request, settings.max_image_bytes + _UPLOAD_FORM_OVERHEAD_BYTES
         )
+        upload = MultipartImageUpload(request.headers.get("content-type", ""))
+        with stage_timer("upload"):
+            image_data = await read_image_stream(upload.iter_file(request.stream()))
 
-        # Formatear respuesta
-        ocr_results = [
-            OCRTextResult(
-                box=result["box"],
-                text=result["text"],
-                confidence=result["confidence"]
+        # Los campos vacíos valen como no enviados, igual que con Form()
+        try:
+            form = OCRUploadForm.model_validate(
+                {name: value for name, value in upload.fields.items() if value != ""}
             )
-            for result in results
-        ]
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False, include_context=False))
+        ticket.resize(admission_controller.estimate_image_cost(image_data))
 
-        return OCRResponse(
-            success=True,
-            results=ocr_results,
-            total_lines=len(ocr_results)
+        return await _extract_response(
+            image_data, form.min_confidence, form.include_timings, timings,
+            lang=form.lang, pages=form.pages, dpi=form.dpi,
+            response_format=form.response_format,
+            reading_order=form.reading_order, profile=form.profile
         )
 
-    except HTTPException:
+    except RequestValidationError:
         raise
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error procesando OCR: {str(e)}"
+        raise _http_error(e)
+    finally:
+        observe_timings(timings)
+
+
+@router.post(
+    "/extract/raw",
+    response_model=OCRResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "image/*": {"schema": {"type": "string", "format": "binary"}},
+                "application/pdf": {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def extract_text_from_raw_body(
+    request: Request,
+    min_confidence: Optional[float] = 0.5,
+    include_timings: bool = False,
+    lang: Optional[str] = None,
+    profile: Optional[str] = None,
+    pages: Optional[str] = None,
+    dpi: Optional[int] = Query(None, ge=36, le=600),
+    response_format: ResponseFormat = "json",
+    reading_order: bool = False,
+    ticket: AdmissionTicket = Depends(admit_request)
+):
+    """
+    Extrae texto de una imagen (o un PDF/TIFF) enviada directamente como
+    cuerpo de la petición
+
+    El cuerpo se lee por bloques y pasa al pipeline sin archivo temporal.
+
+    Args:
+        request: Petición con Content-Type image/*, application/pdf (o
+            application/octet-stream)
+        min_confidence: Confianza mínima (0-1)
+        include_timings: Incluir los tiempos por etapa en la respuesta
+        lang: Idioma del modelo (por defecto OCR_LANG)
+        profile: Perfil de modelo ('fast', 'balanced' o 'accurate')
+        pages: Páginas del documento ('1-3,5'; por defecto todas)
+        dpi: Resolución de rasterizado de los PDF (por defecto DOCUMENT_DPI)
+        response_format: 'json', 'compact' (columnas planas) o 'msgpack'
+        reading_order: Añadir las líneas agrupadas en orden de lectura
+
+    Returns:
+        OCRResponse con los resultados del OCR (o la respuesta compacta si se
+        pidió response_format)
+    """
+    timings = start_timings()
+    try:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if not (
+            content_type.startswith("image/")
+            or content_type in ("application/pdf", "application/octet-stream")
+        ):
+            raise HTTPException(
+                status_code=415,
+                detail="El cuerpo debe enviarse con Content-Type image/* o application/pdf"
+            )
+
+        _check_content_length(request, settings.max_image_bytes)
+
+        with stage_timer("upload"):
+            image_data = await read_image_stream(request.stream())
+        ticket.resize(admission_controller.estimate_image_cost(image_data))
+
+        return await _extract_response(
+            image_data, min_confidence, include_timings, timings,
+            lang=lang, pages=pages, dpi=dpi, response_format=response_format,
+            reading_order=reading_order, profile=profile
         )
+
+    except Exception as e:
+        raise _http_error(e)
     finally:
-        # Limpiar archivo temporal
-        if temp_file:
-            cleanup_temp_file(temp_file)
+        observe_timings(timings)
 
 
 @router.post("/extract-text-only")
-async def extract_text_only_from_url(request: OCRRequest):
+async def extract_text_only_from_url(
+    request: OCRRequest,
+    ticket: AdmissionTicket = Depends(admit_request)
+):
     """
-    Extrae solo el texto de una imagen (sin coordenadas ni confianza)
+    Extrae solo el texto de una imagen (sin coordenadas ni confianza), en
+    orden de lectura: las cajas de una misma fila forman una línea y los
+    párrafos se separan con una línea en blanco
 
     Args:
         request: OCRRequest con image_url
@@ -75,34 +408,300 @@ async def extract_text_only_from_url(request: OCRRequest):
     Returns:
         Texto extraído en formato simple
     """
-    temp_file = None
-
+    timings = start_timings()
     try:
-        # Descargar imagen desde URL
-        temp_file = await download_image_from_url(str(request.image_url))
+        # Descargar imagen desde URL (en memoria, sin archivo temporal)
+        image_data = await download_image_bytes(str(request.image_url))
 
-        if not temp_file:
+        if not image_data:
             raise HTTPException(
                 status_code=400,
                 detail="No se pudo descargar la imagen desde la URL"
             )
+        ticket.resize(admission_controller.estimate_image_cost(image_data))
 
-        # Realizar OCR y obtener solo texto
-        text = ocr_service.extract_text_only(temp_file)
+        # Realizar OCR y obtener solo texto (una línea en blanco entre páginas)
+        page_results = await ocr_pipeline.extract_pages(
+            image_data, lang=request.lang, pages=request.pages, dpi=request.dpi,
+            mode=request.mode, regions=request.regions, boxes=request.boxes,
+            profile=request.profile
+        )
+        with stage_timer("serialize"):
+            text = "\n\n".join(
+                assemble_text(group_lines(results)) for _, results in page_results
+            )
 
         return {
             "success": True,
             "text": text
         }
 
-    except HTTPException:
-        raise
     except Exception as e:
+        raise _http_error(e)
+    finally:
+        observe_timings(timings)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Estadísticas del cache de resultados de OCR
+
+    Returns:
+        Contadores de aciertos, fallos y entradas del cache
+    """
+    if ocr_pipeline.cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **ocr_pipeline.cache.stats()}
+
+
+async def _process_batch_item(
+    index: int,
+    image_url: str,
+    client: str,
+    min_confidence: Optional[float],
+    lang: Optional[str] = None,
+    profile: Optional[str] = None
+) -> OCRBatchItem:
+    """
+    Descarga y procesa una imagen del lote; los errores van en el item
+
+    Cada imagen pasa por el control de admisión como una petición más del
+    cliente, así que un lote no esquiva su límite ni el tope global.
+    """
+    timings = start_timings()
+    ticket = None
+    try:
+        ticket = admission_controller.admit(client)
+        image_data = await download_image_bytes(image_url)
+        if not image_data:
+            raise ValueError("No se pudo descargar la imagen desde la URL")
+        ticket.resize(admission_controller.estimate_image_cost(image_data))
+
+        # En lote no se rechaza por cola llena: se espera a que haya hueco
+        page_results = await ocr_pipeline.extract_pages(
+            image_data, lang=lang, wait=True, profile=profile
+        )
+
+        with stage_timer("serialize"):
+            ocr_pages = _page_results(page_results, min_confidence)
+            ocr_results = [line for page in ocr_pages for line in page.results]
+            return OCRBatchItem(
+                index=index,
+                image_url=image_url,
+                success=True,
+                results=ocr_results,
+                total_lines=len(ocr_results),
+                pages=ocr_pages if is_document(image_data) else None
+            )
+
+    except Exception as e:
+        return OCRBatchItem(
+            index=index,
+            image_url=image_url,
+            success=False,
+            results=[],
+            total_lines=0,
+            error=str(e)
+        )
+    finally:
+        if ticket is not None:
+            ticket.release()
+        observe_timings(timings)
+
+
+async def _stream_batch(
+    image_urls: Iterable[str],
+    client: str,
+    min_confidence: Optional[float],
+    lang: Optional[str] = None,
+    profile: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Procesa las imágenes con concurrencia acotada y emite cada resultado
+    en cuanto termina, como una línea NDJSON
+
+    Solo hay BATCH_CONCURRENCY imágenes en vuelo a la vez, así que la memoria
+    no depende del tamaño del lote. Cada imagen se cobra a `client` en el
+    control de admisión; las rechazadas vuelven como items con error.
+    """
+    urls = enumerate(image_urls)
+    pending = set()
+
+    def schedule_next() -> bool:
+        for index, url in urls:
+            pending.add(asyncio.ensure_future(
+                _process_batch_item(index, url, client, min_confidence, lang, profile)
+            ))
+            return True
+        return False
+
+    try:
+        for _ in range(max(1, settings.batch_concurrency)):
+            if not schedule_next():
+                break
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                schedule_next()
+                yield task.result().model_dump_json() + "\n"
+    finally:
+        # El cliente cerró la conexión: no seguir procesando el lote
+        for task in pending:
+            task.cancel()
+
+
+@router.post("/batch")
+async def extract_batch_from_urls(
+    request: OCRBatchRequest,
+    client: str = Depends(client_id)
+):
+    """
+    Extrae texto de varias imágenes y devuelve cada resultado en cuanto está listo
+
+    Args:
+        request: OCRBatchRequest con image_urls y, opcionales, min_confidence,
+            lang y profile
+
+    Returns:
+        Stream NDJSON con un OCRBatchItem por imagen (en orden de finalización)
+    """
+    # Validar el idioma y el perfil antes de empezar a emitir resultados
+    try:
+        resolve_model_key(request.lang, profile_variant(request.profile))
+    except UnknownModelError as e:
+        raise _http_error(e)
+
+    return StreamingResponse(
+        _stream_batch(
+            (str(url) for url in request.image_urls),
+            client,
+            request.min_confidence,
+            request.lang,
+            request.profile
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/batch/manifest")
+async def extract_batch_from_manifest(
+    manifest: UploadFile = File(...),
+    min_confidence: Optional[float] = 0.5,
+    lang: Optional[str] = None,
+    profile: Optional[str] = None,
+    client: str = Depends(client_id)
+):
+    """
+    Igual que /ocr/batch, pero las URLs vienen en un archivo (una por línea)
+
+    Args:
+        manifest: Archivo de texto con una URL por línea
+        min_confidence: Confianza mínima (0-1)
+        lang: Idioma del modelo (por defecto OCR_LANG)
+        profile: Perfil de modelo ('fast', 'balanced' o 'accurate')
+
+    Returns:
+        Stream NDJSON con un OCRBatchItem por imagen (en orden de finalización)
+    """
+    try:
+        resolve_model_key(lang, profile_variant(profile))
+    except UnknownModelError as e:
+        raise _http_error(e)
+
+    content = (await manifest.read()).decode("utf-8")
+    image_urls = [
+        line.strip() for line in content.splitlines()
+        if line.strip() and not line.strip().startswith("#")
+    ]
+
+    if not image_urls:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error procesando OCR: {str(e)}"
+            status_code=400,
+            detail="El manifiesto no contiene URLs"
+        )
+
+    return StreamingResponse(
+        _stream_batch(image_urls, client, min_confidence, lang, profile),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _stream_structure(
+    pages: List[Any],
+    lang: Optional[str],
+    options: Dict[str, bool]
+) -> AsyncIterator[str]:
+    """Emite cada página analizada en cuanto termina, como una línea NDJSON"""
+    async for index, result in structure_pipeline.analyze_pages(
+        pages, lang, concurrency=settings.batch_concurrency, **options
+    ):
+        part = pages[index]
+        page_index = part.index if isinstance(part, DocumentPage) else index
+        if isinstance(result, Exception):
+            page = StructurePage(page_index=page_index, success=False, error=str(result))
+        else:
+            page = StructurePage(page_index=page_index, success=True, **result)
+        yield page.model_dump_json() + "\n"
+
+
+@router.post("/structure")
+async def analyze_document_structure(
+    request: StructureRequest,
+    ticket: AdmissionTicket = Depends(admit_request)
+):
+    """
+    Analiza la estructura de un documento (imagen, PDF o TIFF) con PP-StructureV3
+
+    Devuelve el layout en orden de lectura, las tablas (HTML), las fórmulas
+    (LaTeX) y los sellos. Solo se ejecutan los sub-módulos pedidos, que deben
+    estar cargados según STRUCTURE_MODULES.
+
+    Args:
+        request: StructureRequest con image_url, lang, las páginas y los
+            sub-módulos a ejecutar
+
+    Returns:
+        Stream NDJSON con una StructurePage por página (en orden de finalización)
+    """
+    timings = start_timings()
+    try:
+        structure_model_key(request.lang)
+
+        missing = set(request.requested_modules()) - set(configured_structure_modules())
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sub-módulos no cargados en el servidor: {', '.join(sorted(missing))}"
+            )
+
+        image_data = await download_image_bytes(str(request.image_url))
+        if not image_data:
+            raise HTTPException(
+                status_code=400,
+                detail="No se pudo descargar la imagen desde la URL"
+            )
+
+        # Las páginas se rasterizan en los workers, no aquí
+        pages = await asyncio.to_thread(
+            split_document, image_data, request.pages, request.dpi
         )
+        # Al menos una unidad por página
+        ticket.resize(max(len(pages), admission_controller.estimate_image_cost(image_data)))
+
+    except Exception as e:
+        raise _http_error(e)
     finally:
-        # Limpiar archivo temporal
-        if temp_file:
-            cleanup_temp_file(temp_file)
\ No newline at end of file
+        observe_timings(timings)
+
+    return StreamingResponse(
+        _stream_structure(
+            pages,
+            request.lang,
+            request.model_dump(exclude={"image_url", "lang", "pages", "dpi"})
+        ),
+        media_type="application/x-ndjson"
+    )
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,8 +9,105 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Procesos del servidor HTTP. Con más de uno se cargan los modelos una
+    # vez y se hace fork de los procesos, que comparten los pesos
+    server_workers: int = 1
+
+    # Modelo de OCR (idioma y variante por defecto)
+    ocr_lang: str = "en"
+    ocr_device: str = "cpu"
+    ocr_model_variant: str = "default"
+
+    # Registro de modelos: idiomas que se pueden pedir por petición, idiomas
+    # que nunca se descargan de memoria y presupuesto de memoria por worker
+    # (0 = sin límite)
+    ocr_langs: str = "en,es,ch"
+    ocr_pinned_langs: str = ""
+    model_memory_budget_mb: int = 0
+
+    # Cascada de reconocimiento: las peticiones sin perfil hacen la primera
+    # pasada con CASCADE_FIRST_PROFILE, las líneas con confianza menor que
+    # CASCADE_THRESHOLD se reconocen de nuevo con el perfil CASCADE_PROFILE y
+    # se queda el resultado más fiable (0 = desactivada)
+    cascade_threshold: float = 0.0
+    cascade_profile: str = "accurate"
+    cascade_first_profile: str = "fast"
+
+    # Preprocesado: el lado largo máximo se deriva de la altura de texto que
+    # se quiere conservar (32 px / 0.0125 = 2560 px)
+    preprocess_enabled: bool = True
+    preprocess_target_text_height: int = 32
+    preprocess_text_height_ratio: float = 0.0125
+
+    # PP-StructureV3: sub-módulos que se cargan (y que se pueden pedir)
+    structure_modules: str = "table,formula,seal"
+
+    # Pool de inferencia
+    inference_pool: Literal["process", "thread"] = "process"
+    inference_workers: int = 2
+    inference_queue_size: int = 8
+    inference_retry_after: int = 2
+
+    # Motor de los modelos de OCR ('onnxruntime' y 'openvino' usan los modelos
+    # exportados a ONNX_MODEL_DIR) e hilos de CPU por modelo (0 = los del motor)
+    inference_backend: Literal["paddle", "onnxruntime", "openvino"] = "paddle"
+    inference_cpu_threads: int = 0
+    onnx_model_dir: str = "models/onnx"
+
+    # Arranque: cargar los modelos al iniciar y calentarlos
+    preload_models: bool = True
+    warmup_iterations: int = 1
+
+    # Micro-batching de peticiones concurrentes (0 ms desactiva los lotes)
+    batch_window_ms: float = 10.0
+    batch_max_size: int = 8
+
+    # Cliente HTTP compartido para descargas
+    download_timeout: float = 30.0
+    max_image_bytes: int = 20 * 1024 * 1024
+    max_image_pixels: int = 50_000_000
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = False
+    http_per_host_limit: int = 10
+
+    # Documentos de varias páginas (PDF y TIFF)
+    document_dpi: int = 200
+    document_max_pages: int = 100
+
+    # Control de admisión: token bucket por API key (unidades de coste por
+    # segundo y ráfaga; 0 = sin límite) y coste máximo en vuelo en total.
+    # Una unidad de coste equivale a ADMISSION_COST_UNIT_PIXELS píxeles
+    # (o ADMISSION_COST_UNIT_BYTES bytes si aún no se conocen las dimensiones)
+    api_key_header: str = "X-API-Key"
+    rate_limit_per_second: float = 0.0
+    rate_limit_burst: float = 20.0
+    admission_max_cost: int = 0
+    admission_cost_unit_pixels: int = 4_000_000
+    admission_cost_unit_bytes: int = 1024 * 1024
+
+    # Endpoint /ocr/batch: imágenes en vuelo a la vez por lote
+    batch_concurrency: int = 8
+
+    # Trabajos asíncronos (/ocr/jobs): almacén SQLite, trabajos a la vez,
+    # retención de los terminados y notificación por webhook
+    job_store_path: str = "data/jobs.sqlite3"
+    job_workers: int = 1
+    job_retention_hours: float = 24
+    job_webhook_timeout: float = 10.0
+    job_webhook_retries: int = 3
+
+    # Cache de resultados (CACHE_DIR activa el nivel en disco, limitado a
+    # CACHE_DIR_MAX_MB; 0 = sin límite)
+    cache_enabled: bool = True
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: float = 3600
+    cache_dir: Optional[str] = None
+    cache_dir_max_mb: int = 1024
+
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,168 @@
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from src.core.config import settings
+
+# Número del proceso del servidor en modo prefork (None en el proceso padre
+# o cuando el servidor corre en un único proceso)
+_worker_id: Optional[int] = None
+
+# Espera antes de reponer un proceso que terminó inesperadamente, para no
+# entrar en un bucle de fork si falla nada más arrancar
+_RESPAWN_DELAY_SECONDS = 1.0
+
+
+def is_prefork_worker() -> bool:
+    """Indica si el proceso actual es un hijo creado por serve()"""
+    return _worker_id is not None
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    """Abre el socket de escucha que comparten todos los procesos"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _requeue_interrupted_jobs() -> None:
+    """Reencola una sola vez los trabajos que quedaron a medias"""
+    from src.services.job_store import JobStore
+
+    store = JobStore(settings.job_store_path)
+    try:
+        requeued = store.requeue_running()
+    finally:
+        # La conexión SQLite no se puede heredar a través de fork
+        store.close()
+    if requeued:
+        print(f"Trabajos reencolados tras el reinicio: {requeued}")
+
+
+def _configure_inference_pool() -> None:
+    """Un único hilo de inferencia por proceso, que reutiliza los modelos precargados"""
+    settings.inference_pool = "thread"
+    if settings.inference_workers != 1:
+        print(
+            f"INFERENCE_WORKERS={settings.inference_workers} se ignora en modo prefork: "
+            "cada proceso usa un único hilo de inferencia"
+        )
+        settings.inference_workers = 1
+
+
+def _run_worker(app: str, sock: socket.socket, worker_id: int) -> None:
+    """Cuerpo de cada proceso hijo: atiende peticiones en el socket compartido"""
+    global _worker_id
+    _worker_id = worker_id
+
+    # uvicorn instala sus propios manejadores de señales
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app: str, sock: socket.socket, worker_id: int) -> int:
+    """Crea un proceso hijo y devuelve su pid"""
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            _run_worker(app, sock, worker_id)
+        except BaseException as e:
+            print(f"Error en el proceso {worker_id} del servidor: {e}")
+            status = 1
+        finally:
+            os._exit(status)
+    return pid
+
+
+def serve(
+    app: str,
+    host: str,
+    port: int,
+    workers: int,
+    preload: bool = True
+) -> None:
+    """
+    Arranca el servidor en modo prefork
+
+    El proceso padre carga los modelos una sola vez y después crea `workers`
+    procesos con fork(). Los pesos se comparten copy-on-write, así que cada
+    proceso adicional no duplica la memoria de los modelos. Dentro de cada
+    hijo el pool de inferencia tiene un único hilo, que usa los modelos
+    precargados: un pool de procesos con spawn, o más hilos, volverían a
+    cargarlos en cada proceso. El paralelismo lo dan los procesos. El padre
+    solo supervisa: repone los hijos que terminan y reenvía SIGTERM/SIGINT
+    al apagar.
+
+    Args:
+        app: Aplicación ASGI ('modulo:atributo'); se importa en cada hijo
+        host: Dirección de escucha
+        port: Puerto de escucha
+        workers: Número de procesos del servidor
+        preload: Cargar los modelos en el padre antes del fork
+    """
+    _configure_inference_pool()
+    sock = _bind(host, port)
+    _requeue_interrupted_jobs()
+
+    if preload:
+        from src.services.inference_executor import preload_shared_models
+
+        loaded = preload_shared_models()
+        print(f"Modelos cargados antes del fork: {', '.join(':'.join(k) for k in loaded)}")
+
+    # Los objetos que ya existen no se vuelven a recorrer en las recolecciones
+    # de los hijos, así que sus páginas no se copian solo por el GC
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for worker_id in range(workers):
+        children[_spawn(app, sock, worker_id)] = worker_id
+    print(f"Servidor en http://{host}:{port} con {workers} procesos")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+
+        worker_id = children.pop(pid, None)
+        if worker_id is None or stopping:
+            continue
+
+        print(
+            f"El proceso {worker_id} del servidor terminó "
+            f"(estado {os.waitstatus_to_exitcode(status)}); se repone"
+        )
+        time.sleep(_RESPAWN_DELAY_SECONDS)
+        if not stopping:
+            children[_spawn(app, sock, worker_id)] = worker_id
+
+    sock.close()
@@ -0,0 +1,103 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Etapas del pipeline: queue_wait, download, decode, preprocess, detection,
+# recognition, inference (total de predict), postprocess, serialize
+STAGE_LATENCY = Histogram(
+    "ocr_stage_duration_seconds",
+    "Duración de cada etapa del pipeline de OCR",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+REQUEST_LATENCY = Histogram(
+    "ocr_request_duration_seconds",
+    "Duración total de las peticiones HTTP",
+    ["method", "path", "status"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "ocr_inference_queue_depth",
+    "Trabajos esperando un worker de inferencia libre"
+)
+INFERENCE_IN_FLIGHT = Gauge(
+    "ocr_inference_in_flight",
+    "Inferencias ejecutándose en este momento"
+)
+DOWNLOADED_BYTES = Counter(
+    "ocr_downloaded_bytes_total",
+    "Bytes de imagen descargados"
+)
+COALESCED_REQUESTS = Counter(
+    "ocr_coalesced_requests_total",
+    "Peticiones que reutilizaron una descarga o inferencia idéntica en vuelo",
+    ["kind"]
+)
+ADMISSION_REJECTED = Counter(
+    "ocr_admission_rejected_total",
+    "Peticiones rechazadas por el control de admisión",
+    ["reason"]
+)
+ADMISSION_IN_FLIGHT_COST = Gauge(
+    "ocr_admission_in_flight_cost",
+    "Coste estimado de las peticiones admitidas en curso"
+)
+CASCADE_LINES = Counter(
+    "ocr_cascade_lines_total",
+    "Líneas de baja confianza enviadas al modelo de la cascada",
+    ["outcome"]
+)
+TEXT_LINES_PER_IMAGE = Histogram(
+    "ocr_text_lines_per_image",
+    "Líneas de texto detectadas por imagen",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+)
+
+# Tiempos por etapa de la petición (o del trabajo del worker) en curso
+_current_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "ocr_stage_timings", default=None
+)
+
+
+def start_timings() -> Dict[str, float]:
+    """
+    Empieza a registrar los tiempos por etapa en el contexto actual
+
+    Returns:
+        Diccionario etapa -> segundos que se irá completando
+    """
+    timings: Dict[str, float] = {}
+    _current_timings.set(timings)
+    return timings
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Suma la duración de una etapa a los tiempos del contexto actual"""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def merge_timings(timings: Dict[str, float]) -> None:
+    """Incorpora los tiempos medidos en otro contexto (p. ej. un worker)"""
+    for stage, seconds in timings.items():
+        record_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Mide la duración del bloque y la registra como la etapa indicada"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def observe_timings(timings: Dict[str, float]) -> None:
+    """Publica en los histogramas de Prometheus los tiempos de una petición"""
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.labels(stage=stage).observe(seconds)
@@ -0,0 +1,39 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, Dict, Literal, Optional
+
+from src.schemas.structure import StructureOptions
+
+
+class JobRequest(BaseModel):
+    """Request schema para crear un trabajo asíncrono (OCR o estructura)"""
+    type: Literal["ocr", "structure"] = "ocr"
+    image_url: HttpUrl
+    min_confidence: Optional[float] = 0.5
+    lang: Optional[str] = None
+    # Perfil de modelo de los trabajos 'ocr' ('fast', 'balanced' o 'accurate')
+    profile: Optional[str] = None
+    # Páginas de un PDF/TIFF ('1-3,5', base 1) y resolución de rasterizado
+    pages: Optional[str] = None
+    dpi: Optional[int] = Field(None, ge=36, le=600)
+    # Sub-módulos de PP-StructureV3 (solo trabajos 'structure')
+    structure: Optional[StructureOptions] = None
+    priority: Literal["high", "normal", "low"] = "normal"
+    # URL que recibe un POST con el trabajo terminado
+    webhook_url: Optional[HttpUrl] = None
+
+
+class JobResponse(BaseModel):
+    """Estado de un trabajo asíncrono"""
+    id: str
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    priority: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Mismo formato que la respuesta síncrona del tipo de trabajo
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    webhook_url: Optional[str] = None
+    webhook_status: Optional[str] = None
@@ -1,11 +1,63 @@
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+from typing import Dict, List, Literal, Optional
+
+# Rectángulo [x1, y1, x2, y2] en píxeles de la imagen original
+Region = List[float]
+# Caja de texto: cuatro puntos [x, y] (el mismo formato que OCRTextResult.box)
+Quad = List[List[float]]
+# 'json' (OCRResponse), 'compact' (columnas planas en JSON) o 'msgpack'
+ResponseFormat = Literal["json", "compact", "msgpack"]
 
 
 class OCRRequest(BaseModel):
     """Request schema para OCR"""
     image_url: HttpUrl
     min_confidence: Optional[float] = 0.5
+    include_timings: bool = False
+    # Idioma del modelo (por defecto OCR_LANG; ver OCR_LANGS)
+    lang: Optional[str] = None
+    # Perfil de modelo: 'fast', 'balanced' o 'accurate' (por defecto
+    # OCR_MODEL_VARIANT)
+    profile: Optional[str] = None
+    # Páginas de un PDF/TIFF ('1-3,5', base 1; por defecto todas)
+    pages: Optional[str] = None
+    # Resolución de rasterizado de los PDF (por defecto DOCUMENT_DPI)
+    dpi: Optional[int] = Field(None, ge=36, le=600)
+    # 'full' (detección + reconocimiento), 'detection' (solo cajas, sin texto)
+    # o 'recognition' (solo el texto de las cajas de `boxes`)
+    mode: Literal["full", "detection", "recognition"] = "full"
+    # Rectángulos a los que limitar el OCR (el resto de la imagen se ignora)
+    regions: Optional[List[Region]] = None
+    # Cajas a reconocer en el modo 'recognition'
+    boxes: Optional[List[Quad]] = None
+    # Formato de la respuesta; los compactos no crean un objeto por línea
+    response_format: ResponseFormat = "json"
+    # Añadir las cajas agrupadas en líneas lógicas y párrafos (orden de lectura)
+    reading_order: bool = False
+
+    @model_validator(mode="after")
+    def check_mode_options(self) -> "OCRRequest":
+        for region in self.regions or []:
+            if len(region) != 4 or region[2] <= region[0] or region[3] <= region[1]:
+                raise ValueError("Cada región debe ser [x1, y1, x2, y2] con x2 > x1 e y2 > y1")
+        for box in self.boxes or []:
+            if len(box) != 4 or any(len(point) != 2 for point in box):
+                raise ValueError("Cada caja debe tener cuatro puntos [x, y]")
+        if self.mode == "recognition" and not self.boxes:
+            raise ValueError("El modo 'recognition' necesita las cajas en `boxes`")
+        return self
+
+
+class OCRUploadForm(BaseModel):
+    """Campos del formulario de /ocr/extract/upload (además del archivo `file`)"""
+    min_confidence: Optional[float] = 0.5
+    include_timings: bool = False
+    lang: Optional[str] = None
+    profile: Optional[str] = None
+    pages: Optional[str] = None
+    dpi: Optional[int] = Field(None, ge=36, le=600)
+    response_format: ResponseFormat = "json"
+    reading_order: bool = False
 
 
 class OCRTextResult(BaseModel):
@@ -15,8 +67,49 @@ class OCRTextResult(BaseModel):
     confidence: float
 
 
+class OCRLine(BaseModel):
+    """Línea lógica en orden de lectura (cajas de una misma fila, de izquierda a derecha)"""
+    text: str
+    # Rectángulo que contiene todas las cajas: [x1, y1, x2, y2]
+    box: List[float]
+    confidence: float
+    paragraph: int
+    words: List[OCRTextResult]
+
+
+class OCRPageResult(BaseModel):
+    """Resultado de una página de un documento PDF/TIFF"""
+    page_index: int
+    results: List[OCRTextResult]
+    total_lines: int
+    lines: Optional[List[OCRLine]] = None
+
+
 class OCRResponse(BaseModel):
     """Response schema para OCR"""
     success: bool
+    # Líneas de todas las páginas, en orden de página
     results: List[OCRTextResult]
-    total_lines: int
\ No newline at end of file
+    total_lines: int
+    # Líneas en orden de lectura, solo si se pidió con reading_order
+    lines: Optional[List[OCRLine]] = None
+    # Resultados por página, solo si la entrada es un documento PDF/TIFF
+    pages: Optional[List[OCRPageResult]] = None
+    # Segundos por etapa (download, queue_wait, decode, detection...), solo
+    # si se pidió con include_timings
+    timings: Optional[Dict[str, float]] = None
+
+
+class OCRBatchRequest(BaseModel):
+    """Request schema para OCR de varias imágenes"""
+    image_urls: List[HttpUrl] = Field(..., min_length=1)
+    min_confidence: Optional[float] = 0.5
+    lang: Optional[str] = None
+    profile: Optional[str] = None
+
+
+class OCRBatchItem(OCRResponse):
+    """Resultado de una imagen dentro de un lote (una línea NDJSON)"""
+    index: int
+    image_url: str
+    error: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
+
+
+class StructureOptions(BaseModel):
+    """Sub-módulos de PP-StructureV3 a ejecutar (solo se paga por los pedidos)"""
+    use_table_recognition: bool = True
+    use_formula_recognition: bool = False
+    use_chart_recognition: bool = False
+    use_seal_recognition: bool = False
+    include_markdown: bool = True
+
+    def requested_modules(self) -> List[str]:
+        """Nombres de los sub-módulos activados"""
+        flags = {
+            "table": self.use_table_recognition,
+            "formula": self.use_formula_recognition,
+            "chart": self.use_chart_recognition,
+            "seal": self.use_seal_recognition
+        }
+        return [name for name, enabled in flags.items() if enabled]
+
+
+class StructureRequest(StructureOptions):
+    """Request schema para el análisis de estructura de documentos"""
+    image_url: HttpUrl
+    lang: Optional[str] = None
+    # Páginas de un PDF/TIFF ('1-3,5', base 1; por defecto todas)
+    pages: Optional[str] = None
+    # Resolución de rasterizado de los PDF (por defecto DOCUMENT_DPI)
+    dpi: Optional[int] = Field(None, ge=36, le=600)
+
+
+class StructureBlock(BaseModel):
+    """Bloque de layout en orden de lectura (title, text, table, figure...)"""
+    label: str
+    bbox: List[int]
+    content: str
+    order: int
+
+
+class StructureTable(BaseModel):
+    """Tabla reconocida"""
+    html: str
+    cells: int
+
+
+class StructureFormula(BaseModel):
+    """Fórmula reconocida"""
+    latex: str
+    bbox: List[float]
+
+
+class StructurePage(BaseModel):
+    """Resultado de una página (una línea NDJSON)"""
+    page_index: int
+    success: bool
+    width: int = 0
+    height: int = 0
+    blocks: List[StructureBlock] = []
+    tables: List[StructureTable] = []
+    formulas: List[StructureFormula] = []
+    seals: List[str] = []
+    markdown: Optional[str] = None
+    error: Optional[str] = None
@@ -0,0 +1,229 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.core.config import settings
+from src.core.metrics import ADMISSION_IN_FLIGHT_COST, ADMISSION_REJECTED
+from src.utils.image_format import read_image_size
+
+# Bytes iniciales en los que se buscan las dimensiones de la imagen
+_HEADER_PROBE_BYTES = 64 * 1024
+
+
+class AdmissionRejectedError(Exception):
+    """La petición se rechaza antes de descargar o decodificar la imagen"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(AdmissionRejectedError):
+    """El cliente superó su límite de peticiones (429)"""
+
+
+class OverloadedError(AdmissionRejectedError):
+    """El servidor no tiene capacidad para más trabajo en vuelo (503)"""
+
+
+class TokenBucket:
+    """Token bucket: `rate` unidades por segundo con una ráfaga de `burst`"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """
+        Consume `cost` unidades si las hay
+
+        Returns:
+            0 si se admitió; si no, segundos hasta que haya unidades suficientes
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        # Una petición más cara que la ráfaga entera se admite con el bucket lleno
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionTicket:
+    """Reserva de capacidad de una petición admitida; se libera al terminar"""
+
+    def __init__(self, controller: "AdmissionController", client: str, cost: int):
+        self._controller = controller
+        self.client = client
+        self.cost = cost
+        self._released = False
+
+    def resize(self, cost: int) -> None:
+        """
+        Ajusta la reserva al coste real, conocido tras la descarga y antes de
+        decodificar; la diferencia también se cobra al cliente
+
+        Raises:
+            RateLimitedError: Si el cliente no tiene límite para el coste adicional
+            OverloadedError: Si el coste adicional no cabe en la capacidad libre
+        """
+        if cost > self.cost:
+            self._controller._charge(self.client, cost - self.cost)
+            self._controller._reserve(cost - self.cost, held=self.cost)
+            self.cost = cost
+
+    def release(self) -> None:
+        """Devuelve la capacidad reservada (idempotente)"""
+        if not self._released:
+            self._released = True
+            self._controller._release(self.cost)
+
+
+class AdmissionController:
+    """
+    Control de admisión de las peticiones de OCR
+
+    Aplica un token bucket por API key (para que un cliente no acapare el
+    servidor) y un tope global al coste de las peticiones en vuelo. El coste
+    se estima por el tamaño de la imagen, y las peticiones que no caben se
+    rechazan al llegar, antes de descargar o decodificar nada, para mantener
+    la latencia de las admitidas en lugar de encolar sin límite.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = 0.0,
+        burst: float = 20.0,
+        max_cost: int = 0,
+        cost_unit_pixels: int = 4_000_000,
+        cost_unit_bytes: int = 1024 * 1024,
+        retry_after: int = 2,
+        max_clients: int = 10_000
+    ):
+        """
+        Args:
+            rate_per_second: Unidades de coste por segundo por API key (0 = sin límite)
+            burst: Unidades que un cliente puede gastar de golpe
+            max_cost: Coste total en vuelo admitido (0 = sin límite)
+            cost_unit_pixels: Píxeles que equivalen a una unidad de coste
+            cost_unit_bytes: Bytes que equivalen a una unidad si no se conocen
+                las dimensiones
+            retry_after: Retry-After (segundos) de los rechazos por saturación
+            max_clients: Buckets que se conservan (se descartan los más antiguos)
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_cost = max_cost
+        self.cost_unit_pixels = cost_unit_pixels
+        self.cost_unit_bytes = cost_unit_bytes
+        self.retry_after = retry_after
+        self.max_clients = max_clients
+        self.in_flight_cost = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def estimate_cost(
+        self,
+        size_bytes: Optional[int] = None,
+        pixels: Optional[int] = None
+    ) -> int:
+        """
+        Coste estimado de una imagen (al menos 1)
+
+        Args:
+            size_bytes: Tamaño del archivo, si se conoce
+            pixels: Ancho × alto, si se conoce (tiene prioridad)
+        """
+        if pixels:
+            return max(1, math.ceil(pixels / self.cost_unit_pixels))
+        if size_bytes:
+            return max(1, math.ceil(size_bytes / self.cost_unit_bytes))
+        return 1
+
+    def estimate_image_cost(self, data: bytes) -> int:
+        """Coste de una imagen ya descargada: por sus dimensiones si la cabecera las tiene"""
+        size = read_image_size(data[:_HEADER_PROBE_BYTES])
+        return self.estimate_cost(
+            size_bytes=len(data), pixels=size[0] * size[1] if size else None
+        )
+
+    def admit(self, client: str, cost: int = 1) -> AdmissionTicket:
+        """
+        Admite una petición o la rechaza de inmediato
+
+        Args:
+            client: API key (o identificador del cliente)
+            cost: Coste estimado
+
+        Returns:
+            Reserva que hay que liberar al terminar la petición
+
+        Raises:
+            RateLimitedError: Si el cliente agotó su límite
+            OverloadedError: Si el coste no cabe en la capacidad libre
+        """
+        self._charge(client, cost)
+        self._reserve(cost)
+        return AdmissionTicket(self, client, cost)
+
+    def _charge(self, client: str, cost: int) -> None:
+        """Cobra `cost` unidades al token bucket del cliente o rechaza con 429"""
+        if self.rate_per_second <= 0:
+            return
+        wait = self._take_tokens(client, cost)
+        if wait > 0:
+            ADMISSION_REJECTED.labels(reason="rate_limit").inc()
+            raise RateLimitedError(
+                "Límite de peticiones superado para este cliente",
+                retry_after=max(1, math.ceil(wait))
+            )
+
+    def _take_tokens(self, client: str, cost: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_second, self.burst, now)
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take(cost, now)
+
+    def _reserve(self, cost: int, held: int = 0) -> None:
+        with self._lock:
+            # Con el servidor vacío (sin contar lo que ya reservó esta petición)
+            # se admite aunque el coste supere el tope, para que una imagen
+            # grande no se rechace siempre
+            if self.max_cost > 0 and self.in_flight_cost - held > 0 and \
+                    self.in_flight_cost + cost > self.max_cost:
+                ADMISSION_REJECTED.labels(reason="overload").inc()
+                raise OverloadedError(
+                    "Servidor de OCR saturado, intenta de nuevo más tarde",
+                    retry_after=self.retry_after
+                )
+            self.in_flight_cost += cost
+
+    def _release(self, cost: int) -> None:
+        with self._lock:
+            self.in_flight_cost = max(0, self.in_flight_cost - cost)
+
+
+# Instancia global del control de admisión
+admission_controller = AdmissionController(
+    rate_per_second=settings.rate_limit_per_second,
+    burst=settings.rate_limit_burst,
+    max_cost=settings.admission_max_cost,
+    cost_unit_pixels=settings.admission_cost_unit_pixels,
+    cost_unit_bytes=settings.admission_cost_unit_bytes,
+    retry_after=settings.inference_retry_after
+)
+
+ADMISSION_IN_FLIGHT_COST.set_function(lambda: admission_controller.in_flight_cost)
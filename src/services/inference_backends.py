@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.config import settings
+from src.services.model_registry import ModelKey
+
+# Motores de inferencia de los modelos de detección y reconocimiento. El
+# pre y post-procesado es siempre el del pipeline de PaddleX, así que el
+# formato de los resultados no depende del motor.
+INFERENCE_BACKENDS = ("paddle", "onnxruntime", "openvino")
+
+# Índice de los modelos exportados: "idioma:variante" -> sub-modelos
+MANIFEST_FILENAME = "models.json"
+
+# Sub-modelos del pipeline de OCR y las opciones de PaddleOCR que los eligen
+SUBMODELS = {
+    "det": ("text_detection_model_name", "text_detection_model_dir"),
+    "rec": ("text_recognition_model_name", "text_recognition_model_dir")
+}
+
+
+class BackendUnavailableError(RuntimeError):
+    """El motor pedido no se puede usar (p. ej. faltan los modelos exportados)"""
+
+
+def manifest_key(lang: str, variant: str) -> str:
+    """Clave de un modelo en el índice de modelos exportados"""
+    return f"{lang}:{variant}"
+
+
+def load_manifest(model_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Lee el índice de los modelos exportados
+
+    Args:
+        model_dir: Directorio de los modelos exportados (None = ONNX_MODEL_DIR)
+
+    Returns:
+        Diccionario "idioma:variante" -> {"det": {...}, "rec": {...}}; vacío
+        si todavía no se exportó nada
+    """
+    path = Path(model_dir or settings.onnx_model_dir) / MANIFEST_FILENAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def backend_options(
+    key: ModelKey,
+    backend: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+    model_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Opciones de PaddleOCR para ejecutar un modelo con un motor de inferencia
+
+    Args:
+        key: (idioma, variante, dispositivo) del modelo
+        backend: 'paddle', 'onnxruntime' u 'openvino' (None = INFERENCE_BACKEND)
+        cpu_threads: Hilos de CPU por modelo (None = INFERENCE_CPU_THREADS;
+            0 = los del motor)
+        model_dir: Directorio de los modelos exportados (None = ONNX_MODEL_DIR)
+
+    Returns:
+        Argumentos adicionales para PaddleOCR
+
+    Raises:
+        ValueError: Si el motor no existe
+        BackendUnavailableError: Si el modelo no se exportó para el motor
+    """
+    backend = backend or settings.inference_backend
+    threads = settings.inference_cpu_threads if cpu_threads is None else cpu_threads
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Motor de inferencia no soportado: {backend}")
+
+    if backend == "paddle":
+        return {"cpu_threads": threads} if threads > 0 else {}
+
+    lang, variant, _ = key
+    model_dir = model_dir or settings.onnx_model_dir
+    entry = load_manifest(model_dir).get(manifest_key(lang, variant))
+    if entry is None:
+        raise BackendUnavailableError(
+            f"No hay modelos exportados para '{manifest_key(lang, variant)}' en "
+            f"{model_dir}; ejecuta `python -m tools.export_models`"
+        )
+
+    options: Dict[str, Any] = {}
+    for submodel, (name_option, dir_option) in SUBMODELS.items():
+        options[name_option] = entry[submodel]["name"]
+        options[dir_option] = str(Path(model_dir) / entry[submodel]["dir"])
+
+    if backend == "onnxruntime":
+        # Un solo hilo entre operadores: el paralelismo va dentro de cada uno
+        engine_config: Dict[str, Any] = {"inter_op_num_threads": 1}
+        if threads > 0:
+            engine_config["intra_op_num_threads"] = threads
+        options.update(engine="onnxruntime", engine_config=engine_config)
+    else:
+        # OpenVINO se ejecuta a través de la inferencia de alto rendimiento de
+        # PaddleX (plugin hpi-cpu) sobre los mismos modelos ONNX
+        backend_config = {"cpu_num_threads": threads} if threads > 0 else {}
+        options.update(
+            enable_hpi=True,
+            engine_config={
+                "backend": "openvino",
+                "backend_config": backend_config,
+                "auto_config": False
+            }
+        )
+    return options
@@ -0,0 +1,325 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.metrics import (
+    INFERENCE_IN_FLIGHT,
+    INFERENCE_QUEUE_DEPTH,
+    merge_timings,
+    record_stage,
+    start_timings
+)
+from src.services.model_registry import (
+    RECOGNITION_SUFFIX,
+    STRUCTURE_VARIANT,
+    ModelKey,
+    ModelRegistry,
+    default_model_key,
+    pinned_model_keys
+)
+
+
+class InferenceQueueFullError(Exception):
+    """La cola de inferencia está llena y no admite más trabajo"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("La cola de inferencia está llena")
+        self.retry_after = retry_after
+
+
+# Estado de cada worker (proceso o hilo): su registro de modelos. El primer
+# worker de cada proceso reutiliza la instancia global del servicio para el
+# modelo por defecto; el resto crea la suya propia.
+_worker_state = threading.local()
+_primary_lock = threading.Lock()
+_primary_claimed = False
+
+# Modelos fijados cargados antes de crear los procesos del servidor (modo
+# prefork); los procesos hijos los heredan y comparten copy-on-write
+_shared_models: Dict[ModelKey, Any] = {}
+
+
+def _create_service(key: ModelKey) -> Any:
+    """Crea el servicio de un modelo (sin calentar)"""
+    if key[1] == STRUCTURE_VARIANT:
+        from src.services import ppStructure
+        return ppStructure.create_structure_service(key)
+
+    from src.services import paddleOCR
+    if key[1].endswith(RECOGNITION_SUFFIX):
+        return paddleOCR.create_recognition_service(key)
+    return paddleOCR.create_ocr_service(key)
+
+
+def _load_model(key: ModelKey) -> Any:
+    """Crea y calienta el servicio de un modelo bajo demanda"""
+    service = _create_service(key)
+    if settings.warmup_iterations > 0:
+        service.warmup(settings.warmup_iterations)
+    return service
+
+
+def preload_shared_models() -> List[ModelKey]:
+    """
+    Carga en el proceso actual el modelo por defecto y los de OCR_PINNED_LANGS
+
+    Pensado para llamarse antes de hacer fork de los procesos del servidor:
+    el primer worker de inferencia de cada proceso reutiliza estas
+    instancias en lugar de cargar las suyas. No se calientan aquí para no
+    arrancar los hilos de inferencia antes del fork.
+
+    Returns:
+        Modelos cargados
+    """
+    from src.services import paddleOCR
+
+    paddleOCR.get_ocr_service()
+    for key in pinned_model_keys():
+        if key != default_model_key() and key not in _shared_models:
+            _shared_models[key] = _create_service(key)
+    return [default_model_key(), *_shared_models]
+
+
+def _init_worker() -> None:
+    """Crea el registro de modelos del worker y carga y calienta el modelo por defecto"""
+    global _primary_claimed
+    from src.services import paddleOCR
+
+    with _primary_lock:
+        is_primary = not _primary_claimed
+        _primary_claimed = True
+
+    registry = ModelRegistry(
+        _load_model,
+        memory_budget_mb=settings.model_memory_budget_mb,
+        pinned=pinned_model_keys()
+    )
+    if is_primary:
+        services = {default_model_key(): paddleOCR.get_ocr_service(), **_shared_models}
+        for key, service in services.items():
+            if settings.warmup_iterations > 0:
+                service.warmup(settings.warmup_iterations)
+            registry.add(key, service)
+    else:
+        registry.get(default_model_key())
+    _worker_state.registry = registry
+
+
+def _ping() -> bool:
+    """Tarea vacía: solo obliga a que el worker exista y esté inicializado"""
+    return True
+
+
+def _call_service(
+    model_key: Optional[ModelKey],
+    method: str,
+    args: tuple,
+    kwargs: dict,
+    submitted_at: float
+) -> Tuple[Any, Dict[str, float]]:
+    """
+    Ejecuta un método del servicio de OCR dentro del worker
+
+    Returns:
+        (valor devuelto, tiempos por etapa medidos en el worker)
+    """
+    timings = start_timings()
+    record_stage("queue_wait", max(0.0, time.time() - submitted_at))
+
+    registry = getattr(_worker_state, "registry", None)
+    if registry is None:
+        _init_worker()
+        registry = _worker_state.registry
+    service = registry.get(model_key or default_model_key())
+    return getattr(service, method)(*args, **kwargs), timings
+
+
+class InferenceExecutor:
+    """
+    Pool de workers para ejecutar la inferencia fuera del event loop
+
+    Cada worker mantiene su propio modelo. La cantidad de trabajos pendientes
+    (en ejecución + en cola) está acotada; al superarse se rechaza el trabajo
+    con InferenceQueueFullError en lugar de acumular latencia.
+    """
+
+    def __init__(
+        self,
+        pool: str = "process",
+        max_workers: int = 2,
+        queue_size: int = 8,
+        retry_after: int = 2
+    ):
+        """
+        Args:
+            pool: Tipo de pool ('process' o 'thread')
+            max_workers: Número de workers de inferencia
+            queue_size: Trabajos en espera admitidos además de los que se ejecutan
+            retry_after: Segundos sugeridos al cliente cuando la cola está llena
+        """
+        if pool not in ("process", "thread"):
+            raise ValueError(f"Tipo de pool no soportado: {pool}")
+
+        self.pool = pool
+        self.max_workers = max_workers
+        self.max_pending = max_workers + queue_size
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.ready = False
+        self.startup_error: Optional[str] = None
+
+    @property
+    def pending(self) -> int:
+        """Imágenes en ejecución o en espera (un lote cuenta cada una de las suyas)"""
+        return self._pending
+
+    async def start(self) -> None:
+        """
+        Arranca todos los workers y espera a que sus modelos estén cargados
+        y calentados; al terminar, `ready` pasa a True
+
+        Los pools crean workers bajo demanda, así que se envía una tarea vacía
+        por worker a la vez para que se creen todos.
+        """
+        executor = self._get_executor()
+        try:
+            await asyncio.gather(*(
+                asyncio.wrap_future(executor.submit(_ping))
+                for _ in range(self.max_workers)
+            ))
+        except Exception as e:
+            self.startup_error = str(e)
+            print(f"Error inicializando los workers de inferencia: {e}")
+            raise
+        self.ready = True
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ocr-inference",
+                    initializer=_init_worker
+                )
+        return self._executor
+
+    def _release(self, weight: int) -> None:
+        self._pending -= weight
+
+    async def run(
+        self,
+        method: str,
+        *args,
+        model_key: Optional[ModelKey] = None,
+        weight: int = 1,
+        **kwargs
+    ) -> Any:
+        """
+        Ejecuta un método de PaddleOCRService en el pool
+
+        Los tiempos por etapa medidos en el worker se suman a los de la
+        petición en curso.
+
+        Args:
+            method: Nombre del método del servicio (p. ej. 'extract_text')
+            *args, **kwargs: Argumentos del método
+            model_key: Modelo que debe atender el trabajo (None = el de por defecto)
+            weight: Huecos de la cola que ocupa el trabajo (ver run_timed)
+
+        Returns:
+            El valor devuelto por el método
+
+        Raises:
+            InferenceQueueFullError: Si se alcanzó el máximo de trabajos pendientes
+        """
+        value, timings = await self.run_timed(
+            method, *args, model_key=model_key, weight=weight, **kwargs
+        )
+        merge_timings(timings)
+        return value
+
+    async def run_timed(
+        self,
+        method: str,
+        *args,
+        model_key: Optional[ModelKey] = None,
+        weight: int = 1,
+        **kwargs
+    ) -> Tuple[Any, Dict[str, float]]:
+        """
+        Igual que run(), pero devuelve los tiempos del worker en lugar de
+        sumarlos a la petición en curso (para trabajos compartidos por varias)
+
+        Args:
+            weight: Imágenes que procesa el trabajo (el tamaño de un lote);
+                ocupan otros tantos huecos de la cola. Con el pool vacío se
+                admite aunque supere el máximo, para que un lote grande no se
+                rechace siempre
+
+        Returns:
+            (valor devuelto, tiempos por etapa)
+        """
+        if self._pending > 0 and self._pending + weight > self.max_pending:
+            raise InferenceQueueFullError(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        call = (_call_service, model_key, method, args, kwargs, time.time())
+        try:
+            future = self._get_executor().submit(*call)
+        except BrokenProcessPool:
+            self._executor = None
+            future = self._get_executor().submit(*call)
+
+        # El cupo se libera cuando termina el trabajo, aunque el cliente se
+        # haya desconectado antes
+        self._pending += weight
+
+        def on_done(_future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._release, weight)
+            except RuntimeError:
+                # El event loop ya se cerró (apagado del servidor)
+                pass
+
+        future.add_done_callback(on_done)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._executor = None
+            raise
+
+    def shutdown(self) -> None:
+        """Detiene el pool de workers"""
+        self.ready = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instancia global del executor
+inference_executor = InferenceExecutor(
+    pool=settings.inference_pool,
+    max_workers=settings.inference_workers,
+    queue_size=settings.inference_queue_size,
+    retry_after=settings.inference_retry_after
+)
+
+INFERENCE_IN_FLIGHT.set_function(
+    lambda: min(inference_executor.pending, inference_executor.max_workers)
+)
+INFERENCE_QUEUE_DEPTH.set_function(
+    lambda: max(0, inference_executor.pending - inference_executor.max_workers)
+)
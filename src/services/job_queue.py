@@ -0,0 +1,279 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.core.config import settings
+from src.services.job_store import JobStore
+from src.services.ocr_pipeline import ocr_pipeline
+from src.services.structure_pipeline import structure_pipeline
+from src.utils.document_pages import DocumentPage, is_document, split_document
+from src.utils.http_client import http_client
+from src.utils.image_downloader import download_image_bytes
+from src.utils.result_encoding import filter_by_confidence
+
+# Un handler recibe el payload del trabajo y devuelve su resultado
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Cada cuánto se purgan los trabajos terminados antiguos
+_PURGE_INTERVAL_SECONDS = 600
+
+
+class JobQueue:
+    """
+    Cola de trabajos asíncronos persistida en un JobStore
+
+    Un número fijo de workers en segundo plano (tareas del event loop)
+    reclama los trabajos por prioridad. Como cada worker procesa un trabajo a
+    la vez, los trabajos nunca ocupan más de `workers` huecos del pool de
+    inferencia y el OCR interactivo sigue teniendo capacidad. Las operaciones
+    sobre el almacén se ejecutan en hilos, fuera del event loop.
+    """
+
+    def __init__(
+        self,
+        store_path: str,
+        workers: int = 1,
+        retention_hours: float = 24,
+        webhook_timeout: float = 10.0,
+        webhook_retries: int = 3
+    ):
+        """
+        Args:
+            store_path: Ruta del archivo SQLite de trabajos
+            workers: Trabajos ejecutándose a la vez
+            retention_hours: Horas que se conservan los trabajos terminados
+            webhook_timeout: Timeout de cada intento de notificación
+            webhook_retries: Intentos de notificación antes de darla por fallida
+        """
+        self.store_path = store_path
+        self.workers = workers
+        self.retention = retention_hours * 3600
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = webhook_retries
+        self._store: Optional[JobStore] = None
+        self._store_lock = threading.Lock()
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_purge = 0.0
+
+    @property
+    def store(self) -> JobStore:
+        # Se abre en el primer uso para que importar el módulo no cree archivos
+        with self._store_lock:
+            if self._store is None:
+                self._store = JobStore(self.store_path)
+            return self._store
+
+    async def _store_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecuta una operación del almacén en un hilo: SQLite puede esperar a
+        otros escritores y no debe bloquear el event loop
+        """
+        return await asyncio.to_thread(lambda: getattr(self.store, method)(*args, **kwargs))
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Asocia un tipo de trabajo con la función que lo ejecuta"""
+        self._handlers[job_type] = handler
+
+    async def submit(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        priority: str = "normal",
+        webhook_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Encola un trabajo y despierta a los workers
+
+        Args:
+            job_type: Tipo de trabajo registrado
+            payload: Parámetros del trabajo
+            priority: 'high', 'normal' o 'low'
+            webhook_url: URL a notificar al terminar
+
+        Returns:
+            El trabajo creado (estado 'queued')
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Tipo de trabajo no soportado: {job_type}")
+
+        job = await self._store_call("create", job_type, payload, priority, webhook_url)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve un trabajo por id o None si no existe"""
+        return await self._store_call("get", job_id)
+
+    async def start(self, requeue: bool = True) -> None:
+        """
+        Reencola los trabajos interrumpidos y arranca los workers
+
+        Args:
+            requeue: Reencolar los trabajos en 'running'. Con varios procesos
+                sobre el mismo almacén lo hace el proceso padre una sola vez;
+                si no, un proceso reencolaría los trabajos de los demás
+        """
+        if requeue:
+            requeued = await self._store_call("requeue_running")
+            if requeued:
+                print(f"Trabajos reencolados tras el reinicio: {requeued}")
+        await self._purge()
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))
+        ]
+
+    async def stop(self) -> None:
+        """
+        Detiene los workers; los trabajos a medias quedan en 'running' y se
+        reencolan en el siguiente arranque
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _purge(self) -> None:
+        self._last_purge = time.monotonic()
+        if self.retention > 0:
+            await self._store_call("purge_finished", self.retention)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._store_call("claim_next")
+            if job is None:
+                if time.monotonic() - self._last_purge > _PURGE_INTERVAL_SECONDS:
+                    await self._purge()
+                # Esperar a un trabajo nuevo (o revisar la cola cada segundo)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        handler = self._handlers.get(job["type"])
+        try:
+            if handler is None:
+                raise ValueError(f"Tipo de trabajo no soportado: {job['type']}")
+            result = await handler(job["payload"])
+            await self._store_call("complete", job["id"], result)
+        except Exception as e:
+            await self._store_call("fail", job["id"], str(e) or type(e).__name__)
+
+        if job["webhook_url"]:
+            await self._notify(job["id"])
+
+    async def _notify(self, job_id: str) -> None:
+        """Envía el trabajo terminado al webhook, con reintentos y backoff"""
+        # Import local: el schema de la respuesta vive en la capa de API
+        from src.schemas.jobs import JobResponse
+
+        job = await self._store_call("get", job_id)
+        body = JobResponse(**job).model_dump(mode="json")
+
+        for attempt in range(self.webhook_retries):
+            try:
+                response = await http_client.get_client().post(
+                    job["webhook_url"], json=body, timeout=self.webhook_timeout
+                )
+                response.raise_for_status()
+                await self._store_call("set_webhook_status", job_id, "delivered")
+                return
+            except Exception as e:
+                print(f"Error notificando el trabajo {job_id} (intento {attempt + 1}): {e}")
+                if attempt + 1 < self.webhook_retries:
+                    await asyncio.sleep(2 ** attempt)
+
+        await self._store_call("set_webhook_status", job_id, "failed")
+
+
+async def run_ocr_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handler de los trabajos 'ocr': descarga la imagen y extrae el texto
+
+    Args:
+        payload: image_url, min_confidence, lang, profile, pages y dpi
+
+    Returns:
+        Resultado con la misma forma que OCRResponse
+    """
+    image_data = await download_image_bytes(payload["image_url"])
+    if not image_data:
+        raise ValueError("No se pudo descargar la imagen desde la URL")
+
+    page_results = await ocr_pipeline.extract_pages(
+        image_data,
+        lang=payload.get("lang"),
+        pages=payload.get("pages"),
+        dpi=payload.get("dpi"),
+        wait=True,
+        profile=payload.get("profile")
+    )
+
+    min_confidence = payload.get("min_confidence") or 0.0
+    pages = []
+    for page_index, results in page_results:
+        results = filter_by_confidence(results, min_confidence)
+        pages.append({"page_index": page_index, "results": results, "total_lines": len(results)})
+
+    results = [line for page in pages for line in page["results"]]
+    return {
+        "success": True,
+        "results": results,
+        "total_lines": len(results),
+        "pages": pages if is_document(image_data) else None
+    }
+
+
+async def run_structure_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handler de los trabajos 'structure': analiza el documento con PP-StructureV3
+
+    Args:
+        payload: image_url, lang, pages, dpi y structure (sub-módulos a ejecutar)
+
+    Returns:
+        Páginas con la misma forma que las líneas de /ocr/structure
+    """
+    image_data = await download_image_bytes(payload["image_url"])
+    if not image_data:
+        raise ValueError("No se pudo descargar la imagen desde la URL")
+
+    parts = await asyncio.to_thread(
+        split_document, image_data, payload.get("pages"), payload.get("dpi")
+    )
+    options = payload.get("structure") or {}
+    pages = []
+    async for index, result in structure_pipeline.analyze_pages(
+        parts, payload.get("lang"), **options
+    ):
+        if isinstance(result, Exception):
+            raise result
+        part = parts[index]
+        page_index = part.index if isinstance(part, DocumentPage) else index
+        pages.append({"page_index": page_index, "success": True, **result})
+
+    pages.sort(key=lambda page: page["page_index"])
+    return {"success": True, "pages": pages}
+
+
+# Instancia global de la cola de trabajos
+job_queue = JobQueue(
+    store_path=settings.job_store_path,
+    workers=settings.job_workers,
+    retention_hours=settings.job_retention_hours,
+    webhook_timeout=settings.job_webhook_timeout,
+    webhook_retries=settings.job_webhook_retries
+)
+job_queue.register("ocr", run_ocr_job)
+job_queue.register("structure", run_structure_job)
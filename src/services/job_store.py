@@ -0,0 +1,187 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Prioridades de los trabajos: menor valor = se atiende antes
+JOB_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    webhook_url TEXT,
+    webhook_status TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+"""
+
+
+class JobStore:
+    """
+    Almacén persistente de trabajos asíncronos sobre SQLite
+
+    Estados: queued -> running -> succeeded | failed. Los trabajos que estaban
+    en ejecución cuando se detuvo el servidor vuelven a la cola al arrancar.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ruta del archivo SQLite (':memory:' para pruebas)
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        priority: str = "normal",
+        webhook_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Encola un trabajo nuevo
+
+        Args:
+            job_type: Tipo de trabajo (decide qué handler lo ejecuta)
+            payload: Parámetros del trabajo (serializables a JSON)
+            priority: 'high', 'normal' o 'low'
+            webhook_url: URL a notificar al terminar
+
+        Returns:
+            El trabajo creado
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, type, status, priority, payload, webhook_url, created_at)"
+                " VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, job_type, JOB_PRIORITIES[priority], json.dumps(payload),
+                 webhook_url, time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve un trabajo por id o None si no existe"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Marca como en ejecución el siguiente trabajo en cola (por prioridad y antigüedad)
+
+        Returns:
+            El trabajo reclamado o None si la cola está vacía
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued'"
+                    " ORDER BY priority, created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                        (time.time(), row["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row else None
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Guarda el resultado de un trabajo terminado"""
+        self._finish(job_id, "succeeded", result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Marca un trabajo como fallido"""
+        self._finish(job_id, "failed", error=error)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?"
+                " WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def set_webhook_status(self, job_id: str, status: str) -> None:
+        """Registra si el webhook se entregó ('delivered') o no ('failed')"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET webhook_status = ? WHERE id = ?", (status, job_id)
+            )
+
+    def requeue_running(self) -> int:
+        """
+        Devuelve a la cola los trabajos interrumpidos por un reinicio
+
+        Returns:
+            Número de trabajos reencolados
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """
+        Elimina los trabajos terminados hace más del tiempo indicado
+
+        Returns:
+            Número de trabajos eliminados
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (time.time() - older_than_seconds,)
+            )
+        return cursor.rowcount
+
+    def count(self, status: str) -> int:
+        """Número de trabajos en un estado"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["priority"] = next(
+            name for name, value in JOB_PRIORITIES.items() if value == job["priority"]
+        )
+        return job
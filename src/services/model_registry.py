@@ -0,0 +1,306 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from src.core.config import settings
+from src.core.metrics import stage_timer
+
+# Clave de un modelo cargado: (idioma, variante, dispositivo)
+ModelKey = Tuple[str, str, str]
+
+# Variantes de modelo: opciones adicionales para PaddleOCR. La detección
+# "mobile" es mucho más ligera que la "server"; el reconocimiento lo elige
+# PaddleOCR según el idioma, salvo en las variantes de VARIANT_RECOGNIZERS.
+MODEL_VARIANTS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "mobile": {"text_detection_model_name": "PP-OCRv5_mobile_det"},
+    "server": {"text_detection_model_name": "PP-OCRv5_server_det"},
+    # Detección y reconocimiento PP-OCRv6 más pequeños
+    "fast": {"text_detection_model_name": "PP-OCRv6_tiny_det"},
+    # Los modelos PP-OCRv6 más grandes y la clasificación de la orientación
+    # de cada línea (endereza las líneas giradas 180° antes de reconocerlas)
+    "accurate": {
+        "text_detection_model_name": "PP-OCRv6_medium_det",
+        "use_textline_orientation": True
+    }
+}
+
+# Idiomas que leen los reconocedores PP-OCRv6: chino, inglés, japonés y los
+# alfabetos latinos (los mismos para los que PaddleOCR los usa por defecto)
+PPOCRV6_LANGS = frozenset({
+    "af", "az", "bs", "ca", "ch", "chinese_cht", "cs", "cy", "da", "de", "en",
+    "es", "et", "eu", "fi", "fr", "french", "ga", "german", "gl", "hr", "hu",
+    "id", "is", "it", "japan", "ku", "la", "lb", "lt", "lv", "mi", "ms", "mt",
+    "nl", "no", "oc", "pl", "pt", "qu", "rm", "ro", "rs_latin", "sk", "sl",
+    "sq", "sv", "sw", "tl", "tr", "uz", "vi"
+})
+
+# Reconocedor por idioma de las variantes que lo fijan. Un idioma que no
+# está en la tabla no se puede pedir con la variante: su reconocedor no
+# sabría leerlo
+VARIANT_RECOGNIZERS: Dict[str, Dict[str, str]] = {
+    "fast": dict.fromkeys(PPOCRV6_LANGS, "PP-OCRv6_small_rec"),
+    "accurate": dict.fromkeys(PPOCRV6_LANGS, "PP-OCRv6_medium_rec")
+}
+
+# Perfiles que se pueden pedir por petición (`profile`) y la variante que usa
+# cada uno. 'balanced' son los modelos por defecto de PaddleOCR.
+MODEL_PROFILES: Dict[str, str] = {
+    "fast": "fast",
+    "balanced": "default",
+    "accurate": "accurate"
+}
+
+# Variante reservada para el pipeline de estructura (PP-StructureV3), que
+# comparte el registro y el presupuesto de memoria con los modelos de OCR
+STRUCTURE_VARIANT = "structure"
+
+# Sub-módulos pesados de PP-StructureV3 que se activan por petición
+STRUCTURE_MODULES = ("table", "formula", "chart", "seal")
+
+# Sufijo de las variantes de las que solo se cargan el reconocimiento y la
+# orientación de línea (la segunda pasada de la cascada no detecta)
+RECOGNITION_SUFFIX = "+rec"
+
+
+class UnknownModelError(ValueError):
+    """Se pidió un idioma, una variante o un perfil de modelo no disponible"""
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def available_langs() -> List[str]:
+    """Idiomas que se pueden pedir por petición (incluye siempre el de por defecto)"""
+    langs = _split(settings.ocr_langs)
+    if settings.ocr_lang not in langs:
+        langs.insert(0, settings.ocr_lang)
+    return langs
+
+
+def resolve_model_key(
+    lang: Optional[str] = None,
+    variant: Optional[str] = None
+) -> ModelKey:
+    """
+    Construye la clave del modelo para una petición
+
+    Args:
+        lang: Idioma pedido (None = OCR_LANG)
+        variant: Variante pedida (None = OCR_MODEL_VARIANT)
+
+    Returns:
+        Clave (idioma, variante, dispositivo)
+
+    Raises:
+        UnknownModelError: Si el idioma o la variante no están disponibles
+    """
+    lang = lang or settings.ocr_lang
+    variant = variant or settings.ocr_model_variant
+
+    if lang not in available_langs():
+        raise UnknownModelError(
+            f"Idioma no disponible: {lang} (disponibles: {', '.join(available_langs())})"
+        )
+    if variant not in MODEL_VARIANTS:
+        raise UnknownModelError(f"Variante de modelo no disponible: {variant}")
+    recognizers = VARIANT_RECOGNIZERS.get(variant)
+    if recognizers is not None and lang not in recognizers:
+        raise UnknownModelError(
+            f"La variante '{variant}' no tiene reconocedor para el idioma '{lang}'"
+        )
+    return (lang, variant, settings.ocr_device)
+
+
+def variant_options(key: ModelKey) -> Dict[str, Any]:
+    """
+    Opciones de PaddleOCR de un modelo: las de su variante y, si la variante
+    lo fija, el reconocedor de su idioma
+
+    Args:
+        key: Clave devuelta por resolve_model_key()
+    """
+    lang, variant, _ = key
+    options = dict(MODEL_VARIANTS[variant])
+    recognizer = VARIANT_RECOGNIZERS.get(variant, {}).get(lang)
+    if recognizer is not None:
+        options["text_recognition_model_name"] = recognizer
+    return options
+
+
+def profile_variant(profile: Optional[str] = None) -> Optional[str]:
+    """
+    Variante de modelo de un perfil
+
+    Args:
+        profile: 'fast', 'balanced' o 'accurate' (None = OCR_MODEL_VARIANT)
+
+    Raises:
+        UnknownModelError: Si el perfil no existe
+    """
+    if profile is None:
+        return None
+    if profile not in MODEL_PROFILES:
+        raise UnknownModelError(
+            f"Perfil no disponible: {profile} (disponibles: {', '.join(MODEL_PROFILES)})"
+        )
+    return MODEL_PROFILES[profile]
+
+
+def structure_model_key(lang: Optional[str] = None) -> ModelKey:
+    """
+    Clave del pipeline de estructura para un idioma
+
+    Raises:
+        UnknownModelError: Si el idioma no está disponible
+    """
+    lang, _, device = resolve_model_key(lang)
+    return (lang, STRUCTURE_VARIANT, device)
+
+
+def recognition_model_key(key: ModelKey) -> ModelKey:
+    """
+    Clave del modelo de solo reconocimiento de una variante
+
+    Raises:
+        UnknownModelError: Si la variante no fija su modelo de reconocimiento
+    """
+    lang, variant, device = key
+    if "text_recognition_model_name" not in variant_options(key):
+        raise UnknownModelError(
+            f"La variante '{variant}' no fija un modelo de reconocimiento propio"
+        )
+    return (lang, variant + RECOGNITION_SUFFIX, device)
+
+
+def configured_structure_modules() -> List[str]:
+    """Sub-módulos cargados según STRUCTURE_MODULES (los únicos que se pueden pedir)"""
+    modules = [m.strip() for m in settings.structure_modules.split(",") if m.strip()]
+    return [m for m in modules if m in STRUCTURE_MODULES]
+
+
+def default_model_key() -> ModelKey:
+    """Clave del modelo por defecto (el que se precarga y calienta)"""
+    return resolve_model_key()
+
+
+def pinned_model_keys() -> List[ModelKey]:
+    """Modelos que nunca se descargan: el de por defecto y OCR_PINNED_LANGS"""
+    keys = [default_model_key()]
+    for lang in _split(settings.ocr_pinned_langs):
+        key = resolve_model_key(lang)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def _current_rss() -> int:
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+class ModelRegistry:
+    """
+    Modelos de OCR cargados en un worker, indexados por (idioma, variante, dispositivo)
+
+    Los modelos se cargan en el primer uso. Si la memoria estimada supera el
+    presupuesto, se descargan los menos usados recientemente, salvo los fijados.
+    La memoria de cada modelo se estima por el aumento de RSS al cargarlo.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[ModelKey], Any],
+        memory_budget_mb: int = 0,
+        pinned: Iterable[ModelKey] = ()
+    ):
+        """
+        Args:
+            factory: Función que crea el servicio de OCR de una clave
+            memory_budget_mb: Memoria máxima para los modelos (0 = sin límite)
+            pinned: Claves que no se descargan nunca
+        """
+        self.factory = factory
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.pinned = set(pinned)
+        # clave -> (servicio, bytes estimados), del menos al más usado
+        self._models: "OrderedDict[ModelKey, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key: ModelKey) -> Any:
+        """
+        Devuelve el servicio de la clave, cargándolo si hace falta
+
+        Args:
+            key: Clave del modelo
+
+        Returns:
+            Servicio de OCR
+        """
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                return entry[0]
+
+            with stage_timer("model_load"):
+                before = _current_rss()
+                service = self.factory(key)
+                size = max(0, _current_rss() - before)
+
+            self._models[key] = (service, size)
+            self.loads += 1
+            self._evict(keep=key)
+            return service
+
+    def add(self, key: ModelKey, service: Any, size: int = 0) -> None:
+        """Registra un servicio ya creado (p. ej. la instancia global)"""
+        with self._lock:
+            self._models[key] = (service, size)
+            self._evict(keep=key)
+
+    def _evict(self, keep: ModelKey) -> None:
+        """Descarga modelos LRU hasta volver a entrar en el presupuesto"""
+        if self.memory_budget <= 0:
+            return
+
+        while self.memory_bytes > self.memory_budget:
+            victim = next(
+                (key for key in self._models if key != keep and key not in self.pinned),
+                None
+            )
+            if victim is None:
+                break
+            del self._models[victim]
+            self.evictions += 1
+            gc.collect()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memoria estimada de los modelos cargados"""
+        return sum(size for _, size in self._models.values())
+
+    def loaded(self) -> List[ModelKey]:
+        """Claves cargadas, de la menos a la más usada recientemente"""
+        with self._lock:
+            return list(self._models)
+
+    def stats(self) -> Dict[str, Any]:
+        """Modelos cargados, memoria estimada y contadores de cargas y descargas"""
+        with self._lock:
+            return {
+                "models": [
+                    {"key": list(key), "memory_mb": round(size / (1024 * 1024), 1)}
+                    for key, (_, size) in self._models.items()
+                ],
+                "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+                "memory_budget_mb": round(self.memory_budget / (1024 * 1024), 1),
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
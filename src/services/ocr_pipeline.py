@@ -0,0 +1,398 @@
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.core.config import settings
+from src.core.metrics import CASCADE_LINES, COALESCED_REQUESTS, TEXT_LINES_PER_IMAGE
+from src.services.batcher import MicroBatcher, ocr_batcher
+from src.services.inference_executor import (
+    InferenceExecutor,
+    InferenceQueueFullError,
+    inference_executor
+)
+from src.services.model_registry import (
+    VARIANT_RECOGNIZERS,
+    ModelKey,
+    UnknownModelError,
+    profile_variant,
+    recognition_model_key,
+    resolve_model_key,
+    variant_options
+)
+from src.services.result_cache import OCRResultCache
+from src.utils.document_pages import DocumentPage, is_document, split_document
+from src.utils.image_preprocessing import configured_max_side
+from src.utils.single_flight import SingleFlight
+
+# Modos de OCR: detección + reconocimiento, solo detección o solo reconocimiento
+OCR_MODES = ("full", "detection", "recognition")
+
+
+class OCRPipeline:
+    """
+    Punto de entrada asíncrono del OCR para las rutas
+
+    Consulta el cache de resultados y, si no hay acierto, envía la imagen al
+    scheduler de lotes o directamente al pool de inferencia. Las peticiones
+    concurrentes con la misma imagen y el mismo modelo comparten una única
+    inferencia, aunque el cache esté desactivado.
+
+    Con la cascada activada, el OCR completo de las peticiones sin perfil
+    se hace con el perfil `cascade_first_profile` (el rápido), las líneas con
+    confianza menor que `cascade_threshold` se reconocen de nuevo con el
+    reconocedor del perfil `cascade_profile` y se queda, por línea, el
+    resultado más fiable: la mayoría de las líneas solo pasan por el modelo
+    rápido. Del perfil de la cascada solo se cargan el reconocimiento y la
+    orientación de línea, y no se usa con idiomas que su reconocedor no lee.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        batcher: Optional[MicroBatcher] = None,
+        cache: Optional[OCRResultCache] = None,
+        model_config: str = "",
+        cascade_threshold: float = 0.0,
+        cascade_profile: str = "accurate",
+        cascade_first_profile: str = "fast"
+    ):
+        """
+        Args:
+            executor: Pool de inferencia
+            batcher: Scheduler de micro-batching (None para no agrupar)
+            cache: Cache de resultados (None para desactivarlo)
+            model_config: Identificador de la configuración común a todos los
+                modelos (p. ej. el preprocesado); se combina con el modelo pedido
+            cascade_threshold: Confianza por debajo de la cual una línea se
+                reconoce de nuevo (0 = sin cascada)
+            cascade_profile: Perfil del modelo de la segunda pasada; tiene que
+                fijar su propio modelo de reconocimiento
+            cascade_first_profile: Perfil de la primera pasada de las
+                peticiones sin perfil
+
+        Raises:
+            UnknownModelError: Si la cascada está activada y los perfiles no
+                existen o el de la segunda pasada no fija su reconocedor
+        """
+        if cascade_threshold > 0:
+            profile_variant(cascade_first_profile)
+            if profile_variant(cascade_profile) not in VARIANT_RECOGNIZERS:
+                raise UnknownModelError(
+                    f"El perfil de la cascada '{cascade_profile}' no fija su reconocedor"
+                )
+
+        self.executor = executor
+        self.batcher = batcher
+        self.cache = cache
+        self.model_config = model_config
+        self.cascade_threshold = cascade_threshold
+        self.cascade_profile = cascade_profile
+        self.cascade_first_profile = cascade_first_profile
+        self._inflight = SingleFlight(COALESCED_REQUESTS.labels(kind="inference"))
+
+    async def extract(
+        self,
+        image_data: Union[bytes, DocumentPage],
+        lang: Optional[str] = None,
+        mode: str = "full",
+        regions: Optional[List[List[float]]] = None,
+        boxes: Optional[List[List[List[float]]]] = None,
+        profile: Optional[str] = None,
+        document_digest: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Extrae el texto de una imagen sin filtrar por confianza
+
+        Args:
+            image_data: Contenido de la imagen o página de un documento
+            lang: Idioma del modelo (None = OCR_LANG)
+            mode: 'full', 'detection' (solo cajas) o 'recognition' (solo el
+                texto de `boxes`)
+            regions: Rectángulos [x1, y1, x2, y2] a los que limitar el OCR
+            boxes: Cajas a reconocer en el modo 'recognition'
+            profile: Perfil de modelo ('fast', 'balanced' o 'accurate';
+                None = OCR_MODEL_VARIANT, o el de la primera pasada si hay
+                cascada)
+            document_digest: SHA-256 del documento de la página, calculado una
+                vez para todas sus páginas (None = hash de la propia página)
+
+        Returns:
+            Lista de resultados con coordenadas y texto detectado
+
+        Raises:
+            UnknownModelError: Si el idioma o el perfil no están disponibles
+            ValueError: Si el modo no es válido
+        """
+        if mode not in OCR_MODES:
+            raise ValueError(f"Modo de OCR no válido: '{mode}'")
+
+        model_key = self._first_pass_key(lang, profile, mode)
+        model_config = ":".join(model_key) + ":" + self.model_config
+        cascade_key = self._cascade_key(model_key, mode)
+        if cascade_key is not None:
+            model_config += f":cascade={':'.join(cascade_key)}<{self.cascade_threshold}"
+        if mode != "full" or regions:
+            model_config += f":{mode}:{regions if mode != 'recognition' else boxes}"
+        if isinstance(image_data, DocumentPage):
+            # Con el hash del documento no hace falta volver a leer la página
+            key = OCRResultCache.make_key(
+                document_digest.encode() if document_digest else image_data.data,
+                model_config + f":page={image_data.index}:dpi={image_data.dpi}"
+            )
+        else:
+            key = OCRResultCache.make_key(image_data, model_config)
+
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        return await self._inflight.do(
+            key,
+            lambda: self._infer(
+                key, image_data, model_key, mode, regions, boxes, cascade_key
+            )
+        )
+
+    async def extract_waiting(
+        self,
+        image_data: Union[bytes, DocumentPage],
+        lang: Optional[str] = None,
+        poll_interval: float = 1.0,
+        **options: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Igual que extract(), pero con la cola de inferencia llena espera a que
+        haya hueco en lugar de fallar (para lotes y trabajos en segundo plano)
+
+        Args:
+            image_data: Contenido de la imagen o página de un documento
+            lang: Idioma del modelo (None = OCR_LANG)
+            poll_interval: Espera máxima entre reintentos en segundos
+            **options: Opciones de extract() (mode, regions, boxes, profile)
+
+        Returns:
+            Lista de resultados con coordenadas y texto detectado
+        """
+        while True:
+            try:
+                return await self.extract(image_data, lang=lang, **options)
+            except InferenceQueueFullError as e:
+                await asyncio.sleep(min(e.retry_after, poll_interval))
+
+    async def extract_pages(
+        self,
+        image_data: bytes,
+        lang: Optional[str] = None,
+        pages: Optional[str] = None,
+        dpi: Optional[int] = None,
+        wait: bool = False,
+        **options: Any
+    ) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Extrae el texto de una imagen o de las páginas de un PDF/TIFF
+
+        Las páginas se rasterizan en los workers de inferencia y se procesan
+        en paralelo (hasta BATCH_CONCURRENCY a la vez); las que no se piden no
+        se rasterizan.
+
+        Args:
+            image_data: Contenido de la imagen o documento
+            lang: Idioma del modelo (None = OCR_LANG)
+            pages: Selección de páginas del documento ('1-3,5'); None = todas
+            dpi: Resolución de rasterizado de los PDF (None = DOCUMENT_DPI)
+            wait: Esperar si la cola de inferencia está llena en lugar de fallar
+                (siempre se espera con varias páginas)
+            **options: Opciones de extract() (mode, regions, boxes, profile), comunes
+                a todas las páginas
+
+        Returns:
+            Lista de (índice de página base 0, resultados) en orden de página
+
+        Raises:
+            ValueError: Si la selección de páginas no es válida
+        """
+        parts, digest = await asyncio.to_thread(_split_document, image_data, pages, dpi)
+        if digest is not None:
+            options["document_digest"] = digest
+        extract = self.extract_waiting if wait or len(parts) > 1 else self.extract
+        semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+
+        async def run(part: Union[bytes, DocumentPage]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await extract(part, lang=lang, **options)
+
+        results = await asyncio.gather(*(run(part) for part in parts))
+        return [
+            (part.index if isinstance(part, DocumentPage) else 0, page_results)
+            for part, page_results in zip(parts, results)
+        ]
+
+    async def _infer(
+        self,
+        key: str,
+        image_data: Union[bytes, DocumentPage],
+        model_key: ModelKey,
+        mode: str = "full",
+        regions: Optional[List[List[float]]] = None,
+        boxes: Optional[List[List[List[float]]]] = None,
+        cascade_key: Optional[ModelKey] = None
+    ) -> List[Dict[str, Any]]:
+        """Inferencia efectiva (una por imagen, modelo y opciones en vuelo)"""
+        # Los modos parciales y las regiones solo ejecutan los sub-modelos
+        # necesarios, así que no se agrupan con el OCR completo
+        if mode == "detection":
+            results = await self.executor.run(
+                "detect_text", image_data, regions, model_key=model_key
+            )
+        elif mode == "recognition":
+            results = await self.executor.run(
+                "recognize_text", image_data, boxes or [], model_key=model_key
+            )
+        elif regions:
+            results = await self.executor.run(
+                "extract_regions", image_data, regions, model_key=model_key
+            )
+        elif self.batcher is not None:
+            results = await self.batcher.submit(image_data, model_key)
+        else:
+            results = await self.executor.run(
+                "extract_text", image_data, model_key=model_key
+            )
+        TEXT_LINES_PER_IMAGE.observe(len(results))
+
+        cacheable = True
+        if cascade_key is not None:
+            results, cacheable = await self._cascade(image_data, results, cascade_key)
+
+        if self.cache is not None and cacheable:
+            await self.cache.aset(key, results)
+        return results
+
+    def _first_pass_key(
+        self,
+        lang: Optional[str],
+        profile: Optional[str],
+        mode: str
+    ) -> ModelKey:
+        """
+        Modelo que atiende la petición: el del perfil pedido o, sin perfil y
+        con la cascada activada, el de la primera pasada si lee el idioma
+        """
+        if profile is None and mode == "full" and self.cascade_threshold > 0:
+            try:
+                return resolve_model_key(lang, profile_variant(self.cascade_first_profile))
+            except UnknownModelError:
+                pass
+        return resolve_model_key(lang, profile_variant(profile))
+
+    def _cascade_key(self, model_key: ModelKey, mode: str) -> Optional[ModelKey]:
+        """
+        Modelo de la segunda pasada, o None si no hay cascada para la petición:
+        en los modos parciales, si el reconocedor de la cascada no lee el
+        idioma o si no aportaría nada (mismo reconocedor y misma orientación)
+        """
+        if self.cascade_threshold <= 0 or mode != "full":
+            return None
+        lang, variant, _ = model_key
+        cascade_variant = profile_variant(self.cascade_profile)
+        if cascade_variant == variant:
+            return None
+        try:
+            cascade_key = resolve_model_key(lang, cascade_variant)
+        except UnknownModelError:
+            return None
+
+        first, second = variant_options(model_key), variant_options(cascade_key)
+        if all(
+            first.get(option) == second.get(option)
+            for option in ("text_recognition_model_name", "use_textline_orientation")
+        ):
+            return None
+        return recognition_model_key(cascade_key)
+
+    async def _cascade(
+        self,
+        image_data: Union[bytes, DocumentPage],
+        results: List[Dict[str, Any]],
+        cascade_key: ModelKey
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Reconoce de nuevo las líneas poco fiables con el modelo de la cascada
+
+        Solo se ejecuta el reconocimiento sobre las cajas ya detectadas, y cada
+        línea se queda con el texto de la pasada con mayor confianza.
+
+        Returns:
+            (resultados combinados, si se pueden guardar en el cache); con la
+            cola de inferencia llena se devuelven los de la primera pasada y
+            no se cachean
+        """
+        pending = [
+            index for index, line in enumerate(results)
+            if line["confidence"] < self.cascade_threshold
+        ]
+        if not pending:
+            return results, True
+
+        try:
+            rerun = await self.executor.run(
+                "recognize_text",
+                image_data,
+                [results[index]["box"] for index in pending],
+                model_key=cascade_key
+            )
+        except InferenceQueueFullError:
+            CASCADE_LINES.labels(outcome="skipped").inc(len(pending))
+            return results, False
+
+        # Los resultados pueden estar compartidos con otras peticiones del
+        # mismo lote: se copian en lugar de modificarlos
+        merged = list(results)
+        improved = 0
+        for index, line in zip(pending, rerun):
+            if line["confidence"] > merged[index]["confidence"]:
+                merged[index] = {
+                    **merged[index],
+                    "text": line["text"],
+                    "confidence": line["confidence"]
+                }
+                improved += 1
+        CASCADE_LINES.labels(outcome="improved").inc(improved)
+        CASCADE_LINES.labels(outcome="kept").inc(len(pending) - improved)
+        return merged, True
+
+
+def _create_cache() -> Optional[OCRResultCache]:
+    if not settings.cache_enabled:
+        return None
+    return OCRResultCache(
+        max_entries=settings.cache_max_entries,
+        ttl_seconds=settings.cache_ttl_seconds,
+        disk_dir=settings.cache_dir,
+        disk_max_bytes=settings.cache_dir_max_mb * 1024 * 1024
+    )
+
+
+def _split_document(
+    data: bytes,
+    pages: Optional[str],
+    dpi: Optional[int]
+) -> Tuple[List[Union[bytes, DocumentPage]], Optional[str]]:
+    """Divide el documento y calcula su hash una sola vez (None si es una imagen)"""
+    parts = split_document(data, pages, dpi)
+    if not is_document(data):
+        return parts, None
+    return parts, hashlib.sha256(data).hexdigest()
+
+
+# Instancia global del pipeline
+ocr_pipeline = OCRPipeline(
+    inference_executor,
+    batcher=ocr_batcher if settings.batch_window_ms > 0 else None,
+    cache=_create_cache(),
+    model_config=f"{configured_max_side()}:{settings.inference_backend}",
+    cascade_threshold=settings.cascade_threshold,
+    cascade_profile=settings.cascade_profile,
+    cascade_first_profile=settings.cascade_first_profile
+)
@@ -1,5 +1,137 @@
-from paddleocr import PaddleOCR
-from typing import List, Dict, Any
+import threading
+import time
+import cv2
+import numpy as np
+from paddleocr import PaddleOCR, TextLineOrientationClassification, TextRecognition
+from paddlex.inference.pipelines.components import CropByPolys, rotate_image
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from src.core.config import settings
+from src.core.metrics import record_stage, stage_timer
+from src.services.inference_backends import backend_options
+from src.services.model_registry import (
+    RECOGNITION_SUFFIX,
+    ModelKey,
+    default_model_key,
+    variant_options
+)
+from src.utils.document_pages import DocumentPage
+from src.utils.image_decoder import decode_image
+from src.utils.image_preprocessing import configured_max_side, prepare_image
+from src.utils.reading_order import assemble_text, group_lines
+
+# Entradas aceptadas: ruta de archivo, contenido codificado, imagen decodificada
+# o página de un documento pendiente de rasterizar
+ImageInput = Union[str, bytes, memoryview, np.ndarray, DocumentPage]
+
+# Rectángulo [x1, y1, x2, y2] y cuadrilátero [[x, y] x 4] en coordenadas de la
+# imagen original
+Region = List[float]
+Quad = List[List[float]]
+
+
+class _TimedPredictor:
+    """
+    Envuelve un sub-modelo del pipeline de PaddleX (detección o
+    reconocimiento) y registra el tiempo que pasa generando resultados
+    """
+
+    def __init__(self, predictor: Any, stage: str):
+        self._predictor = predictor
+        self._stage = stage
+
+    def __call__(self, *args, **kwargs) -> Iterator[Any]:
+        # Los predictores devuelven generadores: se mide cada paso
+        iterator = iter(self._predictor(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record_stage(self._stage, time.perf_counter() - start)
+                return
+            record_stage(self._stage, time.perf_counter() - start)
+            yield item
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._predictor, name)
+
+
+def _load_image(image: ImageInput, max_side: Optional[int]) -> Tuple[np.ndarray, float]:
+    """
+    Prepara la entrada para los modelos: decodifica en memoria, normaliza
+    a BGR y reduce la resolución si supera el lado máximo
+
+    Args:
+        image: Ruta, bytes del archivo, array BGR o página de un documento
+        max_side: Lado largo máximo (None = sin límite)
+
+    Returns:
+        (array BGR listo para PaddleOCR, escala aplicada)
+    """
+    with stage_timer("decode"):
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            image = decode_image(image)
+        elif isinstance(image, DocumentPage):
+            image = image.render()
+        elif isinstance(image, str):
+            image = cv2.imread(image, cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError("No se pudo leer la imagen")
+
+    with stage_timer("preprocess"):
+        return prepare_image(image, max_side)
+
+
+def _warmup_image() -> np.ndarray:
+    """Imagen sintética con una línea de texto para los calentamientos"""
+    image = np.full((160, 640, 3), 255, dtype=np.uint8)
+    cv2.putText(
+        image, "Warm-up 0123456789", (20, 100),
+        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3
+    )
+    return image
+
+
+def _recognize_boxes(
+    models: Any,
+    image: np.ndarray,
+    scale: float,
+    boxes: List[Quad]
+) -> List[Dict[str, Any]]:
+    """
+    Reconoce el texto de cada caja con los sub-modelos de `models`
+
+    Args:
+        models: Objeto con la interfaz del pipeline de PaddleX (_crop_by_polys,
+            text_rec_model y, con use_textline_orientation,
+            textline_orientation_model y rotate_image)
+        image: Imagen preprocesada
+        scale: Escala aplicada en el preprocesado
+        boxes: Cuadriláteros en coordenadas de la imagen original
+
+    Returns:
+        Un resultado por caja, en el mismo orden y con la caja tal cual
+    """
+    with stage_timer("inference"):
+        polys = np.asarray(boxes, dtype=np.float32) * scale
+        crops = models._crop_by_polys(image, polys)
+        if getattr(models, "use_textline_orientation", False):
+            angles = [
+                int(np.asarray(info["class_ids"]).ravel()[0])
+                for info in models.textline_orientation_model(crops)
+            ]
+            crops = models.rotate_image(crops, angles)
+        rec_results = list(models.text_rec_model(crops))
+
+    with stage_timer("postprocess"):
+        return [
+            {
+                "box": box,
+                "text": rec_result["rec_text"],
+                "confidence": float(rec_result["rec_score"])
+            }
+            for box, rec_result in zip(boxes, rec_results)
+        ]
 
 
 class PaddleOCRService:
@@ -8,7 +140,10 @@ class PaddleOCRService:
     def __init__(
         self,
         lang: str = "en",
-        device: str = "cpu"
+        device: str = "cpu",
+        batch_size: int = 1,
+        max_side: Optional[int] = None,
+        model_options: Optional[Dict[str, Any]] = None
     ):
         """
         Inicializa el servicio de OCR
@@ -16,36 +151,241 @@ class PaddleOCRService:
         Args:
             lang: Idioma del modelo ('en', 'es', 'ch', etc.)
             device: Dispositivo a usar ('cpu' o 'gpu')
+            batch_size: Imágenes procesadas juntas por predict()
+            max_side: Lado largo máximo antes de la inferencia (None = sin límite)
+            model_options: Opciones adicionales de PaddleOCR (p. ej. nombres de modelo)
         """
-        self.ocr = PaddleOCR(
-            lang=lang,
-            device=device,
-            use_doc_orientation_classify=False,
-            use_doc_unwarping=False,
-            use_textline_orientation=False
-        )
-
-    def extract_text(self, image_path: str) -> List[Dict[str, Any]]:
+        self.max_side = max_side
+        # Los sub-módulos opcionales van desactivados salvo que la variante
+        # del modelo los active (p. ej. la orientación de línea en 'accurate')
+        options = {
+            "use_doc_orientation_classify": False,
+            "use_doc_unwarping": False,
+            "use_textline_orientation": False,
+            **(model_options or {})
+        }
+        self.ocr = PaddleOCR(lang=lang, device=device, **options)
+
+        # Por defecto el pipeline procesa las listas de imágenes de una en una;
+        # se ajusta el tamaño de lote para que predict() con varias imágenes
+        # reconozca las líneas de todas ellas en lotes compartidos. La
+        # detección sigue con lotes de 1: su preprocesado conserva la
+        # proporción de cada imagen y no puede apilar imágenes de tamaños
+        # distintos en un mismo tensor
+        if batch_size > 1:
+            self.ocr.paddlex_pipeline.batch_sampler.batch_size = batch_size
+
+        self._instrument_models()
+
+    def _inner_pipeline(self) -> Any:
+        """Pipeline de PaddleX con los sub-modelos de detección y reconocimiento"""
+        return getattr(self.ocr.paddlex_pipeline, "_pipeline", None)
+
+    def _instrument_models(self) -> None:
+        """Mide por separado la detección y el reconocimiento dentro de predict()"""
+        inner = self._inner_pipeline()
+        if inner is None:
+            return
+
+        for attr, stage in (("text_det_model", "detection"), ("text_rec_model", "recognition")):
+            model = getattr(inner, attr, None)
+            if model is not None and not isinstance(model, _TimedPredictor):
+                setattr(inner, attr, _TimedPredictor(model, stage))
+
+    def extract_text(self, image_path: ImageInput) -> List[Dict[str, Any]]:
         """
         Extrae texto de una imagen
 
         Args:
-            image_path: Ruta de la imagen
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
 
         Returns:
             Lista de resultados con coordenadas y texto detectado
         """
-        result = self.ocr.predict(image_path)
+        image, scale = self._load_image(image_path)
+        with stage_timer("inference"):
+            result = self.ocr.predict(image)
 
         if not result or len(result) == 0:
             return []
 
-        # Formatear resultados
-        formatted_results = []
+        # predict() recibe una sola imagen (las páginas de los documentos se
+        # separan antes), así que el resultado tiene un único elemento
+        with stage_timer("postprocess"):
+            return self._format_page(result[0], scale)
+
+    def extract_batch(
+        self,
+        images: List[ImageInput]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Extrae texto de varias imágenes en una sola llamada a predict()
+
+        Args:
+            images: Lista de imágenes (rutas, bytes o arrays)
+
+        Returns:
+            Lista de resultados por imagen, en el mismo orden de entrada
+        """
+        if not images:
+            return []
+
+        loaded = [self._load_image(image) for image in images]
+        with stage_timer("inference"):
+            result = self.ocr.predict([image for image, _ in loaded])
+
+        with stage_timer("postprocess"):
+            return [
+                self._format_page(page_result, scale)
+                for page_result, (_, scale) in zip(result, loaded)
+            ]
+
+    def extract_regions(
+        self,
+        image_path: ImageInput,
+        regions: List[Region]
+    ) -> List[Dict[str, Any]]:
+        """
+        Extrae texto (detección y reconocimiento) solo dentro de las regiones
+
+        Args:
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
+            regions: Rectángulos [x1, y1, x2, y2] en coordenadas de la imagen
+
+        Returns:
+            Lista de resultados con coordenadas de la imagen completa
+        """
+        image, scale = self._load_image(image_path)
+        crops = self._crop_regions(image, regions, scale)
+        if not crops:
+            return []
+
+        # Cada recorte tiene su propio tamaño: se pasan de uno en uno para
+        # que la detección nunca tenga que apilarlos en un mismo tensor
+        with stage_timer("inference"):
+            result = [
+                page_result
+                for crop, _ in crops
+                for page_result in self.ocr.predict([crop])
+            ]
+
+        with stage_timer("postprocess"):
+            return [
+                line
+                for page_result, (_, offset) in zip(result, crops)
+                for line in self._format_page(page_result, scale, offset)
+            ]
+
+    def detect_text(
+        self,
+        image_path: ImageInput,
+        regions: Optional[List[Region]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Detecta las líneas de texto sin reconocerlas (solo el modelo de detección)
+
+        Args:
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
+            regions: Rectángulos a los que limitar la detección (None = toda la imagen)
+
+        Returns:
+            Lista de cajas con texto vacío; confidence es la puntuación de detección
+        """
+        image, scale = self._load_image(image_path)
+        crops = self._crop_regions(image, regions, scale) if regions else [(image, (0, 0))]
+        if not crops:
+            return []
+
+        inner = self._inner_pipeline()
+        params = inner.get_text_det_params()
+        # De uno en uno, como en extract_regions()
+        with stage_timer("inference"):
+            det_results = [
+                det_result
+                for crop, _ in crops
+                for det_result in inner.text_det_model([crop], **params)
+            ]
+
+        with stage_timer("postprocess"):
+            lines = []
+            for det_result, (_, offset) in zip(det_results, crops):
+                lines.extend(self._format_page(
+                    {"dt_polys": det_result["dt_polys"], "rec_scores": det_result["dt_scores"]},
+                    scale,
+                    offset
+                ))
+            return lines
+
+    def recognize_text(
+        self,
+        image_path: ImageInput,
+        boxes: List[Quad]
+    ) -> List[Dict[str, Any]]:
+        """
+        Reconoce el texto de cajas ya conocidas (solo el modelo de reconocimiento)
+
+        Si el modelo tiene activada la orientación de línea, los recortes
+        girados 180° se enderezan antes de reconocerlos.
+
+        Args:
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
+            boxes: Cuadriláteros en coordenadas de la imagen, p. ej. los que
+                devuelve detect_text()
+
+        Returns:
+            Un resultado por caja, en el mismo orden y con la caja tal cual
+        """
+        if not boxes:
+            return []
+
+        image, scale = self._load_image(image_path)
+        return _recognize_boxes(self._inner_pipeline(), image, scale, boxes)
+
+    def _crop_regions(
+        self,
+        image: np.ndarray,
+        regions: List[Region],
+        scale: float
+    ) -> List[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        Recorta los rectángulos (en coordenadas originales) de la imagen preprocesada
+
+        Returns:
+            Lista de (recorte, desplazamiento x/y en la imagen preprocesada);
+            se descartan las regiones vacías o fuera de la imagen
+        """
+        height, width = image.shape[:2]
+        crops = []
+        for x1, y1, x2, y2 in regions:
+            left, top = max(0, int(x1 * scale)), max(0, int(y1 * scale))
+            right, bottom = min(width, int(np.ceil(x2 * scale))), min(height, int(np.ceil(y2 * scale)))
+            if right > left and bottom > top:
+                crops.append((image[top:bottom, left:right], (left, top)))
+        return crops
+
+    def _load_image(self, image: ImageInput) -> Tuple[np.ndarray, float]:
+        """Prepara la entrada para predict() (ver _load_image del módulo)"""
+        return _load_image(image, self.max_side)
+
+    def _format_page(
+        self,
+        page_result: Dict[str, Any],
+        scale: float = 1.0,
+        offset: Tuple[int, int] = (0, 0)
+    ) -> List[Dict[str, Any]]:
+        """
+        Convierte el resultado de una página de PaddleOCR en la lista de líneas
 
-        # El resultado es una lista, tomamos el primer elemento (primera página)
-        page_result = result[0]
+        Args:
+            page_result: Resultado de predict() para una imagen
+            scale: Escala aplicada en el preprocesado; las cajas se devuelven
+                en coordenadas de la imagen original
+            offset: Posición del recorte dentro de la imagen preprocesada, si
+                page_result es de una región
 
+        Returns:
+            Lista de resultados con coordenadas y texto detectado
+        """
         # Obtener las cajas delimitadoras
         dt_polys = page_result.get('dt_polys', [])
 
@@ -59,47 +399,51 @@ class PaddleOCRService:
         if not rec_scores:
             rec_scores = page_result.get('rec_scores', [])
 
-        # Procesar cada detección
-        for idx in range(len(dt_polys)):
-            texto = rec_texts[idx] if idx < len(rec_texts) else ""
-            score = rec_scores[idx] if idx < len(rec_scores) else 1.0
-            bbox = dt_polys[idx]
-
-            # Convertir numpy array a lista si es necesario
-            if hasattr(bbox, 'tolist'):
-                bbox = bbox.tolist()
-
-            formatted_results.append({
-                "box": bbox,
-                "text": texto,
-                "confidence": float(score)
-            })
-
-        return formatted_results
+        count = len(dt_polys)
+        if count == 0:
+            return []
 
-    def extract_text_only(self, image_path: str) -> str:
+        # Todas las cajas en un único array: volver a la resolución original
+        # y convertir a listas en una sola operación
+        polys = np.asarray(dt_polys, dtype=np.float32)
+        if scale != 1.0 or offset != (0, 0):
+            polys = (polys + offset) / scale
+        boxes = polys.tolist()
+
+        # Las líneas sin texto o sin score se completan con "" y 1.0
+        texts = list(rec_texts[:count]) + [""] * (count - len(rec_texts))
+        scores = np.ones(count, dtype=np.float64)
+        known = min(count, len(rec_scores))
+        scores[:known] = np.asarray(rec_scores[:known], dtype=np.float64)
+
+        return [
+            {"box": box, "text": text, "confidence": score}
+            for box, text, score in zip(boxes, texts, scores.tolist())
+        ]
+
+    def extract_text_only(self, image_path: ImageInput) -> str:
         """
-        Extrae solo el texto de una imagen (sin coordenadas)
+        Extrae solo el texto de una imagen (sin coordenadas), en orden de lectura
 
         Args:
-            image_path: Ruta de la imagen
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
 
         Returns:
             Texto extraído concatenado
         """
         results = self.extract_text(image_path)
-        return "\n".join([r["text"] for r in results])
+        return assemble_text(group_lines(results))
 
     def extract_with_filter(
         self,
-        image_path: str,
+        image_path: ImageInput,
         min_confidence: float = 0.5
     ) -> List[Dict[str, Any]]:
         """
         Extrae texto filtrando por confianza mínima
 
         Args:
-            image_path: Ruta de la imagen
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
             min_confidence: Confianza mínima (0-1)
 
         Returns:
@@ -121,22 +465,172 @@ class PaddleOCRService:
         Returns:
             Diccionario con resultados por imagen
         """
-        results = {}
-        for img_path in image_paths:
-            results[img_path] = self.extract_text(img_path)
-        return results
+        page_results = self.extract_batch(image_paths)
+        return dict(zip(image_paths, page_results))
+
+    def warmup(self, iterations: int = 1) -> None:
+        """
+        Ejecuta inferencias sobre imágenes sintéticas para inicializar los
+        kernels y grafos del modelo antes de la primera petición real
+
+        Args:
+            iterations: Número de pasadas de calentamiento
+        """
+        image = _warmup_image()
+        for _ in range(iterations):
+            self.extract_text(image)
 
 
-# Instancia global del servicio
-ocr_service = PaddleOCRService()
+class TextRecognitionService:
+    """
+    Solo los sub-modelos de reconocimiento y de orientación de línea de un
+    modelo, sin detector: la segunda pasada de la cascada reconoce cajas ya
+    detectadas, así que no necesita cargar el pipeline completo
+    """
+
+    # Opciones de PaddleOCR que también aceptan los modelos sueltos
+    _COMMON_OPTIONS = ("cpu_threads", "engine", "engine_config", "enable_hpi")
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        max_side: Optional[int] = None,
+        model_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            device: Dispositivo a usar ('cpu' o 'gpu')
+            max_side: Lado largo máximo antes de la inferencia (None = sin límite)
+            model_options: Opciones de la variante; tienen que fijar
+                text_recognition_model_name
+        """
+        options = model_options or {}
+        common = {name: options[name] for name in self._COMMON_OPTIONS if name in options}
+        self.max_side = max_side
+        self.use_textline_orientation = bool(options.get("use_textline_orientation"))
+
+        recognizer = TextRecognition(
+            model_name=options["text_recognition_model_name"],
+            model_dir=options.get("text_recognition_model_dir"),
+            device=device,
+            **common
+        )
+        self.text_rec_model = _TimedPredictor(recognizer.paddlex_predictor, "recognition")
+        self.textline_orientation_model = None
+        if self.use_textline_orientation:
+            self.textline_orientation_model = TextLineOrientationClassification(
+                device=device, **common
+            ).paddlex_predictor
+        self._crop_by_polys = CropByPolys(det_box_type="quad")
+
+    def rotate_image(self, crops: List[np.ndarray], angles: List[int]) -> List[np.ndarray]:
+        """Gira 180° los recortes con ángulo 1, como el pipeline de PaddleX"""
+        return [rotate_image(crop, angle * 180) for crop, angle in zip(crops, angles)]
+
+    def recognize_text(
+        self,
+        image_path: ImageInput,
+        boxes: List[Quad]
+    ) -> List[Dict[str, Any]]:
+        """
+        Reconoce el texto de cajas ya conocidas (ver PaddleOCRService.recognize_text)
+
+        Args:
+            image_path: Ruta de la imagen, bytes del archivo o array BGR
+            boxes: Cuadriláteros en coordenadas de la imagen
+
+        Returns:
+            Un resultado por caja, en el mismo orden y con la caja tal cual
+        """
+        if not boxes:
+            return []
+
+        image, scale = _load_image(image_path, self.max_side)
+        return _recognize_boxes(self, image, scale, boxes)
+
+    def warmup(self, iterations: int = 1) -> None:
+        """
+        Reconoce una línea sintética para inicializar los modelos
+
+        Args:
+            iterations: Número de pasadas de calentamiento
+        """
+        box = [[10.0, 50.0], [630.0, 50.0], [630.0, 120.0], [10.0, 120.0]]
+        for _ in range(iterations):
+            self.recognize_text(_warmup_image(), [box])
+
+
+def create_ocr_service(
+    key: Optional[ModelKey] = None,
+    backend: Optional[str] = None
+) -> PaddleOCRService:
+    """
+    Crea una instancia del servicio con la configuración de la aplicación
+
+    Args:
+        key: (idioma, variante, dispositivo); por defecto el modelo configurado
+        backend: Motor de inferencia (None = INFERENCE_BACKEND)
+    """
+    key = key or default_model_key()
+    lang, _, device = key
+    return PaddleOCRService(
+        lang=lang,
+        device=device,
+        batch_size=settings.batch_max_size,
+        max_side=configured_max_side(),
+        model_options={**variant_options(key), **backend_options(key, backend)}
+    )
+
+
+def create_recognition_service(
+    key: ModelKey,
+    backend: Optional[str] = None
+) -> TextRecognitionService:
+    """
+    Crea el servicio de solo reconocimiento de una clave de recognition_model_key()
+
+    Args:
+        key: (idioma, variante + RECOGNITION_SUFFIX, dispositivo)
+        backend: Motor de inferencia (None = INFERENCE_BACKEND)
+    """
+    lang, variant, device = key
+    base_key = (lang, variant[:-len(RECOGNITION_SUFFIX)], device)
+    return TextRecognitionService(
+        device=device,
+        max_side=configured_max_side(),
+        model_options={**variant_options(base_key), **backend_options(base_key, backend)}
+    )
+
+
+# Instancia global del servicio, creada en el primer uso para que importar
+# este módulo no cargue los modelos
+_ocr_service: Optional[PaddleOCRService] = None
+_ocr_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> PaddleOCRService:
+    """Devuelve la instancia global del servicio, creándola si no existe"""
+    global _ocr_service
+    if _ocr_service is None:
+        with _ocr_service_lock:
+            if _ocr_service is None:
+                _ocr_service = create_ocr_service()
+    return _ocr_service
+
+
+def __getattr__(name: str) -> Any:
+    # Compatibilidad: `from src.services.paddleOCR import ocr_service`
+    if name == "ocr_service":
+        return get_ocr_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Funciones helper para uso directo
 def extract_text_from_image(image_path: str) -> List[Dict[str, Any]]:
     """Extrae texto de una imagen usando la instancia global"""
-    return ocr_service.extract_text(image_path)
+    return get_ocr_service().extract_text(image_path)
 
 
 def get_text_only(image_path: str) -> str:
     """Obtiene solo el texto de una imagen"""
-    return ocr_service.extract_text_only(image_path)
\ No newline at end of file
+    return get_ocr_service().extract_text_only(image_path)
\ No newline at end of file
@@ -0,0 +1,181 @@
+from typing import Any, Dict, Iterable
+
+import cv2
+import numpy as np
+from paddleocr import PPStructureV3
+
+from src.core.metrics import stage_timer
+from src.services.model_registry import ModelKey, configured_structure_modules
+from src.utils.document_pages import DocumentPage
+from src.utils.image_decoder import decode_image
+from src.utils.image_preprocessing import prepare_image
+
+
+class PPStructureService:
+    """
+    Servicio de análisis de estructura de documentos con PP-StructureV3
+
+    Extrae bloques de layout (títulos, texto, figuras...) en orden de lectura,
+    tablas en HTML, fórmulas en LaTeX y sellos. Los sub-módulos se cargan una
+    vez al crear el servicio y cada petición elige cuáles ejecutar.
+    """
+
+    def __init__(
+        self,
+        lang: str = "en",
+        device: str = "cpu",
+        modules: Iterable[str] = ("table", "formula", "seal")
+    ):
+        """
+        Inicializa el pipeline de PP-StructureV3
+
+        Args:
+            lang: Idioma del OCR del documento
+            device: Dispositivo a usar ('cpu' o 'gpu')
+            modules: Sub-módulos que se cargan ('table', 'formula', 'chart', 'seal')
+        """
+        self.modules = set(modules)
+        self.pipeline = PPStructureV3(
+            lang=lang,
+            device=device,
+            use_doc_orientation_classify=False,
+            use_doc_unwarping=False,
+            use_textline_orientation=False,
+            use_table_recognition="table" in self.modules,
+            use_formula_recognition="formula" in self.modules,
+            use_chart_recognition="chart" in self.modules,
+            use_seal_recognition="seal" in self.modules
+        )
+
+    def analyze(
+        self,
+        image: Any,
+        use_table_recognition: bool = True,
+        use_formula_recognition: bool = False,
+        use_chart_recognition: bool = False,
+        use_seal_recognition: bool = False,
+        include_markdown: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Analiza la estructura de una página
+
+        Args:
+            image: Bytes de la imagen, ruta, array BGR o página de un documento
+            use_table_recognition: Reconocer tablas (HTML)
+            use_formula_recognition: Reconocer fórmulas (LaTeX)
+            use_chart_recognition: Convertir gráficos en tablas
+            use_seal_recognition: Reconocer el texto de sellos
+            include_markdown: Incluir la página renderizada en Markdown
+
+        Returns:
+            Página con sus bloques, tablas, fórmulas, sellos y Markdown
+        """
+        requested = {
+            "table": use_table_recognition,
+            "formula": use_formula_recognition,
+            "chart": use_chart_recognition,
+            "seal": use_seal_recognition
+        }
+        missing = [m for m, enabled in requested.items() if enabled and m not in self.modules]
+        if missing:
+            raise ValueError(f"Sub-módulos no cargados: {', '.join(missing)}")
+
+        with stage_timer("decode"):
+            if isinstance(image, (bytes, bytearray, memoryview)):
+                image = decode_image(image)
+            elif isinstance(image, DocumentPage):
+                image = image.render()
+            elif isinstance(image, str):
+                image = cv2.imread(image, cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError("No se pudo leer la imagen")
+
+        # Sin reducción de resolución: las tablas y fórmulas necesitan detalle
+        with stage_timer("preprocess"):
+            image, _ = prepare_image(image, None)
+
+        with stage_timer("inference"):
+            result = next(iter(self.pipeline.predict(
+                image,
+                use_table_recognition=use_table_recognition,
+                use_formula_recognition=use_formula_recognition,
+                use_chart_recognition=use_chart_recognition,
+                use_seal_recognition=use_seal_recognition
+            )))
+
+        with stage_timer("postprocess"):
+            return self._format_page(result, include_markdown)
+
+    def _format_page(self, result: Dict[str, Any], include_markdown: bool) -> Dict[str, Any]:
+        """Convierte el resultado de PP-StructureV3 en tipos serializables"""
+        blocks = []
+        for order, block in enumerate(result.get("parsing_res_list", []) or []):
+            blocks.append({
+                "label": getattr(block, "label", ""),
+                "bbox": [int(v) for v in getattr(block, "bbox", [])],
+                "content": getattr(block, "content", "") or "",
+                "order": order
+            })
+
+        tables = [
+            {"html": table.get("pred_html", ""), "cells": len(table.get("cell_box_list", []) or [])}
+            for table in result.get("table_res_list", []) or []
+        ]
+
+        formulas = []
+        for formula in result.get("formula_res_list", []) or []:
+            box = formula.get("dt_polys")
+            formulas.append({
+                "latex": formula.get("rec_formula", ""),
+                "bbox": np.asarray(box, dtype=np.float32).reshape(-1).tolist() if box is not None else []
+            })
+
+        seals = [
+            " ".join(seal.get("rec_texts", []) or [])
+            for seal in result.get("seal_res_list", []) or []
+        ]
+
+        markdown = None
+        if include_markdown:
+            markdown = (getattr(result, "markdown", None) or {}).get("markdown_texts")
+
+        return {
+            "width": int(result.get("width", 0)),
+            "height": int(result.get("height", 0)),
+            "blocks": blocks,
+            "tables": tables,
+            "formulas": formulas,
+            "seals": seals,
+            "markdown": markdown
+        }
+
+    def warmup(self, iterations: int = 1) -> None:
+        """
+        Ejecuta el layout y el OCR sobre una página sintética antes de la
+        primera petición real
+
+        Args:
+            iterations: Número de pasadas de calentamiento
+        """
+        image = np.full((400, 600, 3), 255, dtype=np.uint8)
+        cv2.putText(
+            image, "Warm-up 0123456789", (20, 100),
+            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2
+        )
+        for _ in range(iterations):
+            self.analyze(image, use_table_recognition=False, include_markdown=False)
+
+
+def create_structure_service(key: ModelKey) -> PPStructureService:
+    """
+    Crea el servicio de estructura con la configuración de la aplicación
+
+    Args:
+        key: (idioma, 'structure', dispositivo)
+    """
+    lang, _, device = key
+    return PPStructureService(
+        lang=lang,
+        device=device,
+        modules=configured_structure_modules()
+    )
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Cada cuánto se barre el nivel en disco (caducados y exceso de tamaño)
+_DISK_SWEEP_INTERVAL_SECONDS = 600
+
+
+class OCRResultCache:
+    """
+    Cache de resultados de OCR direccionado por contenido
+
+    La clave es el hash de los bytes de la imagen más la configuración del
+    modelo, por lo que la misma imagen servida desde URLs distintas comparte
+    entrada. Los resultados se guardan sin filtrar por confianza.
+
+    Tiene un nivel en memoria (LRU con TTL) y un nivel opcional en disco que
+    sobrevive a los reinicios. Desde el event loop se usan aget() y aset(),
+    que leen y escriben el disco en un hilo aparte. El nivel en disco se
+    barre periódicamente: se borran los archivos caducados y, si supera
+    `disk_max_bytes`, los escritos hace más tiempo.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0
+    ):
+        """
+        Args:
+            max_entries: Entradas máximas en memoria
+            ttl_seconds: Tiempo de vida de cada entrada (0 = sin caducidad)
+            disk_dir: Directorio del nivel en disco (None lo desactiva)
+            disk_max_bytes: Tamaño máximo del nivel en disco (0 = sin límite)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # Tamaño aproximado del nivel en disco (None = desconocido hasta el
+        # primer barrido, que se hace con la primera escritura)
+        self._disk_bytes: Optional[int] = None
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(image_data: bytes, model_config: str) -> str:
+        """
+        Calcula la clave de cache de una imagen
+
+        Args:
+            image_data: Contenido de la imagen
+            model_config: Identificador de la configuración del modelo
+
+        Returns:
+            Hash hexadecimal SHA-256
+        """
+        digest = hashlib.sha256(model_config.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(image_data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca un resultado en memoria y, si no está, en disco
+
+        Args:
+            key: Clave calculada con make_key
+
+        Returns:
+            Resultados guardados o None si no hay entrada vigente
+        """
+        now = time.time()
+        results = self._get_memory(key, now)
+        if results is not None:
+            return results
+        return self._found_on_disk(key, self._read_disk(key, now), now)
+
+    async def aget(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Igual que get(), pero lee el disco sin bloquear el event loop"""
+        now = time.time()
+        results = self._get_memory(key, now)
+        if results is not None:
+            return results
+        if self.disk_dir:
+            results = await asyncio.to_thread(self._read_disk, key, now)
+        return self._found_on_disk(key, results, now)
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Guarda el resultado de una imagen
+
+        Args:
+            key: Clave calculada con make_key
+            results: Resultados de OCR sin filtrar
+        """
+        self._store_memory(key, results, time.time())
+        self._write_disk(key, results)
+
+    async def aset(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Igual que set(), pero escribe el disco sin bloquear el event loop"""
+        self._store_memory(key, results, time.time())
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, results)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos y fallos del cache"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria"""
+        self._entries.clear()
+
+    def _get_memory(self, key: str, now: float) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if not expires_at or expires_at > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+        del self._entries[key]
+        return None
+
+    def _found_on_disk(
+        self,
+        key: str,
+        results: Optional[List[Dict[str, Any]]],
+        now: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Cuenta el resultado de la búsqueda en disco y sube los aciertos a memoria"""
+        if results is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._store_memory(key, results, now)
+        return results
+
+    def _store_memory(
+        self,
+        key: str,
+        results: List[Dict[str, Any]],
+        now: float
+    ) -> None:
+        expires_at = now + self.ttl if self.ttl else 0
+        self._entries[key] = (expires_at, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Optional[List[Dict[str, Any]]]:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            if self.ttl and path.stat().st_mtime + self.ttl <= now:
+                path.unlink()
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error leyendo cache en disco: {e}")
+            return None
+
+    def _write_disk(self, key: str, results: List[Dict[str, Any]]) -> None:
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Escritura atómica: nunca se lee un archivo a medio escribir
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False)
+                size = f.tell()
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error escribiendo cache en disco: {e}")
+            return
+
+        if self._disk_bytes is not None:
+            self._disk_bytes += size
+        if self._needs_sweep() and self._sweep_lock.acquire(blocking=False):
+            try:
+                self._sweep_disk()
+            finally:
+                self._sweep_lock.release()
+
+    def _needs_sweep(self) -> bool:
+        if self._disk_bytes is None:
+            return True
+        if self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes:
+            return True
+        return time.monotonic() - self._last_sweep > _DISK_SWEEP_INTERVAL_SECONDS
+
+    def _sweep_disk(self) -> None:
+        """Borra los archivos caducados y, por encima del límite, los más antiguos"""
+        self._last_sweep = time.monotonic()
+        now = time.time()
+        files = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+                if self.ttl and stat.st_mtime + self.ttl <= now:
+                    path.unlink()
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in files)
+        if self.disk_max_bytes and total > self.disk_max_bytes:
+            for _, size, path in sorted(files):
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= self.disk_max_bytes:
+                    break
+        self._disk_bytes = total
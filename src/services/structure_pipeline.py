@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from src.services.inference_executor import (
+    InferenceExecutor,
+    InferenceQueueFullError,
+    inference_executor
+)
+from src.services.model_registry import structure_model_key
+from src.utils.document_pages import DocumentPage
+
+
+class StructurePipeline:
+    """
+    Punto de entrada asíncrono de PP-StructureV3 para rutas y trabajos
+
+    Cada página se analiza como un trabajo independiente del pool de
+    inferencia, de modo que los resultados se pueden emitir en cuanto
+    termina cada una.
+    """
+
+    def __init__(self, executor: InferenceExecutor, poll_interval: float = 1.0):
+        """
+        Args:
+            executor: Pool de inferencia
+            poll_interval: Espera máxima entre reintentos con la cola llena
+        """
+        self.executor = executor
+        self.poll_interval = poll_interval
+
+    async def analyze_page(
+        self,
+        page: Union[bytes, DocumentPage],
+        lang: Optional[str] = None,
+        **options: bool
+    ) -> Dict[str, Any]:
+        """
+        Analiza una página; con la cola de inferencia llena espera a que haya hueco
+
+        Args:
+            page: Contenido de la imagen o página de un documento
+            lang: Idioma del documento (None = OCR_LANG)
+            **options: Sub-módulos a ejecutar (ver StructureOptions)
+
+        Returns:
+            Página con bloques, tablas, fórmulas, sellos y Markdown
+        """
+        model_key = structure_model_key(lang)
+        while True:
+            try:
+                return await self.executor.run(
+                    "analyze", page, model_key=model_key, **options
+                )
+            except InferenceQueueFullError as e:
+                await asyncio.sleep(min(e.retry_after, self.poll_interval))
+
+    async def analyze_pages(
+        self,
+        pages: List[Union[bytes, DocumentPage]],
+        lang: Optional[str] = None,
+        concurrency: int = 2,
+        **options: bool
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], Exception]]]:
+        """
+        Analiza varias páginas con concurrencia acotada
+
+        Yields:
+            (posición en `pages`, resultado o excepción) en orden de finalización
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(index: int, page: bytes):
+            async with semaphore:
+                try:
+                    return index, await self.analyze_page(page, lang, **options)
+                except Exception as e:
+                    return index, e
+
+        tasks = [asyncio.ensure_future(run(i, page)) for i, page in enumerate(pages)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # El cliente cerró la conexión: no seguir con el resto de páginas
+            for task in tasks:
+                task.cancel()
+
+
+# Instancia global del pipeline de estructura
+structure_pipeline = StructurePipeline(inference_executor)
@@ -0,0 +1,261 @@
+import io
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+import pypdfium2 as pdfium
+
+from src.core.config import settings
+from src.utils.image_downloader import ImageTooLargeError, UnsupportedImageError
+from src.utils.image_format import (
+    DOCUMENT_FORMATS,
+    extract_tiff_page,
+    read_tiff_page_sizes,
+    sniff_image_format
+)
+
+# Los PDF miden sus páginas en puntos (1/72 de pulgada)
+_PDF_POINTS_PER_INCH = 72
+
+# PDFium no es thread-safe: el pool de hilos y los hilos que dividen
+# documentos no pueden usarlo a la vez
+_pdfium_lock = threading.Lock()
+
+
+class InvalidPageSelectionError(ValueError):
+    """La selección de páginas no es válida para el documento"""
+
+
+@dataclass(frozen=True)
+class DocumentPage:
+    """
+    Página de un documento PDF o TIFF pendiente de rasterizar
+
+    Viaja al worker de inferencia en lugar de la imagen ya renderizada: cada
+    worker rasteriza solo la página que le toca, en paralelo con el resto.
+    `data` es un PDF o TIFF con solo esa página, para no enviar el documento
+    entero al worker una vez por página.
+    """
+    data: bytes
+    index: int
+    dpi: int = 200
+
+    def render(self) -> np.ndarray:
+        """Rasteriza la página a un array BGR"""
+        return render_page(self.data, 0, self.dpi)
+
+
+def is_document(data: bytes) -> bool:
+    """Indica si el contenido es un documento que puede tener varias páginas"""
+    return sniff_image_format(data[:16]) in DOCUMENT_FORMATS
+
+
+def count_pages(data: bytes) -> int:
+    """
+    Número de páginas de un PDF o TIFF sin rasterizarlas
+
+    Raises:
+        ValueError: Si el documento no se puede abrir
+    """
+    if sniff_image_format(data[:16]) == "tiff":
+        return len(read_tiff_page_sizes(data))
+
+    with _pdfium_lock:
+        document = _open_pdf(data)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    Convierte una selección de páginas ('1-3,5', base 1) en índices base 0
+
+    Args:
+        spec: Selección de páginas; None o vacío = todas
+        page_count: Páginas del documento
+
+    Returns:
+        Índices ordenados y sin duplicados
+
+    Raises:
+        InvalidPageSelectionError: Si la selección no es válida o queda fuera
+            del documento
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+
+    indices = set()
+    for part in spec.split(","):
+        part = part.strip()
+        start, dash, end = part.partition("-")
+        try:
+            first = int(start)
+            last = int(end) if end.strip() else (page_count if dash else first)
+        except ValueError:
+            raise InvalidPageSelectionError(f"Rango de páginas no válido: '{part}'")
+        if first < 1 or last < first or last > page_count:
+            raise InvalidPageSelectionError(
+                f"Rango de páginas '{part}' fuera del documento ({page_count} páginas)"
+            )
+        indices.update(range(first - 1, last))
+    return sorted(indices)
+
+
+def split_document(
+    data: bytes,
+    pages: Optional[str] = None,
+    dpi: Optional[int] = None
+) -> List[Union[bytes, DocumentPage]]:
+    """
+    Divide la entrada en las páginas a procesar
+
+    Una imagen normal es una única página (los bytes tal cual). De un
+    documento solo se preparan las páginas pedidas, cada una copiada a un
+    PDF o TIFF propio; ninguna se rasteriza aquí. Abre el documento: desde
+    el event loop se llama con asyncio.to_thread.
+
+    Args:
+        data: Contenido de la imagen o documento
+        pages: Selección de páginas ('1-3,5'); None = todas
+        dpi: Resolución de rasterizado (por defecto DOCUMENT_DPI)
+
+    Returns:
+        Lista de páginas en orden
+
+    Raises:
+        InvalidPageSelectionError: Si la selección no es válida o supera
+            DOCUMENT_MAX_PAGES
+        ImageTooLargeError: Si una página pedida de un TIFF supera
+            MAX_IMAGE_PIXELS
+        UnsupportedImageError: Si no se pudo extraer una página del TIFF
+    """
+    if not is_document(data):
+        return [data]
+
+    dpi = dpi or settings.document_dpi
+    if sniff_image_format(data[:16]) == "tiff":
+        sizes = read_tiff_page_sizes(data)
+        indices = _select_pages(pages, len(sizes))
+        # Las páginas de un TIFF se decodifican enteras: las que superan el
+        # máximo de píxeles se rechazan antes de repartirlas
+        for index in indices:
+            _check_tiff_page(sizes[index], index)
+        return [DocumentPage(_tiff_page(data, index), index, dpi) for index in indices]
+
+    with _pdfium_lock:
+        document = _open_pdf(data)
+        try:
+            indices = _select_pages(pages, len(document))
+            return [DocumentPage(_pdf_page(document, index), index, dpi) for index in indices]
+        finally:
+            document.close()
+
+
+def render_page(data: bytes, index: int, dpi: int) -> np.ndarray:
+    """
+    Rasteriza una página de un PDF o TIFF
+
+    Args:
+        data: Contenido del documento
+        index: Página (base 0)
+        dpi: Resolución de rasterizado de los PDF (los TIFF ya son mapas de bits)
+
+    Returns:
+        Página como array BGR
+    """
+    if sniff_image_format(data[:16]) == "tiff":
+        sizes = read_tiff_page_sizes(data)
+        if index >= len(sizes):
+            raise ValueError(f"El TIFF no tiene página {index + 1}")
+        _check_tiff_page(sizes[index], index)
+
+        # Solo se decodifica la página pedida
+        ok, images = cv2.imdecodemulti(
+            np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR, None, (index, index + 1)
+        )
+        if not ok or not images:
+            raise ValueError(f"No se pudo decodificar la página {index + 1} del TIFF")
+        return images[0]
+
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(data)
+        try:
+            page = document[index]
+            width, height = page.get_size()
+
+            # Reducir la resolución si la página supera el máximo de píxeles
+            scale = dpi / _PDF_POINTS_PER_INCH
+            pixels = width * height * scale * scale
+            if pixels > settings.max_image_pixels:
+                scale *= (settings.max_image_pixels / pixels) ** 0.5
+
+            bitmap = page.render(scale=scale)
+            # to_numpy() es una vista sobre el bitmap de PDFium: se copia antes de cerrarlo
+            return np.array(bitmap.to_numpy()[:, :, :3])
+        finally:
+            document.close()
+
+
+def _select_pages(spec: Optional[str], page_count: int) -> List[int]:
+    """Índices de las páginas pedidas, limitados a DOCUMENT_MAX_PAGES"""
+    indices = parse_page_range(spec, page_count)
+    if len(indices) > settings.document_max_pages:
+        raise InvalidPageSelectionError(
+            f"Se pidieron {len(indices)} páginas (máximo {settings.document_max_pages})"
+        )
+    return indices
+
+
+def _open_pdf(data: bytes) -> pdfium.PdfDocument:
+    """Abre un PDF (con _pdfium_lock tomado)"""
+    try:
+        return pdfium.PdfDocument(data)
+    except pdfium.PdfiumError as e:
+        raise ValueError(f"No se pudo abrir el PDF: {e}")
+
+
+def _pdf_page(document: pdfium.PdfDocument, index: int) -> bytes:
+    """Copia una página del PDF a un documento propio (con _pdfium_lock tomado)"""
+    page_document = pdfium.PdfDocument.new()
+    try:
+        page_document.import_pages(document, [index])
+        buffer = io.BytesIO()
+        page_document.save(buffer)
+        return buffer.getvalue()
+    finally:
+        page_document.close()
+
+
+def _tiff_page(data: bytes, index: int) -> bytes:
+    """Copia una página del TIFF a un archivo propio sin decodificarla"""
+    try:
+        return extract_tiff_page(data, index)
+    except ValueError as e:
+        raise UnsupportedImageError(f"No se pudo extraer la página {index + 1} del TIFF: {e}")
+
+
+def _check_tiff_page(size: Optional[Tuple[int, int]], index: int) -> None:
+    """
+    Comprueba las dimensiones de una página de un TIFF antes de decodificarla
+
+    A diferencia de los PDF, un TIFF no se puede rasterizar a menos
+    resolución: las páginas que superan MAX_IMAGE_PIXELS se rechazan.
+
+    Raises:
+        UnsupportedImageError: Si no se pudieron leer sus dimensiones
+        ImageTooLargeError: Si supera el máximo de píxeles
+    """
+    if size is None:
+        raise UnsupportedImageError(
+            f"No se pudieron leer las dimensiones de la página {index + 1} del TIFF"
+        )
+    width, height = size
+    if width * height > settings.max_image_pixels:
+        raise ImageTooLargeError(
+            f"La página {index + 1} del TIFF, de {width}x{height}, supera el máximo "
+            f"de {settings.max_image_pixels} píxeles"
+        )
@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.core.config import settings
+
+
+class HTTPClientManager:
+    """
+    Cliente HTTP compartido durante toda la vida de la aplicación
+
+    Reutiliza las conexiones (keep-alive) entre descargas para no pagar un
+    handshake TCP/TLS por petición, y limita las descargas simultáneas por host.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        per_host_limit: int = 10,
+        timeout: float = 30.0
+    ):
+        """
+        Args:
+            max_connections: Conexiones abiertas como máximo
+            max_keepalive_connections: Conexiones inactivas que se mantienen abiertas
+            keepalive_expiry: Segundos que una conexión inactiva sigue abierta
+            http2: Usar HTTP/2 si el paquete 'h2' está instalado
+            per_host_limit: Descargas simultáneas por host (0 = sin límite)
+            timeout: Timeout por defecto en segundos
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and self._http2_available()
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            print("HTTP/2 desactivado: instala 'httpx[http2]' para habilitarlo")
+            return False
+
+    async def start(self) -> None:
+        """Crea el cliente compartido (se llama al arrancar la aplicación)"""
+        self.get_client()
+
+    async def close(self) -> None:
+        """Cierra el cliente y sus conexiones (se llama al apagar la aplicación)"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._host_semaphores = {}
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Devuelve el cliente compartido, creándolo si no existe
+
+        Las conexiones pertenecen a un event loop; si el loop cambió (p. ej.
+        en scripts o tests sin lifespan) se crea un cliente nuevo.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout
+            )
+            self._loop = loop
+            self._host_semaphores = {}
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Reserva un cupo de descarga para el host de la URL
+
+        Args:
+            url: URL que se va a descargar
+        """
+        if self.per_host_limit <= 0:
+            yield
+            return
+
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._host_semaphores[host] = semaphore
+
+        async with semaphore:
+            yield
+
+
+# Instancia global del cliente HTTP
+http_client = HTTPClientManager(
+    max_connections=settings.http_max_connections,
+    max_keepalive_connections=settings.http_max_keepalive_connections,
+    keepalive_expiry=settings.http_keepalive_expiry,
+    http2=settings.http2_enabled,
+    per_host_limit=settings.http_per_host_limit,
+    timeout=settings.download_timeout
+)
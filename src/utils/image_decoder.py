@@ -0,0 +1,28 @@
+from typing import Union
+
+import cv2
+import numpy as np
+
+
+def decode_image(data: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    Decodifica una imagen en memoria a un array BGR sin pasar por disco
+
+    Args:
+        data: Contenido del archivo de imagen (JPEG, PNG, etc.)
+
+    Returns:
+        Imagen como array de NumPy (alto, ancho, 3) en formato BGR
+
+    Raises:
+        ValueError: Si el contenido no es una imagen válida
+    """
+    # frombuffer crea una vista sobre los bytes, sin copiarlos. IMREAD_COLOR
+    # aplica la orientación EXIF y convierte gris/alfa a BGR en el mismo paso
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+    if image is None:
+        raise ValueError("No se pudo decodificar la imagen")
+
+    return image
\ No newline at end of file
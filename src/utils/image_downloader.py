@@ -1,43 +1,213 @@
 import tempfile
 import os
-from typing import Optional
 import httpx
-from pathlib import Path
-from urllib.parse import urlparse
+from typing import AsyncIterator, List, Optional
+from src.core.config import settings
+from src.core.metrics import COALESCED_REQUESTS, DOWNLOADED_BYTES, stage_timer
+from src.utils.http_client import http_client
+from src.utils.single_flight import SingleFlight
+from src.utils.image_format import FORMAT_EXTENSIONS, read_image_size, sniff_image_format
 
+# Bytes iniciales que se inspeccionan para leer las dimensiones de la imagen
+# (en JPEG el marcador SOF puede venir después de los metadatos EXIF)
+_HEADER_PROBE_BYTES = 64 * 1024
 
-async def download_image_from_url(url: str, timeout: int = 30) -> Optional[str]:
+# Descargas en vuelo por URL: las peticiones concurrentes con la misma URL
+# comparten una única descarga
+_downloads = SingleFlight(COALESCED_REQUESTS.labels(kind="download"))
+
+
+class ImageTooLargeError(ValueError):
+    """La imagen supera el tamaño en bytes o en píxeles permitido"""
+
+
+class UnsupportedImageError(ValueError):
+    """El contenido descargado no es un formato de imagen soportado"""
+
+
+def check_image_header(
+    header: bytes,
+    max_pixels: Optional[int] = None
+) -> str:
     """
-    Descarga una imagen desde URL a un archivo temporal
+    Valida el formato y, si ya se conocen, las dimensiones de la imagen
+
+    Args:
+        header: Primeros bytes del archivo
+        max_pixels: Máximo de píxeles permitido (por defecto MAX_IMAGE_PIXELS)
+
+    Returns:
+        Formato detectado
+
+    Raises:
+        UnsupportedImageError: Si los magic bytes no son de una imagen soportada
+        ImageTooLargeError: Si la imagen supera el máximo de píxeles
+    """
+    image_format = sniff_image_format(header)
+    if image_format is None:
+        raise UnsupportedImageError("El contenido no es una imagen soportada")
+
+    max_pixels = max_pixels or settings.max_image_pixels
+    size = read_image_size(header)
+    if size and size[0] * size[1] > max_pixels:
+        raise ImageTooLargeError(
+            f"La imagen de {size[0]}x{size[1]} supera el máximo de {max_pixels} píxeles"
+        )
+    return image_format
+
+
+async def download_image_bytes(
+    url: str,
+    timeout: Optional[float] = None,
+    max_bytes: Optional[int] = None
+) -> Optional[bytes]:
+    """
+    Descarga una imagen desde URL y devuelve su contenido en memoria
+
+    El cuerpo se lee por bloques: la descarga se aborta en cuanto el
+    contenido deja de parecer una imagen o supera los límites de tamaño,
+    sin esperar a recibirlo completo. Si ya hay una descarga de la misma URL
+    en curso, se espera a esa en lugar de repetirla.
 
     Args:
         url: URL de la imagen
-        timeout: Timeout en segundos
+        timeout: Timeout en segundos (por defecto el del cliente compartido)
+        max_bytes: Tamaño máximo en bytes (por defecto MAX_IMAGE_BYTES)
 
     Returns:
-        Path del archivo temporal o None si falla
+        Contenido de la imagen o None si falla la descarga
+
+    Raises:
+        ImageTooLargeError: Si la imagen supera el tamaño o los píxeles permitidos
+        UnsupportedImageError: Si el contenido no es una imagen soportada
     """
+    max_bytes = max_bytes or settings.max_image_bytes
+    return await _downloads.do(
+        (url, max_bytes), lambda: _download(url, timeout, max_bytes)
+    )
+
+
+async def _download(
+    url: str,
+    timeout: Optional[float],
+    max_bytes: int
+) -> Optional[bytes]:
+    """Descarga efectiva (una por URL en vuelo)"""
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url)
+        client = http_client.get_client()
+        with stage_timer("download"):
+            data = await _stream_image(client, url, timeout, max_bytes)
+        DOWNLOADED_BYTES.inc(len(data))
+        return data
+
+    except (ImageTooLargeError, UnsupportedImageError):
+        raise
+    except Exception as e:
+        print(f"Error descargando imagen: {e}")
+        return None
+
+
+async def _stream_image(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: Optional[float],
+    max_bytes: int
+) -> bytes:
+    """Descarga la imagen descartando antes de leer el cuerpo las que declaran un tamaño excesivo"""
+    async with http_client.host_slot(url):
+        async with client.stream("GET", url, timeout=timeout or client.timeout) as response:
             response.raise_for_status()
 
-            # Extraer extensión del path de la URL (sin query params)
-            parsed_url = urlparse(url)
-            path_only = parsed_url.path
-            suffix = Path(path_only).suffix
+            content_length = response.headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                raise ImageTooLargeError(
+                    f"La imagen ocupa {content_length} bytes (máximo {max_bytes})"
+                )
+
+            return await read_image_stream(response.aiter_bytes(), max_bytes)
+
+
+async def read_image_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: Optional[int] = None
+) -> bytes:
+    """
+    Lee una imagen por bloques aplicando los límites de tamaño y formato
+
+    Se usa tanto para las descargas como para los cuerpos subidos por el
+    cliente: la lectura se aborta en cuanto el contenido deja de parecer una
+    imagen o supera los límites, sin esperar a recibirlo completo.
+
+    Args:
+        chunks: Bloques del contenido
+        max_bytes: Tamaño máximo en bytes (por defecto MAX_IMAGE_BYTES)
+
+    Returns:
+        Contenido completo de la imagen
+
+    Raises:
+        ImageTooLargeError: Si la imagen supera el tamaño o los píxeles permitidos
+        UnsupportedImageError: Si el contenido no es una imagen soportada
+    """
+    max_bytes = max_bytes or settings.max_image_bytes
+    parts: List[bytes] = []
+    total = 0
+    size_checked = False
+
+    async for chunk in chunks:
+        parts.append(chunk)
+        total += len(chunk)
+        if total > max_bytes:
+            raise ImageTooLargeError(
+                f"La imagen supera el máximo de {max_bytes} bytes"
+            )
+
+        # Validar formato y dimensiones con los primeros bytes
+        if not size_checked and total >= 12:
+            header = b"".join(parts)[:_HEADER_PROBE_BYTES]
+            check_image_header(header)
+            size_checked = (
+                read_image_size(header) is not None
+                or total >= _HEADER_PROBE_BYTES
+            )
+
+    data = b"".join(parts)
+
+    # Archivos muy pequeños o cuyas dimensiones no se pudieron leer antes
+    if not size_checked:
+        check_image_header(data[:_HEADER_PROBE_BYTES])
+
+    return data
+
+
+async def download_image_from_url(
+    url: str,
+    timeout: Optional[float] = None
+) -> Optional[str]:
+    """
+    Descarga una imagen desde URL a un archivo temporal
+
+    Args:
+        url: URL de la imagen
+        timeout: Timeout en segundos (por defecto el del cliente compartido)
+
+    Returns:
+        Path del archivo temporal o None si falla
+    """
+    try:
+        data = await download_image_bytes(url, timeout=timeout)
+        if data is None:
+            return None
 
-            # Si no hay extensión o no es válida, usar .jpg
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']
-            if not suffix or suffix.lower() not in valid_extensions:
-                suffix = '.jpg'
+        # La extensión se toma del formato real, no del sufijo de la URL
+        suffix = FORMAT_EXTENSIONS[sniff_image_format(data)]
 
-            # Crear archivo temporal
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp_file.write(response.content)
-            temp_file.close()
+        # Crear archivo temporal
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        temp_file.write(data)
+        temp_file.close()
 
-            return temp_file.name
+        return temp_file.name
 
     except Exception as e:
         print(f"Error descargando imagen: {e}")
@@ -55,4 +225,4 @@ def cleanup_temp_file(file_path: str) -> None:
         if file_path and os.path.exists(file_path):
             os.unlink(file_path)
     except Exception as e:
-        print(f"Error eliminando archivo temporal: {e}")
\ No newline at end of file
+        print(f"Error eliminando archivo temporal: {e}")
@@ -0,0 +1,279 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# Extensión de archivo para cada formato detectado
+FORMAT_EXTENSIONS = {
+    "jpeg": ".jpg",
+    "png": ".png",
+    "gif": ".gif",
+    "bmp": ".bmp",
+    "tiff": ".tiff",
+    "webp": ".webp",
+    "pdf": ".pdf",
+}
+
+# Formatos que pueden tener varias páginas
+DOCUMENT_FORMATS = ("pdf", "tiff")
+
+# Bytes por valor de cada tipo de campo de un IFD del TIFF
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+# Etiquetas con las posiciones de los datos de la imagen y la de sus tamaños
+_TIFF_DATA_TAGS = {273: 279, 324: 325, 513: 514}
+# Etiquetas que apuntan a otros IFDs: no se copian al extraer una página
+_TIFF_IFD_TAGS = {330, 34665, 34853, 40965}
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """
+    Identifica el formato de imagen por sus magic bytes
+
+    Args:
+        header: Primeros bytes del archivo (con 12 bytes es suficiente)
+
+    Returns:
+        Nombre del formato ('jpeg', 'png', 'pdf', ...) o None si no es una imagen soportada
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        return "tiff"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header.startswith(b"%PDF-"):
+        return "pdf"
+    return None
+
+
+def read_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Lee el ancho y alto de la cabecera de la imagen sin decodificarla
+
+    Args:
+        data: Bytes iniciales (o completos) del archivo
+
+    Returns:
+        (ancho, alto) o None si aún no hay bytes suficientes o el formato
+        no se reconoce
+    """
+    try:
+        image_format = sniff_image_format(data)
+        if image_format == "png" and len(data) >= 24:
+            return struct.unpack(">II", data[16:24])
+        if image_format == "gif" and len(data) >= 10:
+            return struct.unpack("<HH", data[6:10])
+        if image_format == "bmp" and len(data) >= 26:
+            width, height = struct.unpack("<ii", data[18:26])
+            return abs(width), abs(height)
+        if image_format == "webp":
+            return _read_webp_size(data)
+        if image_format == "jpeg":
+            return _read_jpeg_size(data)
+        if image_format == "tiff":
+            return _read_tiff_size(data)
+    except struct.error:
+        return None
+    return None
+
+
+def _read_jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    # Recorre los segmentos hasta el marcador SOF (Start Of Frame)
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        offset += 2 + segment_length
+    return None
+
+
+def _read_webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    return None
+
+
+def _read_tiff_size(data: bytes) -> Optional[Tuple[int, int]]:
+    endian = "<" if data[:2] == b"II" else ">"
+    return _read_ifd_size(data, struct.unpack(endian + "I", data[4:8])[0], endian)
+
+
+def _read_ifd_size(data: bytes, ifd_offset: int, endian: str) -> Optional[Tuple[int, int]]:
+    """Ancho y alto de la imagen descrita por un IFD del TIFF"""
+    if ifd_offset + 2 > len(data):
+        return None
+
+    entries = struct.unpack(endian + "H", data[ifd_offset:ifd_offset + 2])[0]
+    width = height = None
+    for i in range(entries):
+        entry = ifd_offset + 2 + i * 12
+        if entry + 12 > len(data):
+            return None
+        tag, field_type = struct.unpack(endian + "HH", data[entry:entry + 4])
+        # Tipo 3 = SHORT (2 bytes), 4 = LONG (4 bytes)
+        value_size = 2 if field_type == 3 else 4
+        value_format = endian + ("H" if field_type == 3 else "I")
+        value = struct.unpack(value_format, data[entry + 8:entry + 8 + value_size])[0]
+        if tag == 256:
+            width = value
+        elif tag == 257:
+            height = value
+        if width is not None and height is not None:
+            return width, height
+    return None
+
+
+def read_tiff_page_sizes(data: bytes) -> List[Optional[Tuple[int, int]]]:
+    """
+    Lee las dimensiones de todas las páginas de un TIFF sin decodificarlas
+
+    Args:
+        data: Contenido completo del archivo
+
+    Returns:
+        (ancho, alto) de cada página, o None si no se pudieron leer; vacía si
+        la estructura no es válida
+    """
+    endian = "<" if data[:2] == b"II" else ">"
+    return [_read_ifd_size(data, offset, endian) for offset in _tiff_ifd_offsets(data, endian)]
+
+
+def extract_tiff_page(data: bytes, index: int) -> bytes:
+    """
+    Copia una página de un TIFF como un TIFF independiente sin decodificarla
+
+    Se conservan las etiquetas de la página y sus tiras o teselas; se
+    descartan las que apuntan a otros IFDs (EXIF, GPS, sub-IFDs).
+
+    Args:
+        data: Contenido completo del archivo
+        index: Página (base 0)
+
+    Returns:
+        TIFF de una sola página
+
+    Raises:
+        ValueError: Si la página no existe o su estructura no es válida
+    """
+    endian = "<" if data[:2] == b"II" else ">"
+    offsets = _tiff_ifd_offsets(data, endian)
+    if index >= len(offsets):
+        raise ValueError(f"El TIFF no tiene página {index + 1}")
+    try:
+        return _copy_tiff_ifd(data, offsets[index], endian)
+    except struct.error:
+        raise ValueError(f"La página {index + 1} del TIFF está truncada")
+
+
+def _tiff_ifd_offsets(data: bytes, endian: str) -> List[int]:
+    """Posición del IFD de cada página, siguiendo la cadena desde la cabecera"""
+    offsets: List[int] = []
+    try:
+        offset = struct.unpack(endian + "I", data[4:8])[0]
+        while offset and offset not in offsets and offset + 2 <= len(data):
+            offsets.append(offset)
+            entries = struct.unpack(endian + "H", data[offset:offset + 2])[0]
+            next_offset = offset + 2 + entries * 12
+            offset = struct.unpack(endian + "I", data[next_offset:next_offset + 4])[0]
+        return offsets
+    except struct.error:
+        return offsets
+
+
+def _copy_tiff_ifd(data: bytes, ifd_offset: int, endian: str) -> bytes:
+    """Escribe un TIFF con el IFD indicado, sus valores y los datos de la imagen"""
+    entries: Dict[int, Tuple[int, int, bytes]] = {}
+    count = struct.unpack(endian + "H", data[ifd_offset:ifd_offset + 2])[0]
+    for i in range(count):
+        entry = ifd_offset + 2 + i * 12
+        tag, field_type, values = struct.unpack(endian + "HHI", data[entry:entry + 8])
+        if tag in _TIFF_IFD_TAGS or field_type not in _TIFF_TYPE_SIZES:
+            continue
+        length = _TIFF_TYPE_SIZES[field_type] * values
+        # Los valores de hasta 4 bytes van en la propia entrada
+        start = entry + 8
+        if length > 4:
+            start = struct.unpack(endian + "I", data[entry + 8:entry + 12])[0]
+        value = data[start:start + length]
+        if len(value) != length:
+            raise struct.error("valor fuera del archivo")
+        entries[tag] = (field_type, values, value)
+
+    # Tiras, teselas o JPEG antiguo: se copian tal cual y se recalculan sus posiciones
+    chunks: Dict[int, List[bytes]] = {}
+    for tag, size_tag in _TIFF_DATA_TAGS.items():
+        if tag not in entries:
+            continue
+        if size_tag not in entries:
+            raise struct.error("faltan los tamaños de los datos")
+        positions = _unpack_tiff_values(endian, *entries[tag])
+        sizes = _unpack_tiff_values(endian, *entries[size_tag])
+        chunks[tag] = [data[p:p + s] for p, s in zip(positions, sizes)]
+        if len(positions) != len(sizes) or any(
+            len(chunk) != s for chunk, s in zip(chunks[tag], sizes)
+        ):
+            raise struct.error("datos de la imagen fuera del archivo")
+        entries[tag] = (4, len(positions), bytes(4 * len(positions)))
+
+    # Cabecera, IFD, valores que no caben en su entrada y datos de la imagen
+    tags = sorted(entries)
+    position = 8 + 2 + 12 * len(tags) + 4
+    value_offsets = {}
+    for tag in tags:
+        length = len(entries[tag][2])
+        if length > 4:
+            value_offsets[tag] = position
+            position += length + length % 2
+
+    for tag, tag_chunks in chunks.items():
+        positions = []
+        for chunk in tag_chunks:
+            positions.append(position)
+            position += len(chunk)
+        field_type, values, _ = entries[tag]
+        entries[tag] = (field_type, values, struct.pack(f"{endian}{values}I", *positions))
+
+    ifd = [struct.pack(endian + "H", len(tags))]
+    extra = []
+    for tag in tags:
+        field_type, values, value = entries[tag]
+        ifd.append(struct.pack(endian + "HHI", tag, field_type, values))
+        if tag in value_offsets:
+            ifd.append(struct.pack(endian + "I", value_offsets[tag]))
+            extra.append(value + b"\0" * (len(value) % 2))
+        else:
+            ifd.append(value.ljust(4, b"\0"))
+    ifd.append(struct.pack(endian + "I", 0))
+
+    header = data[:4] + struct.pack(endian + "I", 8)
+    return b"".join([header, *ifd, *extra, *(c for t in chunks.values() for c in t)])
+
+
+def _unpack_tiff_values(endian: str, field_type: int, values: int, value: bytes) -> Tuple[int, ...]:
+    """Valores SHORT o LONG de una entrada del IFD"""
+    if field_type not in (3, 4):
+        raise struct.error(f"tipo de campo {field_type} no válido para posiciones")
+    return struct.unpack(f"{endian}{values}{'H' if field_type == 3 else 'I'}", value)
@@ -0,0 +1,71 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.config import settings
+
+
+def max_side_for_text_height(target_text_height: int, text_height_ratio: float) -> int:
+    """
+    Calcula el lado largo máximo a partir de la altura de texto deseada
+
+    El reconocedor redimensiona cada línea a una altura fija (48 px), así que
+    la resolución por encima de esa altura de texto no mejora el resultado y
+    solo encarece la detección.
+
+    Args:
+        target_text_height: Altura mínima en píxeles que debe conservar el texto
+        text_height_ratio: Altura típica del texto respecto al lado largo
+
+    Returns:
+        Lado largo máximo en píxeles
+    """
+    return int(round(target_text_height / text_height_ratio))
+
+
+def configured_max_side() -> Optional[int]:
+    """Lado largo máximo según la configuración (None si está desactivado)"""
+    if not settings.preprocess_enabled:
+        return None
+    return max_side_for_text_height(
+        settings.preprocess_target_text_height,
+        settings.preprocess_text_height_ratio
+    )
+
+
+def prepare_image(
+    image: np.ndarray,
+    max_side: Optional[int] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    Normaliza la imagen a BGR de 8 bits y limita su lado largo
+
+    Args:
+        image: Imagen decodificada (gris, BGR o BGRA)
+        max_side: Lado largo máximo en píxeles (None = sin límite)
+
+    Returns:
+        (imagen lista para el modelo, escala aplicada respecto a la original)
+    """
+    if image.dtype != np.uint8:
+        image = cv2.convertScaleAbs(image, alpha=255.0 / max(float(image.max()), 1.0))
+
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+
+    scale = 1.0
+    height, width = image.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        # INTER_AREA promedia los píxeles al reducir y evita el aliasing en
+        # trazos finos de texto
+        image = cv2.resize(
+            image,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+
+    return image, scale
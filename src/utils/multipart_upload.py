@@ -0,0 +1,131 @@
+from typing import AsyncIterator, Dict, List, Optional
+
+from python_multipart.multipart import (
+    MultipartParseError,
+    MultipartParser,
+    parse_options_header
+)
+
+# Límites de los campos de texto del formulario (el archivo se limita aparte,
+# con MAX_IMAGE_BYTES)
+_MAX_FIELD_BYTES = 64 * 1024
+_MAX_FIELDS = 32
+
+
+class InvalidUploadError(ValueError):
+    """El cuerpo no es un multipart/form-data válido con el archivo esperado"""
+
+
+class MultipartImageUpload:
+    """
+    Lectura incremental de un formulario multipart/form-data con un archivo
+
+    A diferencia de request.form() de Starlette, el archivo no se vuelca a un
+    archivo temporal ni se espera a recibirlo entero: sus bloques se entregan
+    a medida que llegan, así que read_image_stream() puede abortar la subida
+    en cuanto supera los límites. Los demás campos se guardan como texto en
+    `fields` (completos al terminar de leer el archivo).
+    """
+
+    def __init__(self, content_type: str, file_field: str = "file"):
+        """
+        Args:
+            content_type: Cabecera Content-Type de la petición (con el boundary)
+            file_field: Nombre del campo del archivo
+
+        Raises:
+            InvalidUploadError: Si no es un multipart/form-data con boundary
+        """
+        media_type, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if media_type != b"multipart/form-data" or not boundary:
+            raise InvalidUploadError("El cuerpo debe enviarse como multipart/form-data")
+
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self._file_chunks: List[bytes] = []
+        self._file_seen = False
+
+        # Parte en curso
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._part_name = ""
+        self._part_is_file = False
+        self._part_data = bytearray()
+
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished
+        })
+
+    async def iter_file(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Procesa el cuerpo y entrega los bloques del archivo según llegan
+
+        Args:
+            body: Bloques del cuerpo de la petición (request.stream())
+
+        Raises:
+            InvalidUploadError: Si el cuerpo está mal formado o falta el archivo
+        """
+        try:
+            async for chunk in body:
+                self._parser.write(chunk)
+                if self._file_chunks:
+                    chunks, self._file_chunks = self._file_chunks, []
+                    for file_chunk in chunks:
+                        yield file_chunk
+            self._parser.finalize()
+        except MultipartParseError as e:
+            raise InvalidUploadError(f"Formulario multipart no válido: {e}")
+
+        if not self._file_seen:
+            raise InvalidUploadError(f"Falta el archivo '{self.file_field}'")
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+        self._part_data = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._part_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        self._part_is_file = b"filename" in options
+
+        if self._part_is_file:
+            if self._part_name != self.file_field or self._file_seen:
+                raise InvalidUploadError(f"Solo se admite un archivo, en el campo '{self.file_field}'")
+            self._file_seen = True
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        elif len(self.fields) >= _MAX_FIELDS:
+            raise InvalidUploadError(f"El formulario supera el máximo de {_MAX_FIELDS} campos")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part_is_file:
+            self._file_chunks.append(bytes(data[start:end]))
+            return
+        if len(self._part_data) + end - start > _MAX_FIELD_BYTES:
+            raise InvalidUploadError(f"El campo '{self._part_name}' es demasiado largo")
+        self._part_data.extend(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if not self._part_is_file:
+            self.fields[self._part_name] = self._part_data.decode("utf-8", errors="replace")
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Fracción de la altura de una caja que debe solaparse verticalmente con una
+# línea para formar parte de ella
+_LINE_OVERLAP = 0.5
+
+# Separación vertical máxima entre dos líneas del mismo párrafo, relativa a la
+# altura de la línea
+_PARAGRAPH_GAP = 0.8
+
+
+def group_lines(results: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Agrupa las cajas del OCR en líneas lógicas y párrafos en orden de lectura
+
+    Las cajas se ordenan una vez por su centro vertical y se recorren
+    comparando cada una solo con la línea abierta, así que el coste es
+    O(n log n) en lugar de comparar todos los pares. Las cajas de una misma
+    fila (p. ej. producto ... precio en un ticket) forman una línea, ordenada
+    de izquierda a derecha.
+
+    Args:
+        results: Líneas del detector con 'box' (cuatro puntos), 'text' y 'confidence'
+
+    Returns:
+        Líneas en orden de lectura con 'text', 'box' ([x1, y1, x2, y2]),
+        'confidence' (media), 'paragraph' (índice) y 'words' (cajas que la forman)
+    """
+    if not results:
+        return []
+
+    polys = np.asarray([r["box"] for r in results], dtype=np.float32).reshape(len(results), -1, 2)
+    x_min, y_min = polys.min(axis=1).T
+    x_max, y_max = polys.max(axis=1).T
+    heights = np.maximum(y_max - y_min, 1.0)
+    order = np.argsort((y_min + y_max) / 2, kind="stable")
+
+    # Barrido vertical: cada caja se une a la línea abierta si se solapa lo suficiente
+    rows: List[List[int]] = []
+    top = bottom = 0.0
+    for i in order.tolist():
+        overlap = min(bottom, y_max[i]) - max(top, y_min[i])
+        if rows and overlap >= _LINE_OVERLAP * min(heights[i], bottom - top):
+            rows[-1].append(i)
+            top, bottom = min(top, y_min[i]), max(bottom, y_max[i])
+        else:
+            rows.append([i])
+            top, bottom = y_min[i], y_max[i]
+
+    lines = []
+    paragraph = 0
+    previous = None
+    for row in rows:
+        row.sort(key=lambda i: x_min[i])
+        idx = np.asarray(row)
+        box = [
+            float(x_min[idx].min()), float(y_min[idx].min()),
+            float(x_max[idx].max()), float(y_max[idx].max())
+        ]
+
+        # Nuevo párrafo si hay un hueco vertical grande o no se solapan en horizontal
+        if previous is not None:
+            line_height = box[3] - box[1]
+            gap = box[1] - previous[3]
+            overlaps = min(box[2], previous[2]) > max(box[0], previous[0])
+            if gap > _PARAGRAPH_GAP * line_height or not overlaps:
+                paragraph += 1
+        previous = box
+
+        words = [results[i] for i in row]
+        lines.append({
+            "text": " ".join(word["text"] for word in words if word["text"]),
+            "box": box,
+            "confidence": float(np.mean([word["confidence"] for word in words])),
+            "paragraph": paragraph,
+            "words": words
+        })
+    return lines
+
+
+def assemble_text(lines: Sequence[Dict[str, Any]]) -> str:
+    """
+    Texto de las líneas agrupadas: una por renglón y una línea en blanco
+    entre párrafos
+
+    Args:
+        lines: Resultado de group_lines()
+    """
+    parts = []
+    for i, line in enumerate(lines):
+        if i > 0:
+            parts.append("\n\n" if line["paragraph"] != lines[i - 1]["paragraph"] else "\n")
+        parts.append(line["text"])
+    return "".join(parts)
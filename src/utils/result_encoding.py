@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack es opcional
+    msgpack = None
+
+# Formatos compactos y su Content-Type
+COMPACT_MEDIA_TYPES = {
+    "compact": "application/json",
+    "msgpack": "application/x-msgpack"
+}
+
+# Resultados de una página: (índice de página, líneas)
+PageResults = Tuple[int, List[Dict[str, Any]]]
+
+
+class UnsupportedResponseFormatError(ValueError):
+    """El formato de respuesta pedido necesita una dependencia no instalada"""
+
+
+def filter_by_confidence(
+    results: Sequence[Dict[str, Any]],
+    min_confidence: Optional[float]
+) -> List[Dict[str, Any]]:
+    """
+    Filtra las líneas por confianza
+
+    Args:
+        results: Líneas con 'box', 'text' y 'confidence'
+        min_confidence: Confianza mínima (None o 0 = sin filtro)
+
+    Returns:
+        Líneas que superan el umbral, en el mismo orden
+    """
+    if not min_confidence:
+        return list(results)
+    return [r for r in results if r["confidence"] >= min_confidence]
+
+
+def compact_results(
+    page_results: Sequence[PageResults],
+    min_confidence: Optional[float],
+    include_pages: bool = False
+) -> Dict[str, Any]:
+    """
+    Construye la respuesta compacta: columnas en lugar de un objeto por línea
+
+    Las cajas van en un único array plano (8 coordenadas por línea:
+    x1, y1, ..., x4, y4), junto a las listas de textos y confianzas.
+
+    Args:
+        page_results: Resultados por página de OCRPipeline.extract_pages
+        min_confidence: Confianza mínima
+        include_pages: Añadir el rango de líneas de cada página (documentos)
+
+    Returns:
+        Diccionario con arrays de NumPy listo para encode_compact()
+    """
+    boxes, texts, scores, pages = [], [], [], []
+    for page_index, results in page_results:
+        lines = filter_by_confidence(results, min_confidence)
+        pages.append({"page_index": page_index, "start": len(texts), "count": len(lines)})
+        texts.extend(line["text"] for line in lines)
+        scores.extend(line["confidence"] for line in lines)
+        boxes.extend(line["box"] for line in lines)
+
+    payload = {
+        "success": True,
+        "total_lines": len(texts),
+        "boxes": np.asarray(boxes, dtype=np.float32).reshape(-1),
+        "texts": texts,
+        "confidences": np.asarray(scores, dtype=np.float32)
+    }
+    if include_pages:
+        payload["pages"] = pages
+    return payload
+
+
+def encode_compact(payload: Dict[str, Any], response_format: str) -> bytes:
+    """
+    Serializa la respuesta compacta sin pasar por pydantic
+
+    Args:
+        payload: Resultado de compact_results() (puede llevar arrays de NumPy)
+        response_format: 'compact' (JSON) o 'msgpack'
+
+    Returns:
+        Cuerpo de la respuesta
+
+    Raises:
+        UnsupportedResponseFormatError: Si se pide msgpack y no está instalado
+    """
+    if response_format == "msgpack":
+        if msgpack is None:
+            raise UnsupportedResponseFormatError(
+                "El formato msgpack requiere `pip install msgpack`"
+            )
+        return msgpack.packb(_to_builtin(payload))
+
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_to_builtin(payload), separators=(",", ":")).encode("utf-8")
+
+
+def _to_builtin(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Un tolist() por array es mucho más rápido que convertir elemento a elemento
+    return {
+        key: value.tolist() if isinstance(value, np.ndarray) else value
+        for key, value in payload.items()
+    }
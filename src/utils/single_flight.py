@@ -0,0 +1,55 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplica trabajo idéntico en vuelo
+
+    La primera llamada con una clave ejecuta el trabajo; las llamadas
+    concurrentes con la misma clave esperan ese mismo resultado (o error) en
+    lugar de repetirlo. Al terminar, la clave se libera: no es un cache.
+
+    El trabajo corre en su propia tarea, de modo que si el cliente que lo
+    inició se desconecta, los demás siguen recibiendo el resultado.
+    """
+
+    def __init__(self, counter: Optional[Counter] = None):
+        """
+        Args:
+            counter: Contador que se incrementa por cada llamada deduplicada
+        """
+        self.counter = counter
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta func() una sola vez por clave entre las llamadas concurrentes
+
+        Args:
+            key: Identificador del trabajo
+            func: Función asíncrona que produce el resultado
+
+        Returns:
+            El resultado de func(), compartido por todas las llamadas
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            if self.counter is not None:
+                self.counter.inc()
+        else:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield: cancelar una de las peticiones no cancela el trabajo compartido
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,45 @@
+import pytest
+
+from src.api.routes import ocr as ocr_routes
+from src.core.metrics import record_stage
+
+# Resultado de OCR de las pruebas de las rutas: una línea fiable y una de ruido
+RESULTS = [
+    {"box": [[0, 0], [1, 0], [1, 1], [0, 1]], "text": "TOTAL", "confidence": 0.9},
+    {"box": [[0, 2], [1, 2], [1, 3], [0, 3]], "text": "ruido", "confidence": 0.2}
+]
+
+
+class FakeOCR:
+    """
+    Descarga y OCR falsos de las rutas
+
+    La descarga devuelve la URL codificada (None si contiene 'missing') y el
+    OCR devuelve `results`, o su resultado si es una función de la imagen.
+    Ambos registran su etapa como lo harían los reales y guardan lo que
+    reciben en `downloads` y `received`.
+    """
+
+    def __init__(self):
+        self.results = RESULTS
+        self.downloads = []
+        self.received = []
+
+    async def download(self, url, timeout=None):
+        record_stage("download", 0.1)
+        self.downloads.append(url)
+        return None if "missing" in url else url.encode()
+
+    async def extract(self, image_data, lang=None, **options):
+        record_stage("detection", 0.2)
+        self.received.append(image_data)
+        return self.results(image_data) if callable(self.results) else self.results
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Sustituye la descarga y el OCR para no depender de red ni modelos"""
+    fake = FakeOCR()
+    monkeypatch.setattr(ocr_routes, "download_image_bytes", fake.download)
+    monkeypatch.setattr(ocr_routes.ocr_pipeline, "extract", fake.extract)
+    return fake
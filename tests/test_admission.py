@@ -0,0 +1,175 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.api.dependencies import admission as admission_dependency
+from src.api.routes import ocr as ocr_routes
+from src.services.admission import (
+    AdmissionController,
+    OverloadedError,
+    RateLimitedError,
+    TokenBucket
+)
+
+client = TestClient(app)
+
+
+def test_token_bucket_refills_over_time():
+    """El bucket admite la ráfaga y después recupera `rate` unidades por segundo"""
+    bucket = TokenBucket(rate=2, burst=3, now=0.0)
+
+    assert bucket.take(3, now=0.0) == 0
+    assert bucket.take(1, now=0.0) == pytest.approx(0.5)
+    assert bucket.take(1, now=0.5) == 0
+
+
+def test_rate_limit_is_per_client():
+    """Un cliente que agota su límite no afecta a los demás"""
+    controller = AdmissionController(rate_per_second=0.001, burst=2)
+
+    controller.admit("a", cost=2).release()
+    with pytest.raises(RateLimitedError) as exc_info:
+        controller.admit("a")
+    assert exc_info.value.retry_after >= 1
+
+    controller.admit("b").release()
+
+
+def test_global_cost_cap_sheds_load():
+    """Por encima del coste máximo en vuelo se rechaza; al liberar vuelve a admitir"""
+    controller = AdmissionController(max_cost=4, retry_after=3)
+
+    first = controller.admit("a", cost=3)
+    with pytest.raises(OverloadedError) as exc_info:
+        controller.admit("b", cost=2)
+    assert exc_info.value.retry_after == 3
+
+    first.release()
+    first.release()
+    assert controller.in_flight_cost == 0
+    controller.admit("b", cost=2)
+
+
+def test_large_request_is_admitted_when_idle():
+    """Una imagen más cara que el tope se admite si no hay nada más en vuelo"""
+    controller = AdmissionController(max_cost=4)
+
+    ticket = controller.admit("a")
+    ticket.resize(10)
+    assert controller.in_flight_cost == 10
+
+    with pytest.raises(OverloadedError):
+        controller.admit("b")
+
+
+def test_cost_estimate_prefers_pixels():
+    """El coste sale de los píxeles si se conocen y si no de los bytes"""
+    controller = AdmissionController(cost_unit_pixels=1_000_000, cost_unit_bytes=1000)
+
+    assert controller.estimate_cost() == 1
+    assert controller.estimate_cost(size_bytes=2500) == 3
+    assert controller.estimate_cost(size_bytes=2500, pixels=4_000_000) == 4
+
+
+def _use_controller(monkeypatch, controller: AdmissionController) -> None:
+    """Sustituye el control de admisión de la dependencia y de las rutas"""
+    monkeypatch.setattr(admission_dependency, "admission_controller", controller)
+    monkeypatch.setattr(ocr_routes, "admission_controller", controller)
+
+
+def test_endpoint_rejects_before_downloading(fake_ocr, monkeypatch):
+    """Con el límite agotado se responde 429 con Retry-After sin descargar la imagen"""
+    controller = AdmissionController(rate_per_second=0.001, burst=1)
+    controller.admit("key:cliente")
+    _use_controller(monkeypatch, controller)
+
+    response = client.post(
+        "/ocr/extract",
+        json={"image_url": "https://cdn.example.com/a.jpg"},
+        headers={"X-API-Key": "cliente"}
+    )
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert fake_ocr.downloads == []
+
+
+def test_endpoint_releases_capacity(fake_ocr, monkeypatch):
+    """Al terminar la petición se libera el coste reservado"""
+    controller = AdmissionController(max_cost=10)
+    _use_controller(monkeypatch, controller)
+
+    response = client.post(
+        "/ocr/extract/raw",
+        content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 16,
+        headers={"Content-Type": "image/png"}
+    )
+
+    assert response.status_code == 200
+    assert controller.in_flight_cost == 0
+
+
+def test_batch_items_are_charged_to_the_client(fake_ocr, monkeypatch):
+    """Cada imagen de un lote consume el límite del cliente; las que no caben vuelven con error"""
+    controller = AdmissionController(rate_per_second=0.001, burst=2)
+    _use_controller(monkeypatch, controller)
+
+    response = client.post(
+        "/ocr/batch",
+        json={"image_urls": [f"https://cdn.example.com/{i}.jpg" for i in range(4)]},
+        headers={"X-API-Key": "cliente"}
+    )
+
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert sorted(item["success"] for item in items) == [False, False, True, True]
+    assert len(fake_ocr.downloads) == 2
+    assert controller.in_flight_cost == 0
+
+
+def test_job_submission_is_admitted(monkeypatch):
+    """Encolar un trabajo se cobra como una petición: con el límite agotado responde 429"""
+    controller = AdmissionController(rate_per_second=0.001, burst=1)
+    controller.admit("key:cliente")
+    _use_controller(monkeypatch, controller)
+
+    response = client.post(
+        "/ocr/jobs",
+        json={"image_url": "https://cdn.example.com/a.jpg"},
+        headers={"X-API-Key": "cliente"}
+    )
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_url_image_cost_is_charged_to_the_client(fake_ocr, monkeypatch):
+    """El coste real de una imagen por URL, conocido tras descargarla, se cobra al cliente"""
+    controller = AdmissionController(rate_per_second=0.001, burst=6)
+    monkeypatch.setattr(controller, "estimate_image_cost", lambda data: 5)
+    _use_controller(monkeypatch, controller)
+
+    def extract(url):
+        return client.post(
+            "/ocr/extract", json={"image_url": url}, headers={"X-API-Key": "cliente"}
+        )
+
+    assert extract("https://cdn.example.com/grande.jpg").status_code == 200
+
+    response = extract("https://cdn.example.com/otra.jpg")
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert controller.in_flight_cost == 0
+
+
+def test_ticket_resize_takes_client_tokens():
+    """Ampliar la reserva cobra la diferencia al bucket del cliente que la pidió"""
+    controller = AdmissionController(rate_per_second=0.001, burst=4)
+    ticket = controller.admit("key:a")
+    ticket.resize(3)
+
+    with pytest.raises(RateLimitedError):
+        controller.admit("key:a", cost=2)
+    controller.admit("key:b", cost=4)
@@ -0,0 +1,87 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.core.config import settings
+
+client = TestClient(app)
+
+
+def _read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_batch_streams_one_line_per_image(fake_ocr):
+    """Cada imagen del lote produce una línea NDJSON con su resultado"""
+    payload = {
+        "image_urls": [f"https://cdn.example.com/{i}.jpg" for i in range(5)],
+        "min_confidence": 0.5
+    }
+
+    response = client.post("/ocr/batch", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = _read_ndjson(response)
+    assert sorted(item["index"] for item in items) == list(range(5))
+    assert all(item["success"] and item["total_lines"] == 1 for item in items)
+
+
+def test_batch_reports_errors_per_image(fake_ocr):
+    """Un fallo en una imagen no interrumpe el resto del lote"""
+    payload = {
+        "image_urls": [
+            "https://cdn.example.com/ok.jpg",
+            "https://cdn.example.com/missing.jpg"
+        ]
+    }
+
+    items = {item["index"]: item for item in _read_ndjson(
+        client.post("/ocr/batch", json=payload)
+    )}
+
+    assert items[0]["success"] is True
+    assert items[1]["success"] is False
+    assert items[1]["error"]
+
+
+def test_batch_from_manifest(fake_ocr):
+    """Las URLs también pueden llegar en un manifiesto subido como archivo"""
+    manifest = "https://cdn.example.com/a.jpg\n# comentario\n\nhttps://cdn.example.com/b.jpg\n"
+
+    response = client.post(
+        "/ocr/batch/manifest",
+        files={"manifest": ("urls.txt", manifest, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    assert len(_read_ndjson(response)) == 2
+
+
+def test_batch_requires_urls():
+    """Un lote vacío es un error de validación"""
+    response = client.post("/ocr/batch", json={"image_urls": []})
+
+    assert response.status_code == 422
+
+
+def test_batch_rejects_unknown_language(fake_ocr):
+    """Un idioma no disponible se rechaza antes de empezar el stream"""
+    payload = {"image_urls": ["https://cdn.example.com/ok.jpg"], "lang": "klingon"}
+
+    response = client.post("/ocr/batch", json=payload)
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_profile_without_recognizer_for_language(fake_ocr, monkeypatch):
+    """Un perfil cuyo reconocedor no lee el idioma responde 400; es con 'accurate' se acepta"""
+    monkeypatch.setattr(settings, "ocr_langs", "en,es,korean")
+    urls = ["https://cdn.example.com/ok.jpg"]
+
+    rejected = client.post("/ocr/batch", json={"image_urls": urls, "lang": "korean", "profile": "accurate"})
+    accepted = client.post("/ocr/batch", json={"image_urls": urls, "lang": "es", "profile": "accurate"})
+
+    assert rejected.status_code == 400
+    assert accepted.status_code == 200
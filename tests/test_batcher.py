@@ -0,0 +1,109 @@
+import asyncio
+
+from src.core.metrics import start_timings
+from src.services.batcher import MicroBatcher
+
+
+class FakeExecutor:
+    """Executor falso que registra los lotes recibidos"""
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.model_keys = []
+        self.error = error
+
+    async def run_timed(self, method, images, model_key=None, weight=1):
+        assert method == "extract_batch"
+        assert weight == len(images)
+        self.batches.append(list(images))
+        self.model_keys.append(model_key)
+        if self.error:
+            raise self.error
+        results = [[{"box": [], "text": image, "confidence": 1.0}] for image in images]
+        return results, {"inference": 0.25, "queue_wait": 0.5}
+
+
+def test_groups_requests_within_window():
+    """Las peticiones dentro de la ventana se procesan en un único lote"""
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, window_ms=20, max_batch_size=8)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(batcher.submit(f"img{i}.jpg") for i in range(3))
+        )
+
+    results = asyncio.run(scenario())
+
+    assert executor.batches == [["img0.jpg", "img1.jpg", "img2.jpg"]]
+    assert [r[0]["text"] for r in results] == ["img0.jpg", "img1.jpg", "img2.jpg"]
+
+
+def test_flushes_when_batch_is_full():
+    """Al completar el tamaño máximo se envía el lote sin esperar la ventana"""
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, window_ms=1000, max_batch_size=2)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a.jpg"), batcher.submit("b.jpg")),
+            timeout=0.5
+        )
+
+    asyncio.run(scenario())
+
+    assert executor.batches == [["a.jpg", "b.jpg"]]
+
+
+def test_propagates_errors_to_every_request():
+    """Un error del lote llega a todas las peticiones que lo componen"""
+    batcher = MicroBatcher(FakeExecutor(error=RuntimeError("fallo")), window_ms=5)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit("a.jpg"), batcher.submit("b.jpg"),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_batch_timings_are_split_between_requests():
+    """Cada petición se queda con su parte de los tiempos del lote y su propia espera en cola"""
+    batcher = MicroBatcher(FakeExecutor(), window_ms=5)
+
+    async def request(image):
+        timings = start_timings()
+        await batcher.submit(image)
+        return timings
+
+    async def scenario():
+        return await asyncio.gather(request("a.jpg"), request("b.jpg"))
+
+    timings = asyncio.run(scenario())
+
+    assert [t["inference"] for t in timings] == [0.125, 0.125]
+    # La ventana del lote (5 ms) más la cola del pool
+    assert all(0.5 < t["queue_wait"] < 1.0 for t in timings)
+
+
+def test_batches_are_split_per_model():
+    """Las imágenes de modelos distintos no se mezclan en un mismo lote"""
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, window_ms=20, max_batch_size=8)
+    english = ("en", "default", "cpu")
+    spanish = ("es", "default", "cpu")
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit("a.jpg", english),
+            batcher.submit("b.jpg", spanish),
+            batcher.submit("c.jpg", english)
+        )
+
+    asyncio.run(scenario())
+
+    batches = dict(zip(executor.model_keys, executor.batches))
+    assert batches == {english: ["a.jpg", "c.jpg"], spanish: ["b.jpg"]}
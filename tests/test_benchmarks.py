@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.corpus import build_corpus, build_labeled_corpus
+from benchmarks.harness import BenchmarkRunner, percentile
+from benchmarks.profiles import edit_distance, summarize_accuracy, text_accuracy
+from benchmarks.server import CorpusServer
+from src.services.inference_executor import inference_executor
+from src.services.job_queue import job_queue
+from src.services.job_store import JobStore
+
+
+@pytest.fixture
+def fake_inference(monkeypatch):
+    """Sustituye el pool de inferencia para medir el harness sin modelos"""
+
+    async def start():
+        inference_executor.ready = True
+
+    async def run_timed(method, images, *args, **kwargs):
+        if method == "extract_batch":
+            return [[] for _ in images], {"inference": 0.001}
+        return [], {"inference": 0.001}
+
+    monkeypatch.setattr(inference_executor, "start", start)
+    monkeypatch.setattr(inference_executor, "run_timed", run_timed)
+    monkeypatch.setattr(job_queue, "_store", JobStore(":memory:"))
+
+
+def test_percentile_interpolates():
+    """Los percentiles interpolan entre las muestras más cercanas"""
+    values = [4.0, 1.0, 3.0, 2.0]
+
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
+
+
+def test_corpus_is_reproducible():
+    """La misma semilla genera exactamente las mismas imágenes"""
+    assert build_corpus(3, seed=7) == build_corpus(3, seed=7)
+    assert build_corpus(3, seed=7) != build_corpus(3, seed=8)
+
+
+def test_labeled_corpus_matches_corpus():
+    """El corpus con referencias tiene las mismas imágenes y una línea por fila"""
+    corpus, labels = build_labeled_corpus(3, seed=7)
+
+    assert corpus == build_corpus(3, seed=7)
+    assert set(labels) == set(corpus)
+    assert all(labels[name] and all(labels[name]) for name in labels)
+
+
+def test_text_accuracy_counts_character_errors():
+    """La precisión es 1 - CER sobre el texto en orden de lectura"""
+    assert edit_distance("TOTAL", "T0TAL") == 1
+    assert text_accuracy(["TOTAL 12.50"], ["TOTAL  12.50"])["accuracy"] == 1.0
+
+    report = text_accuracy(["TOTAL 12.50", "IVA 2.00"], ["T0TAL 12.50"])
+    assert report["edit_distance"] == 10
+    assert report["accuracy"] == pytest.approx(1 - 10 / 20)
+    assert summarize_accuracy([report, report])["accuracy"] == 0.5
+
+
+def test_corpus_server_serves_images():
+    """El servidor local sirve el corpus por HTTP"""
+    corpus = {"a.jpg": b"\xff\xd8\xff\xe0contenido"}
+
+    with CorpusServer(corpus) as server:
+        response = httpx.get(server.url("a.jpg"))
+        missing = httpx.get(server.url("b.jpg"))
+
+    assert response.content == corpus["a.jpg"]
+    assert response.headers["content-type"] == "image/jpeg"
+    assert missing.status_code == 404
+
+
+def test_runner_reports_every_scenario(fake_inference):
+    """El informe incluye throughput, percentiles, RSS y etapas por escenario"""
+    runner = BenchmarkRunner(
+        build_corpus(3), concurrency=2, requests=4, batch_size=2, warmup=1
+    )
+
+    report = asyncio.run(runner.run(["single", "batch", "cache_hit"]))
+
+    assert set(report["scenarios"]) == {"single", "batch", "cache_hit"}
+    for name, result in report["scenarios"].items():
+        assert result["errors"] == 0, name
+        assert result["images_per_sec"] > 0
+        assert set(result["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
+        assert result["peak_rss_mb"] > 0
+        assert "download" in result["stages"]
+    assert report["scenarios"]["batch"]["images"] == 8
+    assert "inference" in report["scenarios"]["single"]["stages"]
+    assert "inference" not in report["scenarios"]["cache_hit"]["stages"]
@@ -0,0 +1,151 @@
+import io
+
+import cv2
+import numpy as np
+import pypdfium2 as pdfium
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.core.config import settings
+from src.utils.document_pages import (
+    DocumentPage,
+    InvalidPageSelectionError,
+    count_pages,
+    is_document,
+    parse_page_range,
+    render_page,
+    split_document
+)
+from src.utils.image_downloader import ImageTooLargeError
+
+client = TestClient(app)
+
+
+def _pdf(pages: int = 3) -> bytes:
+    document = pdfium.PdfDocument.new()
+    for i in range(pages):
+        document.new_page(200 + i * 10, 300)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _tiff(tmp_path, pages: int = 3, sizes=None) -> bytes:
+    path = str(tmp_path / "documento.tiff")
+    sizes = sizes or [(20, 30)] * pages
+    images = [np.full((h, w, 3), i * 50, dtype=np.uint8) for i, (h, w) in enumerate(sizes)]
+    assert cv2.imwritemulti(path, images)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_parse_page_range():
+    """Las selecciones son base 1, admiten rangos abiertos y se ordenan"""
+    assert parse_page_range(None, 4) == [0, 1, 2, 3]
+    assert parse_page_range("3,1-2", 4) == [0, 1, 2]
+    assert parse_page_range("3-", 4) == [2, 3]
+    assert parse_page_range("2, 2", 4) == [1]
+
+
+@pytest.mark.parametrize("spec", ["0", "5", "3-2", "a-b", "1-9"])
+def test_parse_page_range_rejects_invalid(spec):
+    """Las páginas fuera del documento o mal escritas se rechazan"""
+    with pytest.raises(InvalidPageSelectionError):
+        parse_page_range(spec, 4)
+
+
+def test_pdf_pages_are_rendered_lazily():
+    """Solo se preparan las páginas pedidas y se rasterizan al DPI indicado"""
+    data = _pdf()
+
+    assert is_document(data)
+    assert count_pages(data) == 3
+
+    pages = split_document(data, pages="2", dpi=144)
+    assert [(page.index, page.dpi) for page in pages] == [(1, 144)]
+    # Cada página viaja al worker como un PDF propio, no con el documento entero
+    assert count_pages(pages[0].data) == 1
+
+    # 210x300 puntos a 144 DPI = el doble de píxeles
+    assert pages[0].render().shape == (600, 420, 3)
+
+
+def test_tiff_pages(tmp_path):
+    """Cada página del TIFF se decodifica por separado"""
+    data = _tiff(tmp_path)
+
+    assert count_pages(data) == 3
+    page = split_document(data, pages="3")[0]
+    assert page.index == 2
+    assert count_pages(page.data) == 1
+    assert len(page.data) < len(data)
+    assert page.render().mean() == 100
+
+
+def test_oversized_tiff_page_is_rejected_before_decoding(tmp_path, monkeypatch):
+    """Cada página del TIFF se comprueba contra MAX_IMAGE_PIXELS, no solo la primera"""
+    monkeypatch.setattr(settings, "max_image_pixels", 10000)
+    data = _tiff(tmp_path, sizes=[(20, 30), (400, 400)])
+
+    assert split_document(data, pages="1")[0].render().shape == (20, 30, 3)
+    with pytest.raises(ImageTooLargeError):
+        split_document(data)
+    with pytest.raises(ImageTooLargeError):
+        render_page(data, 1, 72)
+
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("escaneo.tiff", data, "image/tiff")}
+    )
+    assert response.status_code == 413
+
+
+def test_plain_images_are_a_single_page():
+    """Una imagen normal no se divide"""
+    ok, encoded = cv2.imencode(".png", np.zeros((10, 10, 3), dtype=np.uint8))
+    assert ok
+    data = encoded.tobytes()
+
+    assert not is_document(data)
+    assert split_document(data) == [data]
+
+
+def test_max_pages(monkeypatch):
+    """No se aceptan más páginas que DOCUMENT_MAX_PAGES"""
+    monkeypatch.setattr(settings, "document_max_pages", 2)
+
+    with pytest.raises(InvalidPageSelectionError):
+        split_document(_pdf(3))
+
+
+def test_upload_pdf_returns_pages(fake_ocr):
+    """Un PDF subido se procesa por páginas y se devuelve cada una por separado"""
+    fake_ocr.results = lambda page: [{
+        "box": [[0, 0], [1, 0], [1, 1], [0, 1]],
+        "text": f"página {page.index + 1}",
+        "confidence": 0.9
+    }]
+
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("factura.pdf", _pdf(), "application/pdf")},
+        data={"pages": "1,3"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [page["page_index"] for page in body["pages"]] == [0, 2]
+    assert [line["text"] for line in body["results"]] == ["página 1", "página 3"]
+    assert all(isinstance(page, DocumentPage) for page in fake_ocr.received)
+
+
+def test_invalid_page_selection_returns_400():
+    """Una selección fuera del documento responde 400"""
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("factura.pdf", _pdf(), "application/pdf")},
+        data={"pages": "7"}
+    )
+
+    assert response.status_code == 400
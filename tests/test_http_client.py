@@ -0,0 +1,40 @@
+import asyncio
+
+from src.utils.http_client import HTTPClientManager
+
+
+def test_reuses_client_within_event_loop():
+    """Dentro del mismo event loop se reutiliza el mismo cliente"""
+    manager = HTTPClientManager()
+
+    async def scenario():
+        first = manager.get_client()
+        second = manager.get_client()
+        await manager.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+
+
+def test_per_host_limit():
+    """No se superan las descargas simultáneas configuradas por host"""
+    manager = HTTPClientManager(per_host_limit=2)
+    active = {"now": 0, "max": 0}
+
+    async def download(url):
+        async with manager.host_slot(url):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+
+    async def scenario():
+        await asyncio.gather(
+            *(download(f"https://cdn.example.com/{i}.jpg") for i in range(6))
+        )
+
+    asyncio.run(scenario())
+
+    assert active["max"] == 2
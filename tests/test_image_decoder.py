@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.utils.image_decoder import decode_image
+
+
+def _encode(image: np.ndarray, ext: str = ".png") -> bytes:
+    ok, encoded = cv2.imencode(ext, image)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_decode_png_bytes():
+    """Los bytes de un PNG se decodifican a un array BGR"""
+    image = np.zeros((20, 30, 3), dtype=np.uint8)
+    image[:, :, 2] = 255
+
+    decoded = decode_image(_encode(image))
+
+    assert decoded.shape == (20, 30, 3)
+    assert np.array_equal(decoded, image)
+
+
+def test_decode_memoryview():
+    """También se aceptan vistas de memoria sin copiar los bytes"""
+    image = np.full((8, 8, 3), 128, dtype=np.uint8)
+
+    decoded = decode_image(memoryview(_encode(image)))
+
+    assert decoded.shape == (8, 8, 3)
+
+
+def test_decode_invalid_data():
+    """Un contenido que no es imagen produce ValueError"""
+    with pytest.raises(ValueError):
+        decode_image(b"esto no es una imagen")
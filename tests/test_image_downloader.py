@@ -0,0 +1,82 @@
+import asyncio
+
+import cv2
+import httpx
+import numpy as np
+import pytest
+
+from src.utils import image_downloader
+from src.utils.image_downloader import (
+    ImageTooLargeError,
+    UnsupportedImageError,
+    download_image_bytes
+)
+from src.utils.image_format import read_image_size, sniff_image_format
+
+
+def _encode(ext: str, width: int = 40, height: int = 30) -> bytes:
+    ok, encoded = cv2.imencode(ext, np.zeros((height, width, 3), dtype=np.uint8))
+    assert ok
+    return encoded.tobytes()
+
+
+@pytest.mark.parametrize("ext, expected", [
+    (".jpg", "jpeg"),
+    (".png", "png"),
+    (".bmp", "bmp"),
+    (".tiff", "tiff"),
+    (".webp", "webp"),
+])
+def test_sniff_format_and_size(ext, expected):
+    """El formato y las dimensiones se leen de la cabecera sin decodificar"""
+    data = _encode(ext)
+
+    assert sniff_image_format(data[:12]) == expected
+    assert read_image_size(data) == (40, 30)
+
+
+def test_sniff_rejects_non_images():
+    """Un HTML no se reconoce como imagen"""
+    assert sniff_image_format(b"<!DOCTYPE html><html>") is None
+
+
+def _download(monkeypatch, content: bytes, headers=None, **kwargs):
+    def handler(request):
+        return httpx.Response(200, content=content, headers=headers)
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(image_downloader.http_client, "get_client", lambda: client)
+        try:
+            return await download_image_bytes("https://cdn.example.com/img", **kwargs)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_download_valid_image(monkeypatch):
+    """Una imagen válida se devuelve completa en memoria"""
+    data = _encode(".png")
+
+    assert _download(monkeypatch, data) == data
+
+
+def test_download_rejects_non_image(monkeypatch):
+    """Un contenido que no es imagen se rechaza al leer el primer bloque"""
+    with pytest.raises(UnsupportedImageError):
+        _download(monkeypatch, b"<html><body>Not found</body></html>")
+
+
+def test_download_rejects_oversized_body(monkeypatch):
+    """Se aborta la descarga al superar el máximo de bytes"""
+    with pytest.raises(ImageTooLargeError):
+        _download(monkeypatch, _encode(".bmp"), max_bytes=100)
+
+
+def test_download_rejects_too_many_pixels(monkeypatch):
+    """Las dimensiones de la cabecera se comparan con el máximo de píxeles"""
+    monkeypatch.setattr(image_downloader.settings, "max_image_pixels", 100)
+
+    with pytest.raises(ImageTooLargeError):
+        _download(monkeypatch, _encode(".png"))
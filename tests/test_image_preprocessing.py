@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.utils.image_preprocessing import max_side_for_text_height, prepare_image
+
+
+def test_caps_long_side_and_reports_scale():
+    """Las imágenes grandes se reducen al lado máximo conservando la proporción"""
+    image = np.zeros((4000, 6000, 3), dtype=np.uint8)
+
+    prepared, scale = prepare_image(image, max_side=2560)
+
+    assert prepared.shape == (1707, 2560, 3)
+    assert scale == 2560 / 6000
+
+
+def test_small_images_are_untouched():
+    """Por debajo del límite no se redimensiona"""
+    image = np.zeros((600, 800, 3), dtype=np.uint8)
+
+    prepared, scale = prepare_image(image, max_side=2560)
+
+    assert prepared is image
+    assert scale == 1.0
+
+
+def test_normalizes_colorspace():
+    """Gris y BGRA se convierten a BGR de 3 canales"""
+    gray, _ = prepare_image(np.zeros((10, 10), dtype=np.uint8))
+    bgra, _ = prepare_image(np.zeros((10, 10, 4), dtype=np.uint8))
+
+    assert gray.shape == (10, 10, 3)
+    assert bgra.shape == (10, 10, 3)
+
+
+def test_max_side_from_text_height():
+    """El lado máximo se deriva de la altura de texto objetivo"""
+    assert max_side_for_text_height(32, 0.0125) == 2560
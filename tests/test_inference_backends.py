@@ -0,0 +1,112 @@
+import importlib.util
+import json
+
+import pytest
+
+from benchmarks.corpus import build_corpus
+from benchmarks.parity import compare_results, run_backend, summarize
+from src.core.config import settings
+from src.services.inference_backends import (
+    MANIFEST_FILENAME,
+    BackendUnavailableError,
+    backend_options,
+    load_manifest,
+    manifest_key
+)
+
+KEY = ("en", "default", "cpu")
+
+
+@pytest.fixture
+def exported(tmp_path):
+    """Directorio con el índice de un modelo exportado"""
+    manifest = {
+        "en:default": {
+            "det": {"name": "PP-OCRv5_server_det", "dir": "PP-OCRv5_server_det"},
+            "rec": {"name": "en_PP-OCRv5_mobile_rec", "dir": "en_PP-OCRv5_mobile_rec"}
+        }
+    }
+    (tmp_path / MANIFEST_FILENAME).write_text(json.dumps(manifest))
+    return tmp_path
+
+
+def _line(text, x, y, confidence=0.9):
+    box = [[x, y], [x + 100, y], [x + 100, y + 20], [x, y + 20]]
+    return {"box": box, "text": text, "confidence": confidence}
+
+
+def test_paddle_backend_only_sets_threads():
+    """El motor de Paddle solo recibe los hilos de CPU, si se configuran"""
+    assert backend_options(KEY, "paddle", cpu_threads=0) == {}
+    assert backend_options(KEY, "paddle", cpu_threads=4) == {"cpu_threads": 4}
+
+
+def test_onnxruntime_backend_uses_exported_models(exported):
+    """ONNX Runtime usa los modelos del índice y los hilos intra-op"""
+    options = backend_options(KEY, "onnxruntime", cpu_threads=4, model_dir=str(exported))
+
+    assert options["engine"] == "onnxruntime"
+    assert options["engine_config"] == {"inter_op_num_threads": 1, "intra_op_num_threads": 4}
+    assert options["text_detection_model_name"] == "PP-OCRv5_server_det"
+    assert options["text_recognition_model_dir"] == str(exported / "en_PP-OCRv5_mobile_rec")
+
+
+def test_openvino_backend_goes_through_hpi(exported):
+    """OpenVINO se pide a la inferencia de alto rendimiento de PaddleX"""
+    options = backend_options(KEY, "openvino", cpu_threads=2, model_dir=str(exported))
+
+    assert options["enable_hpi"] is True
+    assert options["engine_config"]["backend"] == "openvino"
+    assert options["engine_config"]["backend_config"] == {"cpu_num_threads": 2}
+
+
+def test_missing_export_is_reported(tmp_path):
+    """Sin modelos exportados el motor no está disponible"""
+    assert load_manifest(str(tmp_path)) == {}
+    with pytest.raises(BackendUnavailableError):
+        backend_options(KEY, "onnxruntime", model_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        backend_options(KEY, "tensorflow")
+
+
+def test_compare_identical_results():
+    """Los mismos resultados dan paridad total"""
+    results = [_line("TOTAL", 10, 10), _line("IVA", 10, 50)]
+
+    report = compare_results(results, [dict(line) for line in reversed(results)])
+
+    assert report["matched"] == 2
+    assert report["text_agreement"] == 1.0
+    assert report["max_box_delta"] == 0.0
+
+
+def test_compare_reports_differences():
+    """Se miden las cajas desplazadas, los textos distintos y las líneas sin pareja"""
+    reference = [_line("TOTAL", 10, 10, 0.9), _line("IVA", 10, 50), _line("FECHA", 10, 300)]
+    candidate = [_line("TOTAL", 12, 11, 0.8), _line("1VA", 10, 50)]
+
+    report = compare_results(reference, candidate)
+
+    assert report["matched"] == 2
+    assert report["text_agreement"] == 0.5
+    assert report["max_box_delta"] == 2.0
+    assert report["max_confidence_delta"] == pytest.approx(0.1)
+    assert summarize([report, report])["text_agreement"] == 0.5
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("onnxruntime") is None
+    or manifest_key(settings.ocr_lang, settings.ocr_model_variant) not in load_manifest(),
+    reason="requiere onnxruntime y los modelos exportados con tools.export_models"
+)
+def test_onnxruntime_matches_paddle():
+    """ONNX Runtime reproduce los resultados del motor de Paddle"""
+    corpus = build_corpus(3, seed=0)
+
+    paddle = run_backend("paddle", corpus)["results"]
+    onnx = run_backend("onnxruntime", corpus)["results"]
+    report = summarize([compare_results(paddle[name], onnx[name]) for name in corpus])
+
+    assert report["matched"] >= 0.95 * report["lines"]
+    assert report["text_agreement"] >= 0.95
+    assert report["max_box_delta"] <= 4.0
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.services import inference_executor as executor_module
+from src.services.inference_executor import (
+    InferenceExecutor,
+    InferenceQueueFullError
+)
+from src.services.model_registry import ModelRegistry
+
+
+class FakeOCRService:
+    """Servicio falso que evita cargar los modelos de PaddleOCR"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def extract_text_only(self, image_path: str) -> str:
+        return f"texto de {image_path}"
+
+    def wait(self) -> str:
+        self.release.wait(timeout=5)
+        return "ok"
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    service = FakeOCRService()
+
+    def init_worker():
+        executor_module._worker_state.registry = ModelRegistry(lambda key: service)
+
+    monkeypatch.setattr(executor_module, "_init_worker", init_worker)
+    return service
+
+
+def test_run_in_thread_pool(fake_service):
+    """El método del servicio se ejecuta en el pool y devuelve su resultado"""
+    executor = InferenceExecutor(pool="thread", max_workers=1, queue_size=1)
+
+    async def scenario():
+        return await executor.run("extract_text_only", "imagen.jpg")
+
+    try:
+        assert asyncio.run(scenario()) == "texto de imagen.jpg"
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_when_queue_is_full(fake_service):
+    """Con la cola llena se rechaza el trabajo con el Retry-After configurado"""
+    executor = InferenceExecutor(
+        pool="thread", max_workers=1, queue_size=0, retry_after=7
+    )
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("wait"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(InferenceQueueFullError) as exc_info:
+            await executor.run("extract_text_only", "otra.jpg")
+
+        fake_service.release.set()
+        assert await running == "ok"
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+        assert error.retry_after == 7
+    finally:
+        executor.shutdown()
+
+
+def test_batches_count_each_image_toward_the_queue(fake_service):
+    """Un lote ocupa un hueco de la cola por imagen, no uno por lote"""
+    executor = InferenceExecutor(pool="thread", max_workers=1, queue_size=2)
+
+    async def scenario():
+        batch = asyncio.ensure_future(executor.run("wait", weight=2))
+        await asyncio.sleep(0.05)
+        assert executor.pending == 2
+
+        with pytest.raises(InferenceQueueFullError):
+            await executor.run("extract_text_only", "lote.jpg", weight=2)
+        single = asyncio.ensure_future(executor.run("extract_text_only", "sola.jpg"))
+
+        fake_service.release.set()
+        return await batch, await single
+
+    try:
+        assert asyncio.run(scenario()) == ("ok", "texto de sola.jpg")
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+def test_invalid_pool_type():
+    """Solo se admiten pools de procesos o hilos"""
+    with pytest.raises(ValueError):
+        InferenceExecutor(pool="gpu")
+
+
+def test_start_marks_executor_ready(fake_service):
+    """start() crea los workers y marca el executor como listo"""
+    executor = InferenceExecutor(pool="thread", max_workers=2, queue_size=0)
+
+    try:
+        assert executor.ready is False
+        asyncio.run(executor.start())
+        assert executor.ready is True
+    finally:
+        executor.shutdown()
+
+
+def test_start_reports_worker_errors(monkeypatch):
+    """Si un worker no puede cargar el modelo, el error queda registrado"""
+    def broken_init():
+        raise RuntimeError("modelo no disponible")
+
+    monkeypatch.setattr(executor_module, "_init_worker", broken_init)
+    executor = InferenceExecutor(pool="thread", max_workers=1, queue_size=0)
+
+    try:
+        with pytest.raises(Exception):
+            asyncio.run(executor.start())
+        assert executor.ready is False
+        assert executor.startup_error
+    finally:
+        executor.shutdown()
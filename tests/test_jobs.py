@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.services import job_queue as job_queue_module
+from src.services.job_queue import JobQueue, job_queue
+from src.services.job_store import JobStore
+
+client = TestClient(app)
+
+
+def test_store_claims_by_priority_then_age():
+    """Los trabajos de prioridad alta se atienden antes que los antiguos"""
+    store = JobStore(":memory:")
+    low = store.create("ocr", {"n": 1}, priority="low")
+    normal = store.create("ocr", {"n": 2})
+    high = store.create("ocr", {"n": 3}, priority="high")
+
+    claimed = [store.claim_next()["id"] for _ in range(3)]
+
+    assert claimed == [high["id"], normal["id"], low["id"]]
+    assert store.claim_next() is None
+
+
+def test_store_persists_and_requeues_interrupted_jobs(tmp_path):
+    """Un trabajo en ejecución al apagar vuelve a la cola al reabrir el almacén"""
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job = store.create("ocr", {"image_url": "https://cdn.example.com/a.jpg"})
+    store.claim_next()
+    store.close()
+
+    reopened = JobStore(path)
+    assert reopened.get(job["id"])["status"] == "running"
+    assert reopened.requeue_running() == 1
+    assert reopened.get(job["id"])["status"] == "queued"
+    assert reopened.get(job["id"])["payload"] == {"image_url": "https://cdn.example.com/a.jpg"}
+
+
+def _run_queue(queue: JobQueue, submit) -> dict:
+    async def scenario():
+        await queue.start()
+        try:
+            job = await submit()
+            for _ in range(200):
+                current = await queue.get(job["id"])
+                if current["status"] in ("succeeded", "failed") and (
+                    not current["webhook_url"] or current["webhook_status"]
+                ):
+                    return current
+                await asyncio.sleep(0.01)
+            raise AssertionError("El trabajo no terminó")
+        finally:
+            await queue.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_queue_runs_jobs_in_background():
+    """Los workers ejecutan el handler y guardan el resultado"""
+    queue = JobQueue(":memory:")
+
+    async def handler(payload):
+        return {"eco": payload["texto"]}
+
+    queue.register("ocr", handler)
+    job = _run_queue(queue, lambda: queue.submit("ocr", {"texto": "hola"}))
+
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"eco": "hola"}
+    assert job["started_at"] and job["finished_at"]
+
+
+def test_queue_records_failures():
+    """Un error del handler deja el trabajo en 'failed' con el mensaje"""
+    queue = JobQueue(":memory:")
+
+    async def handler(payload):
+        raise ValueError("imagen corrupta")
+
+    queue.register("ocr", handler)
+    job = _run_queue(queue, lambda: queue.submit("ocr", {}))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "imagen corrupta"
+
+
+def test_queue_notifies_webhook(monkeypatch):
+    """Al terminar se envía el trabajo al webhook"""
+    received = []
+
+    def handler(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(204)
+
+    webhook_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(job_queue_module.http_client, "get_client", lambda: webhook_client)
+
+    queue = JobQueue(":memory:")
+
+    async def ocr(payload):
+        return {"success": True}
+
+    queue.register("ocr", ocr)
+    job = _run_queue(queue, lambda: queue.submit(
+        "ocr", {}, webhook_url="https://hooks.example.com/ocr"
+    ))
+
+    assert job["webhook_status"] == "delivered"
+    assert received[0]["id"] == job["id"]
+    assert received[0]["status"] == "succeeded"
+
+
+def test_store_calls_run_off_the_event_loop():
+    """Las operaciones de SQLite se ejecutan en un hilo, no en el del event loop"""
+    queue = JobQueue(":memory:")
+
+    async def handler(payload):
+        return {}
+
+    queue.register("ocr", handler)
+    threads = []
+    create = queue.store.create
+
+    def recording_create(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return create(*args, **kwargs)
+
+    queue.store.create = recording_create
+
+    async def scenario():
+        job = await queue.submit("ocr", {})
+        return job, threading.get_ident()
+
+    job, loop_thread = asyncio.run(scenario())
+
+    assert job["status"] == "queued"
+    assert threads and threads[0] != loop_thread
+
+
+@pytest.fixture
+def memory_store(monkeypatch):
+    """Usa un almacén en memoria para no crear archivos en las pruebas"""
+    monkeypatch.setattr(job_queue, "_store", JobStore(":memory:"))
+
+
+def test_create_and_get_job_endpoints(memory_store):
+    """POST /ocr/jobs responde al instante con el id; GET devuelve el estado"""
+    response = client.post("/ocr/jobs", json={
+        "image_url": "https://cdn.example.com/catalogo.jpg",
+        "priority": "high",
+        "webhook_url": "https://hooks.example.com/ocr"
+    })
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert job["priority"] == "high"
+
+    status = client.get(f"/ocr/jobs/{job['id']}")
+    assert status.status_code == 200
+    assert status.json()["id"] == job["id"]
+
+
+def test_unknown_job_returns_404(memory_store):
+    """Un id inexistente responde 404"""
+    assert client.get("/ocr/jobs/no-existe").status_code == 404
@@ -0,0 +1,132 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+
+from src.core import launcher
+from src.core.config import settings
+from src.services import inference_executor as executor_module
+from src.services import paddleOCR
+from src.services.model_registry import resolve_model_key
+
+
+class FakeService:
+    """Servicio falso que cuenta los calentamientos"""
+
+    def __init__(self, key):
+        self.key = key
+        self.warmups = 0
+
+    def warmup(self, iterations: int) -> None:
+        self.warmups += iterations
+
+
+async def pid_app(scope, receive, send):
+    """Aplicación ASGI mínima que responde con el pid del proceso"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(os.getpid()).encode()})
+
+
+@pytest.fixture
+def shared_models(monkeypatch):
+    default = FakeService(resolve_model_key())
+    created = []
+
+    def create_service(key):
+        created.append(key)
+        return FakeService(key)
+
+    monkeypatch.setattr(settings, "ocr_pinned_langs", "es")
+    monkeypatch.setattr(executor_module, "_shared_models", {})
+    monkeypatch.setattr(executor_module, "_create_service", create_service)
+    monkeypatch.setattr(paddleOCR, "get_ocr_service", lambda: default)
+    return default, created
+
+
+def test_preload_loads_pinned_models_once(shared_models):
+    """Se cargan el modelo por defecto y los fijados, sin calentarlos"""
+    default, created = shared_models
+
+    loaded = executor_module.preload_shared_models()
+    executor_module.preload_shared_models()
+
+    assert loaded == [resolve_model_key(), resolve_model_key("es")]
+    assert created == [resolve_model_key("es")]
+    assert default.warmups == 0
+
+
+def test_primary_worker_reuses_shared_models(shared_models, monkeypatch):
+    """El primer worker de inferencia usa y calienta los modelos precargados"""
+    default, created = shared_models
+    monkeypatch.setattr(executor_module, "_primary_claimed", False)
+    monkeypatch.setattr(executor_module, "_worker_state", threading.local())
+    monkeypatch.setattr(settings, "warmup_iterations", 1)
+    executor_module.preload_shared_models()
+    shared = executor_module._shared_models[resolve_model_key("es")]
+
+    executor_module._init_worker()
+    registry = executor_module._worker_state.registry
+
+    assert registry.get(resolve_model_key()) is default
+    assert registry.get(resolve_model_key("es")) is shared
+    assert default.warmups == 1 and shared.warmups == 1
+    assert created == [resolve_model_key("es")]
+
+
+def test_prefork_uses_a_single_inference_thread(monkeypatch):
+    """En modo prefork solo hay un hilo de inferencia, el que reutiliza los modelos precargados"""
+    monkeypatch.setattr(settings, "inference_pool", "process")
+    monkeypatch.setattr(settings, "inference_workers", 4)
+
+    launcher._configure_inference_pool()
+
+    assert settings.inference_pool == "thread"
+    assert settings.inference_workers == 1
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere fork()")
+def test_serve_forks_workers_on_shared_socket(tmp_path):
+    """Los procesos hijos atienden el mismo puerto y se detienen con SIGTERM"""
+    port = _free_port()
+    code = (
+        "from src.core.launcher import serve; "
+        f"serve('tests.test_launcher:pid_app', '127.0.0.1', {port}, 2, preload=False)"
+    )
+    env = {**os.environ, "JOB_STORE_PATH": str(tmp_path / "jobs.sqlite3")}
+    server = subprocess.Popen([sys.executable, "-c", code], env=env)
+
+    try:
+        pids = set()
+        deadline = time.monotonic() + 20
+        while len(pids) < 2 and time.monotonic() < deadline:
+            try:
+                with httpx.Client() as client:
+                    pids.add(int(client.get(f"http://127.0.0.1:{port}/").text))
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        assert len(pids) == 2
+        assert server.pid not in pids
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=10) == 0
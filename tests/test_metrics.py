@@ -0,0 +1,90 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.core.metrics import record_stage, stage_timer, start_timings
+from src.services import inference_executor as executor_module
+from src.services.inference_executor import InferenceExecutor
+from src.services.model_registry import ModelRegistry
+
+client = TestClient(app)
+
+
+class FakeOCRService:
+    """Servicio falso que registra una etapa como lo haría PaddleOCRService"""
+
+    def extract_text(self, image):
+        record_stage("detection", 0.5)
+        return []
+
+
+def test_stage_timer_accumulates():
+    """Las etapas repetidas se suman en el contexto actual"""
+    timings = start_timings()
+
+    with stage_timer("decode"):
+        pass
+    record_stage("decode", 1.0)
+
+    assert timings["decode"] >= 1.0
+
+
+def test_worker_timings_are_merged_into_request(monkeypatch):
+    """Los tiempos del worker (y la espera en cola) llegan a la petición"""
+    def init_worker():
+        executor_module._worker_state.registry = ModelRegistry(lambda key: FakeOCRService())
+
+    monkeypatch.setattr(executor_module, "_init_worker", init_worker)
+    executor = InferenceExecutor(pool="thread", max_workers=1, queue_size=0)
+
+    async def scenario():
+        timings = start_timings()
+        await executor.run("extract_text", b"imagen")
+        return timings
+
+    try:
+        timings = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert "queue_wait" in timings
+    assert timings["detection"] == 0.5
+
+
+def test_extract_returns_timings_when_requested(fake_ocr):
+    """include_timings añade los segundos por etapa a la respuesta"""
+    response = client.post("/ocr/extract", json={
+        "image_url": "https://cdn.example.com/ticket.jpg",
+        "include_timings": True
+    })
+
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    assert timings["download"] == 0.1
+    assert timings["detection"] == 0.2
+    assert "serialize" in timings
+
+
+def test_extract_omits_timings_by_default(fake_ocr):
+    """Sin include_timings la respuesta no cambia de forma"""
+    response = client.post("/ocr/extract", json={
+        "image_url": "https://cdn.example.com/ticket.jpg"
+    })
+
+    assert response.json()["timings"] is None
+
+
+def test_metrics_endpoint(fake_ocr):
+    """/metrics expone las etapas, la cola de inferencia y la latencia HTTP"""
+    client.post("/ocr/extract", json={"image_url": "https://cdn.example.com/ticket.jpg"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'ocr_stage_duration_seconds_count{stage="download"}' in body
+    assert "ocr_inference_queue_depth" in body
+    assert "ocr_inference_in_flight" in body
+    assert "ocr_downloaded_bytes_total" in body
+    assert 'path="/ocr/extract"' in body
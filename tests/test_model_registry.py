@@ -0,0 +1,107 @@
+import pytest
+
+from src.core.config import settings
+from src.services import model_registry as registry_module
+from src.services.model_registry import (
+    ModelRegistry,
+    UnknownModelError,
+    profile_variant,
+    resolve_model_key,
+    variant_options
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def fake_memory(monkeypatch):
+    """Simula que cada modelo cargado ocupa 100 MB de RSS"""
+    rss = {"value": 0}
+
+    def factory(key):
+        rss["value"] += 100 * MB
+        return f"servicio {key[0]}"
+
+    monkeypatch.setattr(registry_module, "_current_rss", lambda: rss["value"])
+    return factory
+
+
+def test_models_load_on_first_use(fake_memory):
+    """Cada clave se carga una sola vez y después se reutiliza"""
+    registry = ModelRegistry(fake_memory)
+    key = ("es", "default", "cpu")
+
+    assert registry.get(key) == "servicio es"
+    assert registry.get(key) == "servicio es"
+    assert registry.loads == 1
+    assert registry.stats()["models"] == [{"key": ["es", "default", "cpu"], "memory_mb": 100.0}]
+
+
+def test_evicts_least_recently_used(fake_memory):
+    """Al superar el presupuesto se descarga el modelo menos usado"""
+    registry = ModelRegistry(fake_memory, memory_budget_mb=250)
+    en, es, ch = [(lang, "default", "cpu") for lang in ("en", "es", "ch")]
+
+    registry.get(en)
+    registry.get(es)
+    registry.get(en)
+    registry.get(ch)
+
+    assert registry.loaded() == [en, ch]
+    assert registry.evictions == 1
+
+
+def test_pinned_models_stay_resident(fake_memory):
+    """Los modelos fijados no se descargan aunque sean los menos usados"""
+    en, es, ch = [(lang, "default", "cpu") for lang in ("en", "es", "ch")]
+    registry = ModelRegistry(fake_memory, memory_budget_mb=250, pinned=[en])
+
+    registry.get(en)
+    registry.get(es)
+    registry.get(ch)
+
+    assert registry.loaded() == [en, ch]
+
+
+def test_resolve_model_key(monkeypatch):
+    """El idioma se valida contra OCR_LANGS y por defecto es OCR_LANG"""
+    monkeypatch.setattr(settings, "ocr_lang", "en")
+    monkeypatch.setattr(settings, "ocr_langs", "en,es")
+    monkeypatch.setattr(settings, "ocr_model_variant", "default")
+
+    assert resolve_model_key() == ("en", "default", settings.ocr_device)
+    assert resolve_model_key("es", "mobile")[:2] == ("es", "mobile")
+    with pytest.raises(UnknownModelError):
+        resolve_model_key("fr")
+    with pytest.raises(UnknownModelError):
+        resolve_model_key("es", "gigante")
+
+
+def test_profiles_map_to_model_variants():
+    """Cada perfil usa su variante de modelo; sin perfil, la configurada"""
+    assert profile_variant("fast") == "fast"
+    assert profile_variant("balanced") == "default"
+    assert profile_variant("accurate") == "accurate"
+    assert profile_variant(None) is None
+    assert resolve_model_key("en", profile_variant("fast"))[1] == "fast"
+
+    with pytest.raises(UnknownModelError):
+        profile_variant("turbo")
+
+
+def test_profile_recognizer_depends_on_language(monkeypatch):
+    """'accurate' lee es con el reconocedor PP-OCRv6 latino y rechaza los idiomas que no cubre"""
+    monkeypatch.setattr(settings, "ocr_langs", "en,es,korean")
+
+    key = resolve_model_key("es", profile_variant("accurate"))
+    options = variant_options(key)
+
+    assert key[:2] == ("es", "accurate")
+    assert options["text_detection_model_name"] == "PP-OCRv6_medium_det"
+    assert options["text_recognition_model_name"] == "PP-OCRv6_medium_rec"
+    assert variant_options(resolve_model_key("es", "fast"))["text_recognition_model_name"] == \
+        "PP-OCRv6_small_rec"
+    with pytest.raises(UnknownModelError):
+        resolve_model_key("korean", profile_variant("accurate"))
+    # Las variantes que no fijan reconocedor aceptan cualquier idioma
+    assert "text_recognition_model_name" not in variant_options(resolve_model_key("korean"))
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from src.api.app import app
+from src.services.inference_executor import inference_executor
 
 client = TestClient(app)
 
@@ -12,6 +13,18 @@ def test_health_endpoint():
     assert response.json() == {"status": "ok"}
 
 
+def test_ready_endpoint(monkeypatch):
+    """/ready responde 503 hasta que los modelos están calentados"""
+    monkeypatch.setattr(inference_executor, "ready", False)
+    response = client.get("/ready")
+    assert response.status_code == 503
+
+    monkeypatch.setattr(inference_executor, "ready", True)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
 def test_extract_text_only_success():
     """Prueba el endpoint extract-text-only con URL válida"""
     payload = {
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import io
+
+import pypdfium2 as pdfium
+import pytest
+
+from src.core.config import settings
+from src.services.inference_executor import InferenceQueueFullError
+from src.services.model_registry import UnknownModelError
+from src.services.ocr_pipeline import OCRPipeline
+from src.services.result_cache import OCRResultCache
+
+
+def _line(text, confidence, y=0):
+    return {"box": [[0, y], [9, y], [9, y + 1], [0, y + 1]], "text": text, "confidence": confidence}
+
+
+class MethodRecordingExecutor:
+    def __init__(self):
+        self.methods = []
+
+    async def run(self, method, image_data, *args, model_key=None):
+        self.methods.append((method, args))
+        return [_line("TOTAL", 0.4)]
+
+
+def test_pipeline_modes_call_only_needed_models():
+    """Cada modo llama al método del servicio que ejecuta solo sus sub-modelos"""
+    executor = MethodRecordingExecutor()
+    pipeline = OCRPipeline(executor, cache=OCRResultCache(), model_config="2560")
+    box = [[0, 0], [1, 0], [1, 1], [0, 1]]
+
+    async def scenario():
+        await pipeline.extract(b"imagen")
+        await pipeline.extract(b"imagen", mode="detection")
+        await pipeline.extract(b"imagen", regions=[[0, 0, 10, 10]])
+        await pipeline.extract(b"imagen", mode="recognition", boxes=[box])
+        # Repetir una petición con las mismas opciones sale del cache
+        await pipeline.extract(b"imagen", mode="detection")
+
+    asyncio.run(scenario())
+
+    assert executor.methods == [
+        ("extract_text", ()),
+        ("detect_text", (None,)),
+        ("extract_regions", ([[0, 0, 10, 10]],)),
+        ("recognize_text", ([box],))
+    ]
+
+
+class KeyRecordingExecutor:
+    def __init__(self):
+        self.model_keys = []
+
+    async def run(self, method, image_data, model_key=None):
+        self.model_keys.append(model_key)
+        return [_line("TOTAL", 0.4)]
+
+
+def test_pipeline_profile_selects_model():
+    """El perfil elige la variante del modelo y separa las entradas del cache"""
+    executor = KeyRecordingExecutor()
+    pipeline = OCRPipeline(executor, cache=OCRResultCache(), model_config="2560")
+
+    async def scenario():
+        await pipeline.extract(b"imagen", lang="en", profile="fast")
+        await pipeline.extract(b"imagen", lang="en", profile="accurate")
+        await pipeline.extract(b"imagen", lang="en", profile="fast")
+
+    asyncio.run(scenario())
+
+    assert [key[1] for key in executor.model_keys] == ["fast", "accurate"]
+
+
+class CascadeExecutor:
+    """Primera pasada con dos líneas poco fiables; la segunda mejora solo una"""
+
+    def __init__(self, full=False):
+        self.calls = []
+        self.full = full
+
+    async def run(self, method, image_data, *args, model_key=None):
+        self.calls.append((method, model_key[1], args))
+        if method == "recognize_text":
+            if self.full:
+                raise InferenceQueueFullError(retry_after=1)
+            return [_line("IVA", 0.95, 1), _line("?", 0.1, 2)]
+        return [_line("TOTAL", 0.9), _line("1VA", 0.5, 1), _line("F3CHA", 0.3, 2)]
+
+
+def test_cascade_reruns_only_low_confidence_lines():
+    """Solo las líneas poco fiables pasan por el segundo modelo y se queda la mejor lectura"""
+    executor = CascadeExecutor()
+    pipeline = OCRPipeline(
+        executor, cache=OCRResultCache(), model_config="2560", cascade_threshold=0.8
+    )
+
+    async def scenario():
+        first = await pipeline.extract(b"imagen", lang="en", profile="fast")
+        second = await pipeline.extract(b"imagen", lang="en", profile="fast")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [(line["text"], line["confidence"]) for line in first] == [
+        ("TOTAL", 0.9), ("IVA", 0.95), ("F3CHA", 0.3)
+    ]
+    assert second == first
+    method, variant, (boxes,) = executor.calls[1]
+    assert (method, variant) == ("recognize_text", "accurate+rec")
+    assert boxes == [_line("", 0, 1)["box"], _line("", 0, 2)["box"]]
+    assert len(executor.calls) == 2
+
+
+def test_cascade_skipped_for_its_own_profile_and_partial_modes():
+    """Sin segunda pasada si ya se usa el modelo de la cascada o en modos parciales"""
+    executor = CascadeExecutor()
+    pipeline = OCRPipeline(executor, model_config="2560", cascade_threshold=0.8)
+
+    async def scenario():
+        await pipeline.extract(b"imagen", lang="en", profile="accurate")
+        await pipeline.extract(b"imagen", lang="en", profile="fast", mode="detection")
+
+    asyncio.run(scenario())
+
+    assert [method for method, _, _ in executor.calls] == ["extract_text", "detect_text"]
+
+
+def test_cascade_falls_back_when_queue_is_full():
+    """Con la cola llena se devuelve la primera pasada sin guardarla en el cache"""
+    executor = CascadeExecutor(full=True)
+    pipeline = OCRPipeline(
+        executor, cache=OCRResultCache(), model_config="2560", cascade_threshold=0.8
+    )
+
+    async def scenario():
+        first = await pipeline.extract(b"imagen", lang="en", profile="fast")
+        await pipeline.extract(b"imagen", lang="en", profile="fast")
+        return first
+
+    first = asyncio.run(scenario())
+
+    assert [line["text"] for line in first] == ["TOTAL", "1VA", "F3CHA"]
+    assert [method for method, _, _ in executor.calls].count("extract_text") == 2
+
+
+def test_cascade_profile_must_set_its_recognizer():
+    """Un perfil sin reconocedor propio repetiría las líneas con el mismo modelo"""
+    with pytest.raises(UnknownModelError):
+        OCRPipeline(
+            CascadeExecutor(), cascade_threshold=0.8, cascade_profile="balanced"
+        )
+
+
+def test_cascade_first_pass_uses_fast_profile():
+    """Sin perfil, la primera pasada usa el perfil rápido y la segunda el reconocedor pesado"""
+    executor = CascadeExecutor()
+    pipeline = OCRPipeline(executor, model_config="2560", cascade_threshold=0.8)
+
+    asyncio.run(pipeline.extract(b"imagen", lang="es"))
+
+    assert [(method, variant) for method, variant, _ in executor.calls] == [
+        ("extract_text", "fast"), ("recognize_text", "accurate+rec")
+    ]
+
+
+def test_cascade_skipped_when_its_recognizer_lacks_the_language(monkeypatch):
+    """Si el reconocedor de la cascada no lee el idioma, no hay segunda pasada"""
+    monkeypatch.setattr(settings, "ocr_langs", "en,es,korean")
+    executor = CascadeExecutor()
+    pipeline = OCRPipeline(executor, model_config="2560", cascade_threshold=0.8)
+
+    results = asyncio.run(pipeline.extract(b"imagen", lang="korean"))
+
+    assert [line["text"] for line in results] == ["TOTAL", "1VA", "F3CHA"]
+    assert [(method, variant) for method, variant, _ in executor.calls] == [
+        ("extract_text", "default")
+    ]
+
+
+def test_document_pages_are_hashed_once(monkeypatch):
+    """El documento se hashea una vez y cada página viaja al worker sin el resto"""
+    document = pdfium.PdfDocument.new()
+    for _ in range(3):
+        document.new_page(200, 300)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    data = buffer.getvalue()
+
+    received = []
+
+    class PageExecutor:
+        async def run(self, method, image_data, *args, model_key=None):
+            received.append(image_data)
+            return [_line(f"página {image_data.index + 1}", 0.9)]
+
+    hashed = []
+    make_key = OCRResultCache.make_key
+    monkeypatch.setattr(
+        OCRResultCache, "make_key",
+        staticmethod(lambda image, config: hashed.append(image) or make_key(image, config))
+    )
+    pipeline = OCRPipeline(PageExecutor(), cache=OCRResultCache(), model_config="2560")
+
+    pages = asyncio.run(pipeline.extract_pages(data, lang="en"))
+
+    assert [(index, results[0]["text"]) for index, results in pages] == [
+        (0, "página 1"), (1, "página 2"), (2, "página 3")
+    ]
+    assert hashed == [hashlib.sha256(data).hexdigest().encode()] * 3
+    assert all(len(page.data) < len(data) for page in received)
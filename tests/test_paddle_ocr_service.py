@@ -0,0 +1,291 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from paddlex.inference.common.batch_sampler import ImageBatchSampler
+from paddlex.inference.models.common import ToBatch, ToCHWImage
+from paddlex.inference.models.text_detection.processors import (
+    DetResizeForTest,
+    NormalizeImage
+)
+
+from src.core.metrics import start_timings
+from src.services import inference_executor as executor_module
+from src.services import paddleOCR
+from src.services.model_registry import recognition_model_key, resolve_model_key
+from src.services.paddleOCR import PaddleOCRService, _TimedPredictor
+
+
+def _service_without_model(max_side=None) -> PaddleOCRService:
+    """Instancia sin cargar PaddleOCR, para probar la lógica del servicio"""
+    service = PaddleOCRService.__new__(PaddleOCRService)
+    service.max_side = max_side
+    return service
+
+
+def test_format_page_maps_boxes_to_original_resolution():
+    """Las cajas se devuelven en coordenadas de la imagen original"""
+    service = _service_without_model()
+    page = {
+        "dt_polys": [np.array([[10, 10], [50, 10], [50, 20], [10, 20]])],
+        "rec_texts": ["TOTAL"],
+        "rec_scores": [0.98]
+    }
+
+    results = service._format_page(page, scale=0.5)
+
+    assert results == [{
+        "box": [[20.0, 20.0], [100.0, 20.0], [100.0, 40.0], [20.0, 40.0]],
+        "text": "TOTAL",
+        "confidence": 0.98
+    }]
+
+
+def test_load_image_downscales_bytes():
+    """Los bytes se decodifican y se reducen al lado máximo configurado"""
+    service = _service_without_model(max_side=100)
+    ok, encoded = cv2.imencode(".png", np.zeros((200, 400, 3), dtype=np.uint8))
+
+    image, scale = service._load_image(encoded.tobytes())
+
+    assert image.shape == (50, 100, 3)
+    assert scale == 0.25
+
+
+def test_importing_service_does_not_load_models():
+    """El modelo se crea en el primer uso, no al importar el módulo"""
+    from src.services import paddleOCR
+
+    assert paddleOCR._ocr_service is None
+
+
+def test_timed_predictor_records_stage():
+    """El envoltorio de los sub-modelos mide el tiempo y reenvía atributos"""
+    class Predictor:
+        batch_size = 4
+
+        def __call__(self, images):
+            for image in images:
+                yield {"dt_polys": [image]}
+
+    timings = start_timings()
+    predictor = _TimedPredictor(Predictor(), "detection")
+
+    assert list(predictor(["a", "b"])) == [{"dt_polys": ["a"]}, {"dt_polys": ["b"]}]
+    assert predictor.batch_size == 4
+    assert "detection" in timings
+
+
+class FakeInnerPipeline:
+    """Sub-modelos falsos; el servicio no tiene predict(), así que llamarlo falla"""
+
+    def __init__(self):
+        self.det_inputs = []
+        self.rec_inputs = []
+
+    def get_text_det_params(self):
+        return {}
+
+    def text_det_model(self, images, **params):
+        for image in images:
+            self.det_inputs.append(image.shape)
+            yield {"dt_polys": [np.array([[1, 1], [5, 1], [5, 3], [1, 3]])], "dt_scores": [0.8]}
+
+    def _crop_by_polys(self, image, polys):
+        return [image[:2, :2] for _ in polys]
+
+    def text_rec_model(self, crops):
+        for _ in crops:
+            self.rec_inputs.append(1)
+            yield {"rec_text": "TOTAL", "rec_score": 0.9}
+
+
+def _service_with_sub_models() -> PaddleOCRService:
+    service = _service_without_model()
+    service.ocr = SimpleNamespace(paddlex_pipeline=SimpleNamespace(_pipeline=FakeInnerPipeline()))
+    return service
+
+
+def test_detect_text_runs_only_detection_inside_regions():
+    """El modo detección solo ejecuta el detector sobre los recortes pedidos"""
+    service = _service_with_sub_models()
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    results = service.detect_text(image, regions=[[100, 50, 150, 90]])
+
+    inner = service.ocr.paddlex_pipeline._pipeline
+    assert inner.det_inputs == [(40, 50, 3)]
+    assert inner.rec_inputs == []
+    # Las cajas vuelven a las coordenadas de la imagen completa
+    assert results == [{
+        "box": [[101.0, 51.0], [105.0, 51.0], [105.0, 53.0], [101.0, 53.0]],
+        "text": "",
+        "confidence": 0.8
+    }]
+
+
+def test_recognize_text_keeps_supplied_boxes():
+    """El modo reconocimiento no ejecuta el detector y devuelve las cajas recibidas"""
+    service = _service_with_sub_models()
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    box = [[10.0, 10.0], [60.0, 10.0], [60.0, 30.0], [10.0, 30.0]]
+
+    results = service.recognize_text(image, [box])
+
+    inner = service.ocr.paddlex_pipeline._pipeline
+    assert inner.det_inputs == []
+    assert results == [{"box": box, "text": "TOTAL", "confidence": 0.9}]
+
+
+def test_recognize_text_straightens_upside_down_lines():
+    """Con la orientación de línea activada, los recortes girados se enderezan antes de reconocerlos"""
+    service = _service_with_sub_models()
+    inner = service.ocr.paddlex_pipeline._pipeline
+    inner.use_textline_orientation = True
+    inner.textline_orientation_model = lambda crops: [{"class_ids": [i % 2]} for i in range(len(crops))]
+    rotated = []
+    inner.rotate_image = lambda crops, angles: rotated.extend(angles) or crops
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    box = [[10.0, 10.0], [60.0, 10.0], [60.0, 30.0], [10.0, 30.0]]
+
+    results = service.recognize_text(image, [box, box])
+
+    assert rotated == [0, 1]
+    assert len(results) == 2
+
+
+def test_crop_regions_discards_empty_regions():
+    """Las regiones fuera de la imagen se descartan y el resto se recorta a sus límites"""
+    service = _service_without_model()
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    crops = service._crop_regions(image, [[300, 0, 400, 50], [150, 80, 250, 120]], scale=1.0)
+
+    assert len(crops) == 1
+    assert crops[0][0].shape == (20, 50, 3)
+    assert crops[0][1] == (150, 80)
+
+
+class PreprocessingDetPredictor:
+    """Detector sin modelo con el muestreo por lotes y el preprocesado reales de PaddleX"""
+
+    def __init__(self):
+        self.batch_sampler = ImageBatchSampler(batch_size=1)
+        self.resize = DetResizeForTest(limit_side_len=64, limit_type="min")
+        self.batch_shapes = []
+
+    def __call__(self, images, **params):
+        for batch in self.batch_sampler(images):
+            resized, _ = self.resize(imgs=batch.instances)
+            tensor = ToBatch()(imgs=ToCHWImage()(imgs=NormalizeImage(order="")(imgs=resized)))
+            self.batch_shapes.append(tensor[0].shape)
+            for _ in batch.instances:
+                yield {"dt_polys": [], "dt_scores": []}
+
+
+class PreprocessingPaddleOCR:
+    """PaddleOCR falso cuyo predict() reparte las imágenes como el pipeline de PaddleX"""
+
+    def __init__(self, lang, device, **options):
+        inner = SimpleNamespace(
+            text_det_model=PreprocessingDetPredictor(),
+            get_text_det_params=lambda: {}
+        )
+        self.paddlex_pipeline = SimpleNamespace(
+            batch_sampler=ImageBatchSampler(batch_size=1),
+            text_det_model=inner.text_det_model,
+            _pipeline=inner
+        )
+
+    def predict(self, images):
+        pipeline = self.paddlex_pipeline
+        results = []
+        for batch in pipeline.batch_sampler(images):
+            for det_result in pipeline._pipeline.text_det_model(batch.instances):
+                results.append({**det_result, "rec_texts": [], "rec_scores": []})
+        return results
+
+
+def test_batch_of_different_sizes_goes_through_detection(monkeypatch):
+    """Un lote con imágenes de tamaños distintos no apila tensores de detección incompatibles"""
+    monkeypatch.setattr(paddleOCR, "PaddleOCR", PreprocessingPaddleOCR)
+    service = PaddleOCRService(batch_size=8)
+    images = [np.zeros((100, 200, 3), dtype=np.uint8), np.zeros((300, 120, 3), dtype=np.uint8)]
+
+    assert service.extract_batch(images) == [[], []]
+    assert service.ocr.paddlex_pipeline.batch_sampler.batch_size == 8
+    det = service.ocr.paddlex_pipeline._pipeline.text_det_model
+    assert [shape[0] for shape in det.batch_shapes] == [1, 1]
+
+
+def test_regions_of_different_sizes_are_detected_one_by_one(monkeypatch):
+    """Las regiones de tamaños distintos no se apilan en un mismo lote de detección"""
+    monkeypatch.setattr(paddleOCR, "PaddleOCR", PreprocessingPaddleOCR)
+    service = PaddleOCRService(batch_size=8)
+    det = service.ocr.paddlex_pipeline._pipeline.text_det_model
+    # Aunque el detector admitiera lotes, cada recorte va por separado
+    det.batch_sampler.batch_size = 8
+    image = np.zeros((300, 400, 3), dtype=np.uint8)
+    regions = [[0, 0, 200, 100], [200, 0, 320, 300]]
+
+    assert service.extract_regions(image, regions) == []
+    assert service.detect_text(image, regions=regions) == []
+    assert [shape[0] for shape in det.batch_shapes] == [1, 1, 1, 1]
+
+
+class FakeSubModel:
+    """Modelo suelto de PaddleOCR falso que registra con qué se creó"""
+
+    created = []
+
+    def __init__(self, model_name=None, **options):
+        self.model_name = model_name
+        self.created.append((type(self).__name__, model_name))
+        self.paddlex_predictor = self.predict
+
+    def predict(self, crops):
+        for crop in crops:
+            if type(self).__name__ == "FakeOrientation":
+                yield {"class_ids": [int(crop[0, 0, 0] == 0)]}
+            else:
+                yield {"rec_text": f"{self.model_name}:{crop.shape[1]}", "rec_score": 0.97}
+
+
+class FakeRecognizer(FakeSubModel):
+    pass
+
+
+class FakeOrientation(FakeSubModel):
+    pass
+
+
+def test_cascade_service_loads_only_recognition_models(monkeypatch):
+    """La segunda pasada carga el reconocedor y la orientación de la variante, sin el detector"""
+    def no_pipeline(**options):
+        raise AssertionError("No se debe cargar el pipeline completo")
+
+    monkeypatch.setattr(FakeSubModel, "created", [])
+    monkeypatch.setattr(paddleOCR, "PaddleOCR", no_pipeline)
+    monkeypatch.setattr(paddleOCR, "TextRecognition", FakeRecognizer)
+    monkeypatch.setattr(paddleOCR, "TextLineOrientationClassification", FakeOrientation)
+    service = executor_module._create_service(
+        recognition_model_key(resolve_model_key("en", "accurate"))
+    )
+    image = np.full((100, 200, 3), 255, dtype=np.uint8)
+    image[60:, :] = 0
+    boxes = [
+        [[10.0, 10.0], [60.0, 10.0], [60.0, 30.0], [10.0, 30.0]],
+        [[10.0, 70.0], [90.0, 70.0], [90.0, 90.0], [10.0, 90.0]]
+    ]
+    rotated = []
+    service.rotate_image = lambda crops, angles: rotated.extend(angles) or crops
+
+    results = service.recognize_text(image, boxes)
+
+    assert FakeSubModel.created == [
+        ("FakeRecognizer", "PP-OCRv6_medium_rec"),
+        ("FakeOrientation", None)
+    ]
+    assert rotated == [0, 1]
+    assert [line["box"] for line in results] == boxes
+    assert results[0]["text"] == "PP-OCRv6_medium_rec:50"
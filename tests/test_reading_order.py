@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.utils.reading_order import assemble_text, group_lines
+
+client = TestClient(app)
+
+
+def _quad(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+# Ticket en orden de detector: los precios aparecen antes que sus productos
+RECEIPT = [
+    {"box": _quad(300, 10, 360, 30), "text": "2,50", "confidence": 0.9},
+    {"box": _quad(10, 12, 100, 31), "text": "Pan", "confidence": 0.7},
+    {"box": _quad(300, 40, 360, 60), "text": "1,00", "confidence": 0.9},
+    {"box": _quad(10, 41, 120, 59), "text": "Leche", "confidence": 0.8},
+    {"box": _quad(10, 140, 120, 160), "text": "TOTAL", "confidence": 0.8},
+    {"box": _quad(300, 141, 360, 160), "text": "3,50", "confidence": 0.8}
+]
+
+
+def test_rows_are_merged_left_to_right():
+    """Las cajas de una misma fila forman una línea ordenada de izquierda a derecha"""
+    lines = group_lines(RECEIPT)
+
+    assert [line["text"] for line in lines] == ["Pan 2,50", "Leche 1,00", "TOTAL 3,50"]
+    assert lines[0]["box"] == [10.0, 10.0, 360.0, 31.0]
+    assert lines[0]["confidence"] == 0.8
+    assert [word["text"] for word in lines[0]["words"]] == ["Pan", "2,50"]
+
+
+def test_large_vertical_gaps_start_a_paragraph():
+    """Un hueco vertical grande separa párrafos con una línea en blanco"""
+    lines = group_lines(RECEIPT)
+
+    assert [line["paragraph"] for line in lines] == [0, 0, 1]
+    assert assemble_text(lines) == "Pan 2,50\nLeche 1,00\n\nTOTAL 3,50"
+
+
+def test_empty_results():
+    """Sin cajas no hay líneas"""
+    assert group_lines([]) == []
+    assert assemble_text([]) == ""
+
+
+def test_dense_page_keeps_every_box():
+    """En una página densa cada caja acaba en exactamente una línea"""
+    rng = np.random.default_rng(0)
+    results = []
+    for row in range(200):
+        for col in rng.permutation(10):
+            x, y = col * 60, row * 25
+            results.append({"box": _quad(x, y, x + 50, y + 18), "text": f"{row}:{col}", "confidence": 1.0})
+
+    lines = group_lines(results)
+
+    assert len(lines) == 200
+    assert sum(len(line["words"]) for line in lines) == len(results)
+    assert lines[5]["text"] == " ".join(f"5:{col}" for col in range(10))
+
+
+def test_upload_with_reading_order(fake_ocr):
+    """reading_order añade las líneas agrupadas a la respuesta"""
+    fake_ocr.results = RECEIPT
+    ok, encoded = cv2.imencode(".png", np.full((20, 40, 3), 255, dtype=np.uint8))
+
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("ticket.png", encoded.tobytes(), "image/png")},
+        data={"min_confidence": "0.75", "reading_order": "true"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    # El filtro por confianza se aplica antes de agrupar
+    assert [line["text"] for line in body["lines"]] == ["2,50", "Leche 1,00", "TOTAL 3,50"]
+    assert body["total_lines"] == 5
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import time
+
+from src.services.ocr_pipeline import OCRPipeline
+from src.services.result_cache import OCRResultCache
+
+RESULTS = [{"box": [[0, 0], [1, 0], [1, 1], [0, 1]], "text": "TOTAL", "confidence": 0.4}]
+
+
+def test_key_depends_on_content_and_model():
+    """La clave cambia con el contenido o con la configuración del modelo"""
+    key = OCRResultCache.make_key(b"imagen", "en:cpu")
+
+    assert key == OCRResultCache.make_key(b"imagen", "en:cpu")
+    assert key != OCRResultCache.make_key(b"otra", "en:cpu")
+    assert key != OCRResultCache.make_key(b"imagen", "es:cpu")
+
+
+def test_lru_eviction_and_counters():
+    """Se expulsa la entrada menos usada y se cuentan aciertos y fallos"""
+    cache = OCRResultCache(max_entries=2)
+    cache.set("a", RESULTS)
+    cache.set("b", RESULTS)
+    assert cache.get("a") == RESULTS
+
+    cache.set("c", RESULTS)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == RESULTS
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+def test_ttl_expiration():
+    """Las entradas caducadas no se devuelven"""
+    cache = OCRResultCache(ttl_seconds=0.01)
+    cache.set("a", RESULTS)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """El nivel en disco conserva los resultados entre instancias"""
+    OCRResultCache(disk_dir=str(tmp_path)).set("abcd", RESULTS)
+
+    cache = OCRResultCache(disk_dir=str(tmp_path))
+
+    assert cache.get("abcd") == RESULTS
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_async_access_reads_disk_tier(tmp_path):
+    """aget() y aset() usan el mismo nivel en disco que get() y set()"""
+    async def scenario():
+        await OCRResultCache(disk_dir=str(tmp_path)).aset("abcd", RESULTS)
+        cache = OCRResultCache(disk_dir=str(tmp_path))
+        return cache, await cache.aget("abcd"), await cache.aget("efgh")
+
+    cache, found, missing = asyncio.run(scenario())
+
+    assert found == RESULTS
+    assert missing is None
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    """Por encima del tamaño máximo se borran los archivos más antiguos"""
+    size = len(json.dumps(RESULTS, ensure_ascii=False))
+    cache = OCRResultCache(ttl_seconds=0, disk_dir=str(tmp_path), disk_max_bytes=2 * size)
+    for index, key in enumerate(["aa01", "bb02", "cc03"]):
+        cache.set(key, RESULTS)
+        os.utime(cache._disk_path(key), (1000 + index, 1000 + index))
+    cache.set("dd04", RESULTS)
+
+    kept = [key for key in ("aa01", "bb02", "cc03", "dd04") if cache._disk_path(key).exists()]
+    assert kept == ["cc03", "dd04"]
+
+
+def test_disk_sweep_removes_expired_files(tmp_path):
+    """El barrido borra los archivos caducados aunque nadie vuelva a leerlos"""
+    cache = OCRResultCache(ttl_seconds=60, disk_dir=str(tmp_path))
+    cache.set("aa01", RESULTS)
+    os.utime(cache._disk_path("aa01"), (0, 0))
+
+    cache._sweep_disk()
+
+    assert not cache._disk_path("aa01").exists()
+
+
+class CountingExecutor:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, method, image_data, model_key=None):
+        self.calls += 1
+        return RESULTS
+
+
+def test_pipeline_serves_repeated_images_from_cache():
+    """La misma imagen solo pasa una vez por el modelo"""
+    executor = CountingExecutor()
+    pipeline = OCRPipeline(executor, cache=OCRResultCache(), model_config="2560")
+
+    async def scenario():
+        first = await pipeline.extract(b"imagen")
+        second = await pipeline.extract(b"imagen")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second == RESULTS
+    assert executor.calls == 1
+
+
+def test_pipeline_cache_is_separated_per_language():
+    """La misma imagen en otro idioma no reutiliza el resultado del cache"""
+    executor = CountingExecutor()
+    pipeline = OCRPipeline(executor, cache=OCRResultCache(), model_config="2560")
+
+    async def scenario():
+        await pipeline.extract(b"imagen", lang="en")
+        await pipeline.extract(b"imagen", lang="es")
+
+    asyncio.run(scenario())
+
+    assert executor.calls == 2
+
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.utils import result_encoding
+from src.utils.result_encoding import (
+    UnsupportedResponseFormatError,
+    compact_results,
+    encode_compact,
+    filter_by_confidence
+)
+
+client = TestClient(app)
+
+RESULTS = [
+    {"box": [[0, 0], [4, 0], [4, 2], [0, 2]], "text": "TOTAL", "confidence": 0.9},
+    {"box": [[0, 3], [4, 3], [4, 5], [0, 5]], "text": "ruido", "confidence": 0.2},
+    {"box": [[0, 6], [4, 6], [4, 8], [0, 8]], "text": "10,00", "confidence": 0.7}
+]
+
+
+def test_filter_by_confidence_keeps_order():
+    """El filtro por confianza conserva el orden y sin umbral devuelve todas las líneas"""
+    assert [r["text"] for r in filter_by_confidence(RESULTS, 0.5)] == ["TOTAL", "10,00"]
+    assert filter_by_confidence(RESULTS, None) == RESULTS
+    assert filter_by_confidence([], 0.5) == []
+
+
+def test_compact_results_are_flat_columns():
+    """Las cajas van en un único array plano con 8 coordenadas por línea"""
+    payload = compact_results([(0, RESULTS), (2, RESULTS[:1])], 0.5, include_pages=True)
+
+    assert payload["total_lines"] == 3
+    assert payload["texts"] == ["TOTAL", "10,00", "TOTAL"]
+    assert payload["boxes"].shape == (24,)
+    assert payload["boxes"][8:16].tolist() == [0, 6, 4, 6, 4, 8, 0, 8]
+    assert payload["pages"] == [
+        {"page_index": 0, "start": 0, "count": 2},
+        {"page_index": 2, "start": 2, "count": 1}
+    ]
+
+
+def test_encode_compact_without_orjson(monkeypatch):
+    """Sin orjson se usa json de la librería estándar con el mismo resultado"""
+    payload = compact_results([(0, RESULTS)], 0.5)
+    fast = json.loads(encode_compact(payload, "compact"))
+
+    monkeypatch.setattr(result_encoding, "orjson", None)
+    slow = json.loads(encode_compact(payload, "compact"))
+
+    assert slow["texts"] == fast["texts"]
+    assert np.allclose(slow["confidences"], fast["confidences"])
+    assert slow["boxes"] == fast["boxes"]
+
+
+def test_msgpack_requires_dependency(monkeypatch):
+    """Pedir msgpack sin tenerlo instalado es un error explícito"""
+    monkeypatch.setattr(result_encoding, "msgpack", None)
+
+    with pytest.raises(UnsupportedResponseFormatError):
+        encode_compact(compact_results([(0, RESULTS)], None), "msgpack")
+
+
+def test_raw_endpoint_compact_format(fake_ocr):
+    """response_format=compact devuelve las columnas en lugar de un objeto por línea"""
+    fake_ocr.results = RESULTS
+
+    response = client.post(
+        "/ocr/extract/raw?min_confidence=0.5&response_format=compact",
+        content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 16,
+        headers={"Content-Type": "image/png"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["texts"] == ["TOTAL", "10,00"]
+    assert len(body["boxes"]) == 16
+    assert "results" not in body
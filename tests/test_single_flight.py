@@ -0,0 +1,133 @@
+import asyncio
+
+import cv2
+import httpx
+import numpy as np
+
+from src.services.ocr_pipeline import OCRPipeline
+from src.utils import image_downloader
+from src.utils.image_downloader import download_image_bytes
+from src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Las llamadas concurrentes con la misma clave ejecutan el trabajo una vez"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "resultado"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("clave", work) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["resultado"] * 5
+    assert len(calls) == 1
+    assert flight.shared == 4
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_caller():
+    """Un error del trabajo compartido llega a todas las llamadas"""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("fallo")
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("clave", work), flight.do("clave", work),
+            return_exceptions=True
+        )
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+
+
+def test_cancelling_first_caller_does_not_cancel_others():
+    """Si el cliente que inició el trabajo se va, el resto recibe el resultado"""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("clave", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("clave", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_sequential_calls_are_not_cached():
+    """Una vez terminado el trabajo, la siguiente llamada lo vuelve a ejecutar"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [await flight.do("clave", work), await flight.do("clave", work)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+class SlowExecutor:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, method, image_data, model_key=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [{"box": [], "text": "TOTAL", "confidence": 0.9}]
+
+
+def test_pipeline_coalesces_identical_images_without_cache():
+    """La misma imagen en vuelo solo se infiere una vez, aun sin cache"""
+    executor = SlowExecutor()
+    pipeline = OCRPipeline(executor, cache=None)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(pipeline.extract(b"imagen") for _ in range(4)),
+            pipeline.extract(b"otra imagen")
+        )
+
+    results = asyncio.run(scenario())
+
+    assert executor.calls == 2
+    assert results[0] == results[3]
+
+
+def test_downloads_of_same_url_are_coalesced(monkeypatch):
+    """Las descargas concurrentes de una URL generan una sola petición HTTP"""
+    ok, encoded = cv2.imencode(".png", np.zeros((10, 10, 3), dtype=np.uint8))
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=encoded.tobytes())
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(image_downloader.http_client, "get_client", lambda: client)
+        try:
+            return await asyncio.gather(
+                *(download_image_bytes("https://cdn.example.com/a.png") for _ in range(3))
+            )
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert len(requests) == 1
+    assert results == [encoded.tobytes()] * 3
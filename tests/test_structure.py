@@ -0,0 +1,159 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.api.routes import ocr as ocr_routes
+from src.services.inference_executor import InferenceQueueFullError
+from src.services.ppStructure import PPStructureService
+from src.services.structure_pipeline import StructurePipeline
+
+client = TestClient(app)
+
+PAGE = {
+    "width": 600,
+    "height": 400,
+    "blocks": [{"label": "title", "bbox": [10, 10, 200, 40], "content": "Factura", "order": 0}],
+    "tables": [{"html": "<table></table>", "cells": 4}],
+    "formulas": [],
+    "seals": [],
+    "markdown": "# Factura"
+}
+
+
+class FakeResult(dict):
+    """Resultado de PP-StructureV3 con la propiedad markdown"""
+
+    @property
+    def markdown(self):
+        return {"markdown_texts": "# Factura\n\nTotal: 10"}
+
+
+class FakeStructurePipeline:
+    """Sustituye a PPStructureV3 y registra los sub-módulos pedidos"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, image, **toggles):
+        self.calls.append(toggles)
+        yield FakeResult(
+            width=image.shape[1],
+            height=image.shape[0],
+            parsing_res_list=[
+                SimpleNamespace(label="title", bbox=[10.4, 10, 200, 40], content="Factura"),
+                SimpleNamespace(label="table", bbox=[10, 60, 580, 300], content="<table></table>")
+            ],
+            table_res_list=[{"pred_html": "<table></table>", "cell_box_list": [[0, 0, 1, 1]] * 4}],
+            formula_res_list=[{"rec_formula": "x^2", "dt_polys": np.array([1, 2, 3, 4])}],
+            seal_res_list=[{"rec_texts": ["SELLO", "OFICIAL"]}]
+        )
+
+
+def _service(modules=("table", "formula", "seal")) -> PPStructureService:
+    service = PPStructureService.__new__(PPStructureService)
+    service.modules = set(modules)
+    service.pipeline = FakeStructurePipeline()
+    return service
+
+
+def test_analyze_formats_page():
+    """Los resultados de PP-StructureV3 se convierten en tipos serializables"""
+    service = _service()
+    image = np.full((400, 600, 3), 255, dtype=np.uint8)
+
+    page = service.analyze(image, use_formula_recognition=True, use_seal_recognition=True)
+
+    assert (page["width"], page["height"]) == (600, 400)
+    assert [b["label"] for b in page["blocks"]] == ["title", "table"]
+    assert page["blocks"][0]["bbox"] == [10, 10, 200, 40]
+    assert page["tables"] == [{"html": "<table></table>", "cells": 4}]
+    assert page["formulas"] == [{"latex": "x^2", "bbox": [1.0, 2.0, 3.0, 4.0]}]
+    assert page["seals"] == ["SELLO OFICIAL"]
+    assert page["markdown"].startswith("# Factura")
+    assert service.pipeline.calls == [{
+        "use_table_recognition": True,
+        "use_formula_recognition": True,
+        "use_chart_recognition": False,
+        "use_seal_recognition": True
+    }]
+
+
+def test_analyze_rejects_modules_not_loaded():
+    """Pedir un sub-módulo que no se cargó es un error, no una carga en caliente"""
+    service = _service(modules=("table",))
+    image = np.full((40, 60, 3), 255, dtype=np.uint8)
+
+    with pytest.raises(ValueError):
+        service.analyze(image, use_chart_recognition=True)
+
+
+def test_pipeline_waits_when_queue_is_full():
+    """Con la cola llena el análisis espera en lugar de fallar"""
+    class BusyExecutor:
+        def __init__(self):
+            self.attempts = 0
+
+        async def run(self, method, page, model_key=None, **options):
+            self.attempts += 1
+            if self.attempts == 1:
+                raise InferenceQueueFullError(retry_after=1)
+            return {"page": page, "options": options}
+
+    executor = BusyExecutor()
+    pipeline = StructurePipeline(executor, poll_interval=0.01)
+
+    result = asyncio.run(pipeline.analyze_page(b"img", use_table_recognition=False))
+
+    assert executor.attempts == 2
+    assert result == {"page": b"img", "options": {"use_table_recognition": False}}
+
+
+@pytest.fixture
+def fake_structure(monkeypatch):
+    """Sustituye la descarga y el análisis de la ruta /ocr/structure"""
+    calls = []
+
+    async def fake_download(url):
+        return b"imagen"
+
+    async def fake_analyze_page(page, lang=None, **options):
+        calls.append(options)
+        return PAGE
+
+    monkeypatch.setattr(ocr_routes, "download_image_bytes", fake_download)
+    monkeypatch.setattr(ocr_routes.structure_pipeline, "analyze_page", fake_analyze_page)
+    return calls
+
+
+def test_structure_endpoint_streams_pages(fake_structure):
+    """Cada página se emite como una línea NDJSON con los sub-módulos pedidos"""
+    response = client.post("/ocr/structure", json={
+        "image_url": "https://cdn.example.com/factura.png",
+        "use_formula_recognition": True
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    pages = [json.loads(line) for line in response.text.splitlines()]
+    assert len(pages) == 1
+    assert pages[0]["success"] is True
+    assert pages[0]["page_index"] == 0
+    assert pages[0]["tables"][0]["cells"] == 4
+    assert fake_structure[0]["use_formula_recognition"] is True
+    assert fake_structure[0]["use_chart_recognition"] is False
+
+
+def test_structure_endpoint_rejects_unloaded_modules(fake_structure):
+    """Un sub-módulo fuera de STRUCTURE_MODULES responde 400"""
+    response = client.post("/ocr/structure", json={
+        "image_url": "https://cdn.example.com/factura.png",
+        "use_chart_recognition": True
+    })
+
+    assert response.status_code == 400
+    assert fake_structure == []
@@ -0,0 +1,175 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.core.config import settings
+from src.utils.image_downloader import ImageTooLargeError, read_image_stream
+from src.utils.multipart_upload import MultipartImageUpload
+
+client = TestClient(app)
+
+
+def _png() -> bytes:
+    ok, encoded = cv2.imencode(".png", np.full((20, 40, 3), 255, dtype=np.uint8))
+    assert ok
+    return encoded.tobytes()
+
+
+def _multipart(parts, boundary="limite") -> bytes:
+    """Cuerpo multipart/form-data con los campos en el orden dado"""
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode()
+        body += (value if isinstance(value, bytes) else value.encode()) + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode()
+
+
+def test_multipart_upload(fake_ocr):
+    """El archivo subido llega tal cual al pipeline"""
+    image = _png()
+
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("ticket.png", image, "image/png")},
+        data={"min_confidence": "0.5"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total_lines"] == 1
+    assert fake_ocr.received == [image]
+
+
+def test_raw_body(fake_ocr):
+    """El cuerpo image/* se procesa sin pasar por una URL"""
+    image = _png()
+
+    response = client.post(
+        "/ocr/extract/raw?min_confidence=0.1&include_timings=true",
+        content=image,
+        headers={"Content-Type": "image/png"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_lines"] == 2
+    assert "upload" in body["timings"]
+    assert fake_ocr.received == [image]
+
+
+def test_raw_body_requires_image_content_type(fake_ocr):
+    """Un cuerpo que no se declara como imagen se rechaza con 415"""
+    response = client.post(
+        "/ocr/extract/raw",
+        content=_png(),
+        headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 415
+    assert fake_ocr.received == []
+
+
+def test_upload_rejects_non_images(fake_ocr):
+    """Los magic bytes se comprueban igual que en las descargas"""
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("notas.png", b"esto no es una imagen", "image/png")}
+    )
+
+    assert response.status_code == 415
+    assert fake_ocr.received == []
+
+
+def test_raw_body_too_large(fake_ocr, monkeypatch):
+    """Los cuerpos por encima de MAX_IMAGE_BYTES se rechazan con 413"""
+    monkeypatch.setattr(settings, "max_image_bytes", 16)
+
+    response = client.post(
+        "/ocr/extract/raw",
+        content=_png(),
+        headers={"Content-Type": "image/png"}
+    )
+
+    assert response.status_code == 413
+    assert fake_ocr.received == []
+
+
+def test_upload_fields_after_file(fake_ocr):
+    """Los campos del formulario pueden llegar después del archivo"""
+    body = _multipart([
+        ("file", _png(), "ticket.png"),
+        ("min_confidence", "0.1", None),
+        ("include_timings", "true", None)
+    ])
+
+    response = client.post(
+        "/ocr/extract/upload",
+        content=body,
+        headers={"Content-Type": "multipart/form-data; boundary=limite"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total_lines"] == 2
+    assert "upload" in response.json()["timings"]
+
+
+def test_upload_validates_form_fields(fake_ocr):
+    """Los campos del formulario se validan como con Form(): 422 si no son válidos"""
+    response = client.post(
+        "/ocr/extract/upload",
+        files={"file": ("ticket.png", _png(), "image/png")},
+        data={"dpi": "10"}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["dpi"]
+
+
+def test_upload_requires_file(fake_ocr):
+    """Un formulario sin archivo responde 400"""
+    response = client.post(
+        "/ocr/extract/upload",
+        content=_multipart([("min_confidence", "0.5", None)]),
+        headers={"Content-Type": "multipart/form-data; boundary=limite"}
+    )
+
+    assert response.status_code == 400
+    assert fake_ocr.received == []
+
+
+def test_upload_too_large_by_content_length(fake_ocr, monkeypatch):
+    """Un formulario que declara un tamaño excesivo se rechaza sin leer el cuerpo"""
+    monkeypatch.setattr(settings, "max_image_bytes", 16)
+
+    response = client.post(
+        "/ocr/extract/upload",
+        content=_multipart([("file", b"\x89PNG" + b"\x00" * 128 * 1024, "grande.png")]),
+        headers={"Content-Type": "multipart/form-data; boundary=limite"}
+    )
+
+    assert response.status_code == 413
+    assert fake_ocr.received == []
+
+
+def test_multipart_upload_aborts_while_streaming():
+    """Sin Content-Length, la lectura del formulario se corta al superar el máximo"""
+    body = _multipart([("file", _png() + b"\x00" * 4096, "ticket.png")])
+    chunks = [body[i:i + 256] for i in range(0, len(body), 256)]
+    consumed = []
+
+    async def stream():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    upload = MultipartImageUpload("multipart/form-data; boundary=limite")
+    with pytest.raises(ImageTooLargeError):
+        asyncio.run(read_image_stream(upload.iter_file(stream()), max_bytes=1024))
+
+    assert len(consumed) < len(chunks)
@@ -0,0 +1,145 @@
+"""
+Exporta los modelos de detección y reconocimiento a ONNX
+
+Uso:
+    python -m tools.export_models --langs en,es --variants default,mobile \\
+        --output models/onnx
+
+Carga cada modelo con el motor de Paddle (descargándolo si hace falta),
+convierte sus sub-modelos con Paddle2ONNX (`paddlex --install paddle2onnx`)
+y actualiza el índice `models.json` que leen los motores 'onnxruntime' y
+'openvino'. Los sub-modelos compartidos entre idiomas se convierten una vez.
+
+Con --int8 el reconocimiento se cuantiza además a INT8 (cuantización
+dinámica de ONNX Runtime) y el índice apunta a la versión cuantizada, p. ej.
+para el perfil 'fast':
+
+    python -m tools.export_models --variants fast --int8
+"""
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Exporta los modelos de OCR a ONNX")
+    parser.add_argument("--langs", help="Idiomas separados por comas (por defecto, OCR_LANGS)")
+    parser.add_argument("--variants", default="default",
+                        help="Variantes separadas por comas (default, mobile, server, fast, accurate)")
+    parser.add_argument("--output", help="Directorio de salida (por defecto, ONNX_MODEL_DIR)")
+    parser.add_argument("--opset", type=int, default=11, help="Versión del opset de ONNX")
+    parser.add_argument("--int8", action="store_true",
+                        help="Cuantizar el reconocimiento a INT8 (requiere onnxruntime)")
+    parser.add_argument("--force", action="store_true",
+                        help="Volver a convertir los sub-modelos ya exportados")
+    return parser.parse_args(argv)
+
+
+def _submodels(lang: str, variant: str) -> Dict[str, Tuple[str, Path]]:
+    """Nombre y directorio de los sub-modelos de Paddle de un modelo"""
+    from src.services.inference_backends import SUBMODELS
+    from src.services.model_registry import resolve_model_key
+    from src.services.paddleOCR import create_ocr_service
+
+    service = create_ocr_service(resolve_model_key(lang, variant), backend="paddle")
+    inner = service._inner_pipeline()
+    predictors = {"det": inner.text_det_model, "rec": inner.text_rec_model}
+    return {
+        submodel: (predictors[submodel].model_name, Path(predictors[submodel].model_dir))
+        for submodel in SUBMODELS
+    }
+
+
+def _quantize_int8(source: Path, target: Path) -> None:
+    """
+    Cuantiza un modelo ONNX a INT8 (pesos de MatMul/Gemm)
+
+    Solo se cuantizan las multiplicaciones de matrices: las convoluciones
+    cuantizadas dinámicamente son más lentas que en FP32 en ONNX Runtime.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target.mkdir(parents=True, exist_ok=True)
+    quantize_dynamic(
+        str(source / "inference.onnx"),
+        str(target / "inference.onnx"),
+        op_types_to_quantize=["MatMul", "Gemm"],
+        weight_type=QuantType.QInt8
+    )
+    for extra in source.iterdir():
+        if extra.name != "inference.onnx" and extra.is_file():
+            shutil.copy(extra, target / extra.name)
+
+
+def export_models(
+    langs: List[str],
+    variants: List[str],
+    output: Path,
+    opset: int = 11,
+    int8: bool = False,
+    force: bool = False
+) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Convierte los modelos pedidos y actualiza el índice del directorio
+
+    Returns:
+        Índice completo tras la exportación
+    """
+    from paddlex.paddlex_cli import paddle_to_onnx
+    from src.services.inference_backends import (
+        MANIFEST_FILENAME,
+        load_manifest,
+        manifest_key
+    )
+
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(str(output))
+
+    for lang in langs:
+        for variant in variants:
+            entry = {}
+            for submodel, (name, paddle_dir) in _submodels(lang, variant).items():
+                target = output / name
+                if force or not (target / "inference.onnx").exists():
+                    print(f"Convirtiendo {name} ({paddle_dir})")
+                    target.mkdir(parents=True, exist_ok=True)
+                    paddle_to_onnx(paddle_dir, target, opset_version=opset)
+                directory = name
+                if int8 and submodel == "rec":
+                    directory = f"{name}_int8"
+                    if force or not (output / directory / "inference.onnx").exists():
+                        print(f"Cuantizando {name} a INT8")
+                        _quantize_int8(target, output / directory)
+                entry[submodel] = {"name": name, "dir": directory}
+            manifest[manifest_key(lang, variant)] = entry
+
+            # Se guarda tras cada modelo para no perder lo ya convertido
+            (output / MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2))
+
+    return manifest
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    from src.core.config import settings
+    from src.services.model_registry import available_langs
+
+    langs = args.langs.split(",") if args.langs else available_langs()
+    manifest = export_models(
+        [lang.strip() for lang in langs if lang.strip()],
+        [variant.strip() for variant in args.variants.split(",") if variant.strip()],
+        Path(args.output or settings.onnx_model_dir),
+        opset=args.opset,
+        int8=args.int8,
+        force=args.force
+    )
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())